@@ -5,11 +5,14 @@ import pandas as pd
 import os
 import matplotlib.pyplot as plt
 
+from indicator_memo import memo_for
+
 def generate_stock_chart(data: pd.DataFrame, ticker: str, filename: str = "chart.png"):
     """
     Generate professional technical analysis chart using mplfinance.
     Style: White/Clean (Yahoo style) matching user request.
     Indicators: MA(20, 50, 200), MACD, RSI, Volume
+    Indikator diambil dari memo milik `data` (sudah dihitung oleh analyzer jika frame yang sama).
     """
     
     if len(data) < 30:
@@ -18,25 +21,38 @@ def generate_stock_chart(data: pd.DataFrame, ticker: str, filename: str = "chart
     # Prepare Data
     plot_data = data.tail(150).copy()
     
-    # Calculate Indicators
+    # Calculate Indicators (full history, lalu dipotong ke window plot)
+    memo = memo_for(data)
+    close = data['Close']
+    n = len(plot_data)
+
+    def calc_sma(period):
+        return close.rolling(window=period).mean()
+
+    def calc_rsi():
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+    def calc_macd():
+        ema12 = close.ewm(span=12, adjust=False).mean()
+        ema26 = close.ewm(span=26, adjust=False).mean()
+        macd_line = ema12 - ema26
+        signal_line = macd_line.ewm(span=9, adjust=False).mean()
+        return macd_line, signal_line, macd_line - signal_line
+
     # Moving Averages
-    ma20 = plot_data['Close'].rolling(window=20).mean()
-    ma50 = plot_data['Close'].rolling(window=50).mean()
-    ma200 = plot_data['Close'].rolling(window=200).mean()
+    ma20 = memo.get(("sma", "Close", 20), lambda: calc_sma(20)).iloc[-n:]
+    ma50 = memo.get(("sma", "Close", 50), lambda: calc_sma(50)).iloc[-n:]
+    ma200 = memo.get(("sma", "Close", 200), lambda: calc_sma(200)).iloc[-n:]
     
     # RSI
-    delta = plot_data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    rsi = memo.get(("rsi", 14), calc_rsi).iloc[-n:]
     
     # MACD
-    ema12 = plot_data['Close'].ewm(span=12, adjust=False).mean()
-    ema26 = plot_data['Close'].ewm(span=26, adjust=False).mean()
-    macd = ema12 - ema26
-    signal = macd.ewm(span=9, adjust=False).mean()
-    hist = macd - signal
+    macd, signal, hist = (x.iloc[-n:] for x in memo.get(("macd",), calc_macd))
     
     # Create AddPlots
     apds = []
@@ -0,0 +1,177 @@
+"""
+Direktori Metadata Emiten
+Nama, sektor, jumlah saham beredar, papan, tanggal listing & ringkasan fundamental per ticker,
+disimpan lokal (JSON) dan di-load sekali saat startup. stock.info (endpoint yfinance paling
+lambat) hanya dipanggil saat ticker belum ada di direktori, atau oleh refresh malam hari.
+"""
+
+import json
+import logging
+import os
+import threading
+import time as time_mod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import yfinance as yf
+
+from fetch_scheduler import FETCH_SCHEDULER, ThrottledError, requeue_throttled
+from http_session import HTTP_SESSIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIRECTORY_PATH = "company_directory.json"
+
+# Key stock.info yang disimpan (metadata + fundamental yang dipakai get_stock_fundamentals)
+INFO_KEYS = (
+    "longName", "shortName", "sector", "industry", "sharesOutstanding",
+    "trailingEps", "forwardEps", "netIncomeToCommon", "totalAssets", "trailingPE", "marketCap",
+)
+
+
+def _listing_date(info: Dict) -> Optional[str]:
+    """Tanggal listing (ISO) dari field firstTradeDate yfinance"""
+    ms = info.get("firstTradeDateMilliseconds")
+    epoch = ms / 1000 if ms else info.get("firstTradeDateEpochUtc")
+    if not epoch:
+        return None
+    try:
+        return datetime.fromtimestamp(epoch, tz=timezone.utc).date().isoformat()
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def entry_from_info(info: Dict) -> Dict:
+    """Ambil subset stock.info yang disimpan di direktori"""
+    entry = {key: info.get(key) for key in INFO_KEYS if info.get(key) is not None}
+    entry["name"] = info.get("longName") or info.get("shortName")
+    entry["shares_outstanding"] = info.get("sharesOutstanding")
+    entry["board"] = info.get("board")  # Tidak tersedia di yfinance, bisa diisi dari sumber IDX
+    entry["listing_date"] = _listing_date(info)
+    entry["updated_at"] = time_mod.time()
+    return entry
+
+
+class _RefreshResult:
+    __slots__ = ("ticker", "entry", "throttled")
+
+    def __init__(self, ticker: str, entry: Optional[Dict], throttled: bool):
+        self.ticker = ticker
+        self.entry = entry
+        self.throttled = throttled
+
+
+class CompanyDirectory:
+    """Index in-memory {ticker: metadata}, dipersist ke JSON (atomic replace)"""
+
+    def __init__(self, path: str = DEFAULT_DIRECTORY_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # === DISK ===
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_DIRECTORY_PATH) -> "CompanyDirectory":
+        directory = cls(path)
+        if not os.path.exists(path):
+            return directory
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            directory.entries = payload.get("entries", {})
+            directory.refreshed_at = payload.get("refreshed_at")
+        except Exception as e:
+            logger.warning(f"Direktori emiten rusak, mulai kosong: {e}")
+        return directory
+
+    def save(self):
+        with self._lock:
+            payload = {"refreshed_at": self.refreshed_at, "entries": dict(self.entries)}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.path)
+
+    # === LOOKUP ===
+
+    def _fetch_entry(self, ticker: str, stock: Optional[yf.Ticker] = None) -> Optional[Dict]:
+        """stock.info lewat scheduler; ThrottledError diteruskan ke caller"""
+        stock = stock or HTTP_SESSIONS.ticker(ticker)
+        try:
+            info = FETCH_SCHEDULER.call(lambda: stock.info, kind="info")
+        except ThrottledError:
+            raise
+        except Exception as e:
+            logger.debug(f"stock.info gagal untuk {ticker}: {e}")
+            return None
+        if not info:
+            return None
+        entry = entry_from_info(info)
+        with self._lock:
+            self.entries[ticker] = entry
+        return entry
+
+    def _fetch(self, ticker: str, stock: Optional[yf.Ticker] = None) -> Optional[Dict]:
+        try:
+            return self._fetch_entry(ticker, stock)
+        except ThrottledError as e:
+            logger.warning(f"stock.info {ticker} kena rate limit: {e}")
+            return None
+
+    def peek(self, ticker: str) -> Optional[Dict]:
+        """Entry tersimpan tanpa fetch & tanpa statistik (aman dari thread mana pun)"""
+        with self._lock:
+            return self.entries.get(ticker)
+
+    def info(self, ticker: str, stock: Optional[yf.Ticker] = None) -> Dict:
+        """Metadata ticker dari direktori; miss -> stock.info lalu disimpan di memori"""
+        entry = self.entries.get(ticker)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return self._fetch(ticker, stock) or {}
+
+    def name(self, ticker: str, stock: Optional[yf.Ticker] = None) -> str:
+        return self.info(ticker, stock).get("name") or ticker
+
+    # === NIGHTLY REFRESH ===
+
+    def refresh(self, tickers: List[str], max_workers: int = 8) -> Dict:
+        """Refresh bulk seluruh universe (job malam), lalu simpan ke disk"""
+        started = time_mod.time()
+
+        def fetch_one(ticker):
+            try:
+                return _RefreshResult(ticker, self._fetch_entry(ticker), throttled=False)
+            except ThrottledError:
+                return _RefreshResult(ticker, None, throttled=True)
+
+        def fetch_all(batch):
+            # Ticker yang gagal karena rate limit ditandai agar di-requeue, bukan dilewati
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                yield from executor.map(fetch_one, batch)
+
+        results = list(requeue_throttled(fetch_all(tickers), fetch_all))
+        fetched = sum(1 for r in results if r.entry)
+        self.refreshed_at = time_mod.time()
+        self.save()
+        stats = {"tickers": len(tickers), "fetched": fetched, "throttled": sum(1 for r in results if r.throttled),
+                 "seconds": round(time_mod.time() - started, 1)}
+        logger.info(f"Direktori emiten di-refresh: {stats}")
+        return stats
+
+    def stats(self) -> Dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "refreshed_at": self.refreshed_at}
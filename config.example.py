@@ -63,3 +63,65 @@ SCAN_ALL_CONFIG = {
     "cache_file": "idx_tickers.txt",  # File untuk menyimpan cache ticker
 }
 
+# Jumlah ticker per request batch (yf.download multi-symbol) saat scan harian
+# 0 / None = fetch per ticker (mode lama)
+SCAN_BATCH_SIZE = 50
+
+# Screening uptrend vectorized untuk seluruh universe (butuh SCAN_BATCH_SIZE)
+# Analisis lengkap (entry/TP) hanya dijalankan untuk saham yang lolos screening
+SCAN_PRESCREEN = True
+
+
+# Pipeline 2 stage untuk scan harian: fetch (thread I/O) -> analisa (process pool, multi-core)
+# Jika aktif, menggantikan SCAN_PRESCREEN untuk daily scan
+SCAN_PIPELINE = False
+SCAN_IO_WORKERS = 10        # Thread untuk fetch per ticker (fallback batch)
+SCAN_CPU_WORKERS = None     # Jumlah proses analisa (None = jumlah core)
+SCAN_QUEUE_SIZE = 200       # Maksimal bar yang antri antara stage fetch & analisa
+SCAN_MAX_IN_FLIGHT = None   # Maksimal task di process pool (None = 4x CPU workers)
+
+# Budget waktu scan harian (detik): saat deadline lewat, broadcast memakai pick terbaik yang ada.
+# Ticker yang belum selesai ditandai timeout; jika hasilnya menyusul dan mengubah top 10, dikirim addendum
+SCAN_DEADLINE = 600         # Deadline seluruh scan (None = tanpa deadline)
+SCAN_TICKER_TIMEOUT = 60    # Batas analisa satu ticker (None = tanpa batas)
+SCAN_LATE_GRACE = 300       # Lama menunggu straggler setelah broadcast untuk addendum
+
+# Snapshot quote realtime (harga terakhir/open/high/low/volume) seluruh universe via request batch
+QUOTE_BATCH_SIZE = 200      # Ticker per request batch
+QUOTE_MAX_AGE = 60          # Detik; quote lebih tua di-refresh saat dibaca /analisa (jam bursa)
+
+# Streaming tick (websocket Yahoo): alert Red-to-Green begitu harga berubah, tanpa menunggu polling 15 menit
+QUOTE_STREAM_ENABLED = False        # True = subscribe websocket saat bot start
+QUOTE_STREAM_RECORD = None          # Path file JSONL untuk merekam tick (bahan replay), None = tidak merekam
+QUOTE_STREAM_REPLAY = None          # Path rekaman JSONL: putar ulang offline menggantikan websocket
+QUOTE_STREAM_REPLAY_SPEED = None    # None = secepatnya, 1.0 = jeda waktu asli, 10 = 10x lebih cepat
+
+# Berita top picks diambil bersamaan (async) tanpa memblok handler bot lain; fetch dimulai saat
+# pick sudah masuk top 10 selagi ekor scan masih berjalan
+NEWS_CONCURRENCY = 5        # Request RSS paralel
+NEWS_DEADLINE = 15          # Detik untuk seluruh enrichment berita, sisanya ditandai timeout
+
+# Cache berita per ticker (detik); setelah kadaluarsa direvalidasi dengan conditional GET (ETag/Last-Modified)
+NEWS_TTL_OPEN = 15 * 60     # Saat jam bursa
+NEWS_TTL_CLOSED = 3 * 60 * 60  # Di luar jam bursa
+
+# Scheduler fetch terpusat (semua request yfinance/HTTP): token bucket + concurrency adaptif (AIMD)
+# Concurrency naik perlahan selama request sukses, turun setengah saat Yahoo membalas 429 / respons kosong
+FETCH_RATE = 8.0                # Maksimal request per detik
+FETCH_BURST = 8                 # Burst request yang diizinkan sekaligus
+FETCH_MIN_CONCURRENCY = 1
+FETCH_MAX_CONCURRENCY = 16      # Juga dipakai sebagai ukuran thread pool fetch
+FETCH_INITIAL_CONCURRENCY = 4
+FETCH_MAX_RETRIES = 3           # Retry (dengan backoff) sebelum ticker ditandai kena rate limit & di-requeue
+
+# Hedged request untuk fetch history & quote: jika respons belum datang setelah latency p95,
+# kirim request duplikat dan pakai yang pertama selesai (memotong ekor latency p99)
+FETCH_HEDGE = False
+FETCH_HEDGE_MAX_FRACTION = 0.05 # Maksimal fraksi request yang boleh menghasilkan duplikat
+FETCH_HEDGE_QUANTILE = 0.95     # Kuantil latency sebagai batas tunggu sebelum hedge
+
+# Cache hasil /analisa (detik): request ulang ticker yang sama dilayani tanpa analisa ulang
+ANALYSIS_CACHE_TTL = 60
+# Deadline bersama (detik) untuk fundamental, berita, harga realtime & chart di /analisa;
+# bagian yang belum selesai diganti placeholder
+ANALYSIS_DEADLINE = 8
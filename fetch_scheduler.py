@@ -0,0 +1,372 @@
+"""
+Scheduler Fetch Terpusat
+Semua request keluar (yfinance history/download/info/fast_info, RSS berita, scraping daftar
+ticker) lewat satu scheduler per proses, bukan thread pool dengan max_workers hard-coded:
+
+- Token bucket: membatasi request per detik (burst kecil diizinkan).
+- Concurrency AIMD: batas request paralel naik +1 per "satu putaran" request sukses
+  (additive increase) dan dikali DECREASE_FACTOR saat throttling terdeteksi (multiplicative
+  decrease), sehingga scan berjalan di rate tertinggi yang masih diterima Yahoo.
+- Deteksi throttling: HTTP 429 / YFRateLimitError / "Too Many Requests", serta respons kosong
+  yang datang beruntun (Yahoo sering membalas body kosong saat membatasi, yfinance lalu
+  mengembalikan DataFrame kosong tanpa exception).
+- Request yang di-throttle diulang dengan backoff. Jika tetap gagal, ThrottledError dilempar
+  (bukan "Data tidak mencukupi") dan scan me-requeue ticker tersebut (requeue_throttled).
+- Hedged request opsional (call(..., hedge=True), lihat hedging.py) untuk fetch history & quote:
+  duplikat dikirim jika respons belum datang setelah p95, duplikat ikut memakai token bucket.
+- acall(): varian asyncio untuk coroutine (fan-out berita async), token bucket/cooldown/retry
+  yang sama tanpa memblok event loop; concurrency dibatasi semaphore milik caller.
+"""
+
+import asyncio
+import logging
+import threading
+import time as time_mod
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from hedging import Hedger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 8.0             # Request per detik (token bucket)
+DEFAULT_BURST = 8
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 2.0          # Detik, dikali 2 tiap retry
+DECREASE_FACTOR = 0.5
+EMPTY_WINDOW = 20              # Jumlah respons terakhir untuk menilai "kosong beruntun"
+EMPTY_RATIO = 0.5              # Proporsi respons kosong yang dianggap throttling
+REQUEUE_ROUNDS = 2
+
+_THROTTLE_MARKERS = ("429", "too many requests", "rate limit", "ratelimit")
+
+
+class ThrottledError(Exception):
+    """Request tetap di-throttle setelah semua retry (ticker perlu di-requeue, bukan dibuang)"""
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Exception yang menandakan kita dibatasi (429 / YFRateLimitError), bukan data yang memang tidak ada"""
+    if isinstance(error, ThrottledError):
+        return True
+    if type(error).__name__ == "YFRateLimitError":
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+def is_empty_response(result: Any) -> bool:
+    """Default cek respons kosong: None, DataFrame kosong, dict/list kosong"""
+    if result is None:
+        return True
+    empty = getattr(result, "empty", None)
+    if isinstance(empty, bool):
+        return empty
+    if isinstance(result, (dict, list, tuple, str, bytes)):
+        return len(result) == 0
+    return False
+
+
+class TokenBucket:
+    """Token bucket thread-safe: acquire() menunggu sampai ada token"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time_mod.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Ambil satu token. Returns: detik menunggu"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time_mod.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time_mod.sleep(delay)
+            waited += delay
+
+    def try_acquire(self) -> bool:
+        """Ambil token tanpa menunggu (dipakai request duplikat/hedge)"""
+        with self._lock:
+            self._refill(time_mod.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class FetchScheduler:
+    """
+    Gerbang untuk semua request keluar.
+
+    call(fn, *args, **kwargs) menjalankan fn setelah mendapat token & slot concurrency,
+    mendeteksi throttling (exception / respons 429 / respons kosong beruntun), lalu
+    menyesuaikan limit concurrency (AIMD) dan mengulang request dengan backoff.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 min_concurrency: int = DEFAULT_MIN_CONCURRENCY, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF):
+        self._cond = threading.Condition()
+        self._recent: "deque[bool]" = deque(maxlen=EMPTY_WINDOW)
+        self.stats_by_kind: Dict[str, Dict[str, int]] = {}
+        self.hedger = Hedger()
+        self.configure(rate=rate, burst=burst, min_concurrency=min_concurrency, max_concurrency=max_concurrency,
+                       initial_concurrency=initial_concurrency, max_retries=max_retries, backoff=backoff)
+
+    def configure(self, rate: float = None, burst: int = None, min_concurrency: int = None,
+                  max_concurrency: int = None, initial_concurrency: int = None, max_retries: int = None,
+                  backoff: float = None):
+        """Set ulang parameter (dipanggil sekali saat startup dari config); None = tidak diubah"""
+        with self._cond:
+            if rate is not None or burst is not None:
+                old = getattr(self, "bucket", None)
+                self.bucket = TokenBucket(rate if rate is not None else old.rate,
+                                          burst if burst is not None else old.capacity)
+            if min_concurrency is not None:
+                self.min_concurrency = max(1, int(min_concurrency))
+            if max_concurrency is not None:
+                self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+            if initial_concurrency is not None:
+                self.limit = float(initial_concurrency)
+            self.limit = min(max(self.limit, self.min_concurrency), self.max_concurrency)
+            if max_retries is not None:
+                self.max_retries = max_retries
+            if backoff is not None:
+                self.backoff = backoff
+            if not hasattr(self, "active"):
+                self.active = 0
+                self.cooldown_until = 0.0
+                self._last_decrease = 0.0
+                self.throttle_events = 0
+                self.peak_limit = self.limit
+            self._cond.notify_all()
+
+    # === CONCURRENCY (AIMD) ===
+
+    @contextmanager
+    def slot(self):
+        """Tunggu cooldown & slot concurrency bebas, lalu token bucket"""
+        with self._cond:
+            while True:
+                wait = self.cooldown_until - time_mod.monotonic()
+                if wait <= 0 and self.active < int(self.limit):
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+            self.active += 1
+        try:
+            self.bucket.acquire()
+            yield
+        finally:
+            self._release_slot()
+
+    def _try_extra_slot(self) -> bool:
+        """Slot + token tanpa menunggu untuk request duplikat (hedge); False jika penuh/cooldown"""
+        with self._cond:
+            if time_mod.monotonic() < self.cooldown_until or self.active >= int(self.limit):
+                return False
+            if not self.bucket.try_acquire():
+                return False
+            self.active += 1
+            return True
+
+    def _release_slot(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def _on_success(self):
+        with self._cond:
+            if self.limit < self.max_concurrency:
+                # +1 setelah kira-kira `limit` request sukses
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+                self._cond.notify_all()
+
+    def _on_throttle(self, attempt: int, retry_after: Optional[float] = None):
+        now = time_mod.monotonic()
+        delay = retry_after if retry_after else self.backoff * (2 ** attempt)
+        with self._cond:
+            self.throttle_events += 1
+            # Satu kali decrease per jendela backoff: banyak 429 bersamaan = satu sinyal
+            if now - self._last_decrease > self.backoff:
+                self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+                self._last_decrease = now
+                logger.warning(f"Throttling terdeteksi, concurrency turun ke {int(self.limit)}, "
+                               f"pause {delay:.1f}s")
+            self.cooldown_until = max(self.cooldown_until, now + delay)
+        # Kosongkan jendela respons kosong agar satu episode tidak dihitung berulang
+        self._recent.clear()
+
+    def wait_cooldown(self):
+        """Blok sampai cooldown throttling selesai (dipakai sebelum requeue)"""
+        wait = self.cooldown_until - time_mod.monotonic()
+        if wait > 0:
+            time_mod.sleep(wait)
+
+    # === CALL ===
+
+    def _looks_throttled(self, empty: bool) -> bool:
+        """Respons kosong dianggap throttling hanya jika mayoritas respons terakhir juga kosong"""
+        self._recent.append(empty)
+        if not empty or len(self._recent) < EMPTY_WINDOW // 2:
+            return False
+        return sum(self._recent) / len(self._recent) >= EMPTY_RATIO
+
+    def _count(self, kind: str, field: str):
+        with self._cond:
+            stats = self.stats_by_kind.setdefault(kind, {"calls": 0, "retries": 0, "throttled": 0, "failed": 0})
+            stats[field] += 1
+
+    def call(self, fn: Callable, *args, kind: str = "yfinance",
+             is_empty: Optional[Callable[[Any], bool]] = is_empty_response, hedge: bool = False, **kwargs) -> Any:
+        """
+        Jalankan fn(*args, **kwargs) lewat scheduler.
+        kind: label statistik ("history", "download", "info", "news", ...)
+        is_empty: cek respons kosong (None = respons kosong tidak pernah dicurigai throttling)
+        hedge: boleh di-hedge (fn harus idempoten & tidak berbagi objek yfinance antar panggilan)
+        Raises: ThrottledError jika tetap di-throttle setelah max_retries;
+                exception lain dari fn diteruskan apa adanya.
+        """
+        self._count(kind, "calls")
+        suspect_empty = False  # Respons kosong sudah dicurigai throttling di attempt sebelumnya
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count(kind, "retries")
+            retry_after = None
+            try:
+                with self.slot():
+                    if hedge:
+                        result = self.hedger.run(kind, lambda: fn(*args, **kwargs),
+                                                 acquire_extra=self._try_extra_slot,
+                                                 release_extra=self._release_slot)
+                    else:
+                        result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self._count(kind, "failed")
+                    raise
+                cause = e
+            else:
+                status = getattr(result, "status_code", None)
+                if status == 429:
+                    cause = f"HTTP 429 ({kind})"
+                    retry_after = _retry_after(result)
+                elif is_empty is not None and (self._looks_throttled(is_empty(result))
+                                               or (suspect_empty and is_empty(result))):
+                    cause = f"respons kosong beruntun ({kind})"
+                    suspect_empty = True
+                else:
+                    self._on_success()
+                    return result
+            self._count(kind, "throttled")
+            self._on_throttle(attempt, retry_after)
+        self._count(kind, "failed")
+        raise ThrottledError(f"Rate limit Yahoo/HTTP, coba lagi nanti: {cause}")
+
+    async def _async_token(self):
+        """Tunggu cooldown & token bucket dengan asyncio.sleep (event loop tetap jalan)"""
+        while True:
+            wait = self.cooldown_until - time_mod.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            elif self.bucket.try_acquire():
+                return
+            else:
+                await asyncio.sleep(1.0 / self.bucket.rate)
+
+    async def acall(self, fn: Callable, *args, kind: str = "yfinance", **kwargs) -> Any:
+        """
+        Versi asyncio dari call(): await fn(*args, **kwargs) setelah mendapat token.
+        Slot concurrency AIMD tidak dipakai (dibatasi semaphore caller), tapi 429/throttling
+        tetap menurunkan limit & memasang cooldown bersama untuk request sync.
+        Raises: ThrottledError jika tetap di-throttle setelah max_retries.
+        """
+        self._count(kind, "calls")
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count(kind, "retries")
+            await self._async_token()
+            retry_after = None
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self._count(kind, "failed")
+                    raise
+                cause = e
+            else:
+                if getattr(result, "status_code", None) != 429:
+                    self._on_success()
+                    return result
+                cause = f"HTTP 429 ({kind})"
+                retry_after = _retry_after(result)
+            self._count(kind, "throttled")
+            self._on_throttle(attempt, retry_after)
+        self._count(kind, "failed")
+        raise ThrottledError(f"Rate limit Yahoo/HTTP, coba lagi nanti: {cause}")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "peak_limit": round(self.peak_limit, 2),
+                "active": self.active,
+                "rate": self.bucket.rate,
+                "throttle_events": self.throttle_events,
+                "by_kind": {kind: dict(s) for kind, s in self.stats_by_kind.items()},
+                "hedging": self.hedger.stats(),
+            }
+
+
+def _retry_after(response) -> Optional[float]:
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def requeue_throttled(results: Iterable, rerun: Callable[[List[str]], Iterable],
+                      rounds: int = REQUEUE_ROUNDS, scheduler: Optional[FetchScheduler] = None) -> Iterator:
+    """
+    Yield hasil scan; ticker yang gagal karena throttling (result.throttled) ditahan lalu
+    di-scan ulang lewat rerun(tickers) setelah cooldown, maksimal `rounds` putaran.
+    Setelah putaran terakhir hasil throttled tetap di-yield (tidak hilang diam-diam).
+    """
+    scheduler = scheduler or FETCH_SCHEDULER
+    for round_no in range(rounds + 1):
+        throttled = []
+        for result in results:
+            if getattr(result, "throttled", False) and round_no < rounds:
+                throttled.append(result.ticker)
+            else:
+                yield result
+        if not throttled:
+            return
+        logger.warning(f"{len(throttled)} ticker kena rate limit, requeue putaran {round_no + 1} "
+                       f"(concurrency {scheduler.stats()['limit']})")
+        scheduler.wait_cooldown()
+        results = rerun(throttled)
+
+
+# Scheduler bersama untuk seluruh proses (parameter di-set dari config lewat configure())
+FETCH_SCHEDULER = FetchScheduler()
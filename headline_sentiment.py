@@ -0,0 +1,109 @@
+"""
+Sentimen Judul Berita
+Leksikon kata positif & negatif dikompilasi sekali menjadi satu regex, lalu dipakai untuk
+mengklasifikasi judul berita (satu judul atau banyak sekaligus dalam satu pass).
+
+Aturan sama dengan versi lama (substring, case-insensitive): judul yang mengandung kata
+positif -> positif (menang atas kata negatif), lalu negatif, selain itu netral.
+Judul yang sudah positif tidak dipindai lagi, judul netral cukup satu kali scan regex.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List
+
+POSITIVE = "positive"
+NEGATIVE = "negative"
+NEUTRAL = "neutral"
+
+SENTIMENT_EMOJI = {POSITIVE: "🟢", NEGATIVE: "🔴", NEUTRAL: "⚪"}
+
+POSITIVE_KEYWORDS = (
+    "profit", "jump", "surge", "gain", "buy", "bull", "growth", "record", "revenue up", "income up",
+    "acquisition", "laba", "naik", "tumbuh", "dividen", "akuisisi", "kerjasama", "positif", "hijau", "cuan",
+    "melejit", "terbang", "disetujui", "divestasi", "untung", "kinclong", "bersinar", "net buy", "full senyum",
+)
+NEGATIVE_KEYWORDS = (
+    "loss", "drop", "plunge", "fall", "sell", "bear", "down", "revenue down", "income down", "suit", "fine",
+    "debt", "bankrupt", "rugi", "turun", "anjlok", "utang", "pailit", "gugat", "merah", "koreksi", "suspend",
+    "net sell", "boncos", "melorot", "kebakaran", "phk",
+)
+
+
+def _trie_alternation(keywords: Iterable[str]) -> str:
+    """
+    Alternation berbentuk trie (prefix bersama digabung), mis. income up|income down ->
+    income (?:down|up): engine regex cukup menguji satu cabang per karakter, bukan semua kata.
+    """
+    root: Dict = {}
+    for keyword in set(k.lower() for k in keywords):
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # Penanda akhir kata
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+
+class HeadlineClassifier:
+    """
+    Satu regex untuk kedua leksikon (teks di-lowercase sekali per batch). Pencarian diulang dari
+    posisi awal match + 1 sehingga kata positif yang tumpang tindih dengan kata negatif tetap
+    terlihat; di posisi yang sama cabang positif dicoba lebih dulu (prioritas positif).
+    """
+
+    def __init__(self, positive: Iterable[str] = POSITIVE_KEYWORDS, negative: Iterable[str] = NEGATIVE_KEYWORDS):
+        self.pattern = re.compile(f"(?P<pos>{_trie_alternation(positive)})|(?P<neg>{_trie_alternation(negative)})")
+
+    def classify(self, headline: str) -> str:
+        return self.classify_many([headline])[0]
+
+    def classify_many(self, headlines: List[str]) -> List[str]:
+        """Klasifikasi banyak judul dalam satu pass regex atas teks gabungan"""
+        if not headlines:
+            return []
+        # Lowercase per judul (panjang bisa berubah untuk beberapa huruf Unicode) sebelum offset dihitung
+        lowered = [headline.lower() for headline in headlines]
+        starts, offset = [], 0
+        for headline in lowered:
+            starts.append(offset)
+            offset += len(headline) + 1
+        # Kata kunci tidak mengandung newline, jadi match tidak pernah melintasi dua judul
+        text = "\n".join(lowered)
+        labels = [NEUTRAL] * len(headlines)
+        search = self.pattern.search
+        position = 0
+        while True:
+            match = search(text, position)
+            if match is None:
+                return labels
+            index = bisect_right(starts, match.start()) - 1
+            if match.group("pos") is not None:
+                labels[index] = POSITIVE
+                # Label final: lanjut ke judul berikutnya
+                position = starts[index + 1] if index + 1 < len(starts) else len(text)
+            else:
+                if labels[index] == NEUTRAL:
+                    labels[index] = NEGATIVE
+                position = match.start() + 1
+
+    def emoji(self, headline: str) -> str:
+        return SENTIMENT_EMOJI[self.classify(headline)]
+
+    def summarize(self, headlines: List[str]) -> Dict[str, int]:
+        """Jumlah judul per label (scoring berita massal, mis. seluruh universe saat daily scan)"""
+        counts = {POSITIVE: 0, NEGATIVE: 0, NEUTRAL: 0}
+        for label in self.classify_many(headlines):
+            counts[label] += 1
+        return counts
+
+
+# Classifier bersama (regex dikompilasi sekali per proses)
+HEADLINE_CLASSIFIER = HeadlineClassifier()
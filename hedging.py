@@ -0,0 +1,167 @@
+"""
+Hedged Request
+Jika fetch history/quote belum kembali setelah latency kuantil p95 (per jenis request),
+request duplikat dikirim dan respons pertama yang berhasil dipakai. Ekor latency (p99
+beberapa kali median) tidak lagi menentukan durasi scan & /analisa.
+
+Hedge dibatasi sebagai fraksi dari seluruh request yang memenuhi syarat (max_fraction),
+dan fn yang di-hedge harus idempoten & independen (mis. membuat yf.Ticker baru tiap panggilan,
+karena objek Ticker yang sama tidak aman dipakai dua thread sekaligus).
+"""
+
+import threading
+import time as time_mod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+DEFAULT_MAX_FRACTION = 0.05   # Maksimal 5% request menghasilkan duplikat
+DEFAULT_QUANTILE = 0.95
+DEFAULT_WINDOW = 200          # Sampel latency terakhir per jenis request
+DEFAULT_MIN_SAMPLES = 20      # Belum cukup sampel -> tidak ada hedge
+DEFAULT_MAX_WORKERS = 32
+
+
+def _quantile(values, q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Hedger:
+    """Estimator latency per kind + eksekusi hedged (first response wins)"""
+
+    def __init__(self, enabled: bool = False, max_fraction: float = DEFAULT_MAX_FRACTION,
+                 quantile: float = DEFAULT_QUANTILE, window: int = DEFAULT_WINDOW,
+                 min_samples: int = DEFAULT_MIN_SAMPLES, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.enabled = enabled
+        self.max_fraction = max_fraction
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped = 0  # Lewat p95 tapi hedge ditolak (kuota fraksi / slot / token bucket)
+
+    def configure(self, enabled: bool = None, max_fraction: float = None, quantile: float = None):
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if max_fraction is not None:
+                self.max_fraction = max_fraction
+            if quantile is not None:
+                self.quantile = quantile
+
+    # === LATENCY ===
+
+    def record(self, kind: str, seconds: float):
+        with self._lock:
+            samples = self._latencies.get(kind)
+            if samples is None:
+                samples = self._latencies[kind] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def delay(self, kind: str) -> Optional[float]:
+        """Latency kuantil saat ini untuk kind (None jika sampel belum cukup)"""
+        with self._lock:
+            samples = self._latencies.get(kind)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            return _quantile(samples, self.quantile)
+
+    # === HEDGE ===
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+            return self._pool
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            return self.hedges + 1 <= self.max_fraction * self.requests
+
+    def run(self, kind: str, fn: Callable[[], Any], acquire_extra: Callable[[], bool] = lambda: True,
+            release_extra: Callable[[], None] = lambda: None) -> Any:
+        """
+        Jalankan fn; jika belum selesai setelah delay(kind), kirim duplikat (jika kuota & acquire_extra()
+        mengizinkan) dan kembalikan hasil sukses pertama. Exception hanya diteruskan jika semua gagal.
+        acquire_extra/release_extra: slot & token untuk duplikat (non-blocking); slot dilepas setelah
+        primary dan duplikat sama-sama selesai, karena yang kalah tetap berjalan di background.
+        Latency yang dicatat selalu latency request primary (bukan pemenang), agar p95 tidak
+        makin turun karena hedge sendiri.
+        """
+        delay = self.delay(kind) if self.enabled else None
+        with self._lock:
+            self.requests += 1
+        started = time_mod.monotonic()
+        if delay is None:
+            result = fn()
+            self.record(kind, time_mod.monotonic() - started)
+            return result
+
+        def record_primary(future):
+            if future.exception() is None:
+                self.record(kind, time_mod.monotonic() - started)
+
+        pool = self._executor()
+        primary = pool.submit(fn)
+        primary.add_done_callback(record_primary)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge() or not acquire_extra():
+            if not done:
+                with self._lock:
+                    self.skipped += 1
+            return primary.result()
+
+        with self._lock:
+            self.hedges += 1
+        hedge = pool.submit(fn)
+        running = [2]
+
+        def settle(_):
+            with self._lock:
+                running[0] -= 1
+                last = running[0] == 0
+            if last:
+                release_extra()
+
+        primary.add_done_callback(settle)
+        hedge.add_done_callback(settle)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                # Yang kalah dibiarkan selesai di background (request HTTP tidak bisa dibatalkan)
+                return future.result()
+        raise error
+
+    def stats(self) -> Dict:
+        with self._lock:
+            kinds = {kind: list(samples) for kind, samples in self._latencies.items()}
+            stats = {
+                "enabled": self.enabled,
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_fraction": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "skipped": self.skipped,
+            }
+        stats["latency"] = {
+            kind: {"p50": round(_quantile(s, 0.5), 3), "p95": round(_quantile(s, self.quantile), 3),
+                   "p99": round(_quantile(s, 0.99), 3), "samples": len(s)}
+            for kind, s in kinds.items() if s
+        }
+        return stats
@@ -0,0 +1,168 @@
+"""
+Cache History In-Process (LRU)
+Satu cache per proses yang dipakai bersama oleh daily scan, BSJP, momentum scan dan /analisa.
+Frame terpanjang per ticker disimpan, request period lebih pendek dilayani dengan slicing.
+"""
+
+import threading
+import time as time_mod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from market_hours import is_market_open, last_session_close
+from ohlcv_store import period_to_start, slice_period
+
+DEFAULT_MIN_PERIOD = "6mo"  # Request pendek (5d/3mo) tetap memuat 6mo agar bisa dipakai ulang
+DEFAULT_TTL_OPEN = 300  # Detik, saat jam bursa bar terakhir masih bergerak
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ("data", "covered_start", "loaded_at", "nbytes")
+
+    def __init__(self, data: pd.DataFrame, covered_start: Optional[pd.Timestamp], loaded_at: float):
+        self.data = data
+        self.covered_start = covered_start
+        self.loaded_at = loaded_at
+        self.nbytes = int(data.memory_usage(index=True, deep=False).sum())
+
+
+class HistoryCache:
+    """
+    Cache LRU untuk history OHLCV harian, dibatasi total memori.
+
+    TTL mengikuti jam bursa:
+    - Saat market buka: entry kadaluarsa setelah ttl_open detik (loader mengambil bar terbaru).
+    - Saat market tutup: entry yang dimuat setelah closing terakhir valid sampai market buka lagi.
+    """
+
+    def __init__(self, min_period: str = DEFAULT_MIN_PERIOD, ttl_open: int = DEFAULT_TTL_OPEN,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.min_period = min_period
+        self.ttl_open = ttl_open
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # === PERIOD HELPERS ===
+
+    def load_period(self, period: str) -> str:
+        """Period yang dimuat: yang lebih panjang antara request dan min_period"""
+        wanted = period_to_start(period)
+        minimum = period_to_start(self.min_period)
+        if period.strip().lower() == "max" or (wanted is not None and wanted < minimum):
+            return period
+        return self.min_period
+
+    @staticmethod
+    def _covers(entry: _Entry, period: str) -> bool:
+        period = period.strip().lower()
+        if period == "max":
+            return entry.covered_start is None and not entry.data.empty
+        if period.endswith("d") and period[:-1].isdigit():
+            return True  # Frame minimal min_period selalu punya >= N bar terakhir
+        wanted = period_to_start(period)
+        return entry.covered_start is None or entry.covered_start <= wanted
+
+    def _is_expired(self, entry: _Entry) -> bool:
+        if is_market_open():
+            return time_mod.time() - entry.loaded_at > self.ttl_open
+        return entry.loaded_at < last_session_close().timestamp()
+
+    # === LRU ===
+
+    def peek(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        """Ambil dari cache tanpa memanggil loader (None jika miss/kadaluarsa)"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or not self._covers(entry, period) or self._is_expired(entry):
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            data = entry.data
+        # Copy agar caller bebas memodifikasi (mis. update candle realtime)
+        return slice_period(data, period).copy()
+
+    def put(self, ticker: str, data: pd.DataFrame, period: str):
+        """Simpan frame hasil load/batch fetch untuk period tertentu"""
+        if data is None or data.empty:
+            return
+        entry = _Entry(data, period_to_start(period), time_mod.time())
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+                # Jangan ganti frame panjang dengan frame yang lebih pendek
+                if old.covered_start is not None and entry.covered_start is not None \
+                        and old.covered_start < entry.covered_start:
+                    entry.covered_start = old.covered_start
+                    if not old.data.empty and old.data.index[0] < data.index[0]:
+                        entry = _Entry(
+                            pd.concat([old.data[old.data.index < data.index[0]], data]),
+                            old.covered_start, entry.loaded_at
+                        )
+            self._entries[ticker] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(ticker)
+            if lock is None:
+                lock = self._load_locks[ticker] = threading.Lock()
+            return lock
+
+    def get(self, ticker: str, period: str, loader: Callable[[str, str], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Ambil history dari cache, atau panggil loader(ticker, period) jika miss/kadaluarsa.
+        Thread lain yang meminta ticker yang sama menunggu load yang sedang berjalan.
+        """
+        data = self.peek(ticker, period)
+        if data is not None:
+            return data
+
+        with self._ticker_lock(ticker):
+            data = self.peek(ticker, period)  # Mungkin sudah dimuat thread lain
+            if data is not None:
+                return data
+            with self._lock:
+                self.misses += 1
+            load_period = self.load_period(period)
+            loaded = loader(ticker, load_period)
+            self.put(ticker, loaded, load_period)
+        return slice_period(loaded, period).copy()
+
+    def invalidate(self, ticker: Optional[str] = None):
+        """Hapus satu ticker, atau seluruh cache jika ticker None"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(ticker, None)
+            if entry is not None:
+                self._bytes -= entry.nbytes
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Cache bersama untuk seluruh proses (bot, scheduler, manual_broadcast masing-masing punya satu)
+HISTORY_CACHE = HistoryCache()
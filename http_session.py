@@ -0,0 +1,223 @@
+"""
+Session HTTP Bersama
+Satu set session per proses untuk semua request keluar, agar DNS/TCP/TLS tidak diulang per request:
+
+- http(): requests.Session dengan connection pool keep-alive (pool_maxsize koneksi per host),
+  dipakai RSS berita & scraping daftar ticker.
+- async_http(): httpx.AsyncClient keep-alive untuk fan-out async (berita top picks), hidup selama
+  event loop pemiliknya (dibuat ulang jika dipakai dari event loop lain).
+- yahoo(): session curl_cffi (impersonate chrome) yang diberikan ke setiap yf.Ticker/yf.download.
+  yfinance menyimpan cookie & crumb Yahoo di singleton YfData per session, sehingga crumb
+  diambil sekali dan dipakai ulang oleh semua ticker/thread. curl_cffi memakai handle curl
+  per thread (connection cache per thread, dibatasi max_connects); concurrency total tetap
+  diatur FETCH_SCHEDULER.
+
+stats() melaporkan jumlah request vs koneksi baru per host (rasio reuse koneksi).
+Session dibuat lazy dan dibuat ulang setelah fork (worker process pool scan).
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+try:
+    from curl_cffi import CurlInfo, CurlOpt
+    from curl_cffi import requests as curl_requests
+except ImportError:  # yfinance lama tanpa curl_cffi: biarkan yfinance memakai session default
+    curl_requests = None
+
+DEFAULT_POOL_CONNECTIONS = 16   # Jumlah host yang pool koneksinya disimpan
+DEFAULT_POOL_MAXSIZE = 10       # Koneksi keep-alive per host
+DEFAULT_ASYNC_TIMEOUT = 5.0    # Detik per request async (override per request lewat timeout=)
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/91.0.4472.124 Safari/537.36")
+
+
+class _HostStats:
+    __slots__ = ("requests", "connects")
+
+    def __init__(self):
+        self.requests = 0
+        self.connects = 0
+
+    def as_dict(self) -> Dict:
+        reuse = 1 - self.connects / self.requests if self.requests else 0.0
+        return {"requests": self.requests, "new_connections": self.connects, "reuse_ratio": round(reuse, 3)}
+
+
+if curl_requests is not None:
+    class _YahooSession(curl_requests.Session):
+        """Session curl_cffi yang mencatat koneksi baru per host (CURLINFO_NUM_CONNECTS)"""
+
+        def __init__(self, manager: "SessionManager", **kwargs):
+            super().__init__(**kwargs)
+            self._manager = manager
+
+        def request(self, method, url, *args, **kwargs):
+            response = super().request(method, url, *args, **kwargs)
+            infos = getattr(response, "infos", None) or {}
+            self._manager._record(url, int(infos.get(CurlInfo.NUM_CONNECTS, 0) or 0))
+            return response
+
+
+class SessionManager:
+    """Pemilik session bersama (thread-safe, lazy)"""
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 user_agent: str = DEFAULT_USER_AGENT):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._pid = None
+        self._http: Optional[requests.Session] = None
+        self._adapter: Optional[HTTPAdapter] = None
+        self._yahoo = None
+        self._yahoo_hosts: Dict[str, _HostStats] = {}
+        self._async: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+        self._async_hosts: Dict[str, _HostStats] = {}
+        self.sessions_created = 0
+
+    def _check_fork(self):
+        # Socket & handle curl tidak boleh dipakai bersama parent setelah fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._http = self._adapter = self._yahoo = None
+            self._async = self._async_loop = None
+            self._yahoo_hosts = {}
+            self._async_hosts = {}
+
+    # === SESSIONS ===
+
+    def http(self) -> requests.Session:
+        with self._lock:
+            self._check_fork()
+            if self._http is None:
+                session = requests.Session()
+                self._adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount("https://", self._adapter)
+                session.mount("http://", self._adapter)
+                session.headers["User-Agent"] = self.user_agent
+                self._http = session
+                self.sessions_created += 1
+            return self._http
+
+    def yahoo(self):
+        """Session untuk yfinance (None jika curl_cffi tidak tersedia -> session default yfinance)"""
+        if curl_requests is None:
+            return None
+        with self._lock:
+            self._check_fork()
+            if self._yahoo is None:
+                self._yahoo = _YahooSession(
+                    self, impersonate="chrome", curl_infos=[CurlInfo.NUM_CONNECTS],
+                    curl_options={CurlOpt.MAXCONNECTS: self.pool_maxsize},
+                )
+                self.sessions_created += 1
+            return self._yahoo
+
+    def async_http(self) -> httpx.AsyncClient:
+        """
+        AsyncClient keep-alive bersama untuk event loop yang sedang berjalan.
+        Koneksi httpx terikat ke event loop: dipanggil dari loop lain (mis. asyncio.run baru
+        di manual_broadcast) -> client baru.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._check_fork()
+            if self._async is None or self._async_loop is not loop or self._async.is_closed:
+                limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+                self._async = httpx.AsyncClient(
+                    headers={"User-Agent": self.user_agent}, timeout=DEFAULT_ASYNC_TIMEOUT, limits=limits,
+                    follow_redirects=True, event_hooks={"request": [self._trace_async]},
+                )
+                self._async_loop = loop
+                self.sessions_created += 1
+            return self._async
+
+    async def aclose(self):
+        """Tutup AsyncClient (dipanggil saat bot shutdown, dari event loop pemiliknya)"""
+        with self._lock:
+            client, self._async, self._async_loop = self._async, None, None
+        if client is not None:
+            await client.aclose()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET lewat session keep-alive bersama"""
+        return self.http().get(url, **kwargs)
+
+    def ticker(self, symbol: str) -> yf.Ticker:
+        """yf.Ticker yang memakai session Yahoo bersama (cookie/crumb dipakai ulang)"""
+        return yf.Ticker(symbol, session=self.yahoo())
+
+    def download(self, tickers, **kwargs):
+        return yf.download(tickers, session=self.yahoo(), **kwargs)
+
+    # === STATS ===
+
+    def _record(self, url: str, connects: int):
+        host = urlsplit(url).hostname
+        with self._lock:
+            stats = self._yahoo_hosts.get(host)
+            if stats is None:
+                stats = self._yahoo_hosts[host] = _HostStats()
+            stats.requests += 1
+            stats.connects += connects
+
+    async def _trace_async(self, request: httpx.Request):
+        # Trace httpcore: "connection.connect_tcp" hanya muncul saat koneksi baru dibuka
+        host = request.url.host
+        with self._lock:
+            stats = self._async_hosts.get(host)
+            if stats is None:
+                stats = self._async_hosts[host] = _HostStats()
+            stats.requests += 1
+
+        async def trace(event: str, info: Dict):
+            if event == "connection.connect_tcp.complete":
+                with self._lock:
+                    stats.connects += 1
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            yahoo = {host: s.as_dict() for host, s in self._yahoo_hosts.items()}
+            async_hosts = {host: s.as_dict() for host, s in self._async_hosts.items()}
+            http = {}
+            if self._adapter is not None:
+                # urllib3 mencatat request & koneksi baru per pool (satu pool per host)
+                for key in list(self._adapter.poolmanager.pools.keys()):
+                    pool = self._adapter.poolmanager.pools.get(key)
+                    if pool is None:
+                        continue
+                    s = _HostStats()
+                    s.requests, s.connects = pool.num_requests, pool.num_connections
+                    http[pool.host] = s.as_dict()
+        total = _HostStats()
+        for s in list(yahoo.values()) + list(http.values()) + list(async_hosts.values()):
+            total.requests += s["requests"]
+            total.connects += s["new_connections"]
+        return {"sessions_created": self.sessions_created, "yahoo": yahoo, "http": http, "async": async_hosts,
+                "total": total.as_dict(), "yahoo_crumb_cached": _yahoo_crumb_cached()}
+
+
+def _yahoo_crumb_cached() -> bool:
+    try:
+        from yfinance.data import YfData
+        instance = type(YfData)._instances.get(YfData)  # Jangan membuat singleton baru hanya untuk stats
+        return bool(instance is not None and instance._crumb)
+    except Exception:
+        return False
+
+
+# Session bersama untuk seluruh proses
+HTTP_SESSIONS = SessionManager()
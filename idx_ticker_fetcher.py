@@ -3,34 +3,39 @@ import pandas as pd
 from typing import List, Set, Optional
 import logging
 import time
-import requests
 from bs4 import BeautifulSoup
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 from datetime import datetime
 
+from fetch_scheduler import FETCH_SCHEDULER, ThrottledError
+from http_session import HTTP_SESSIONS
+
 logger = logging.getLogger(__name__)
 
 
 def validate_ticker_with_yfinance(ticker: str) -> bool:
     """
     Validasi apakah ticker valid menggunakan yfinance
+    Raises: ThrottledError jika kena rate limit (status ticker belum diketahui, jangan dibuang)
     """
     try:
-        stock = yf.Ticker(ticker)
+        stock = HTTP_SESSIONS.ticker(ticker)
         # Quick validation - coba dapatkan info dasar
         # Gunakan info.get() untuk menghindari error jika key tidak ada
-        info = stock.info
+        info = FETCH_SCHEDULER.call(lambda: stock.info, kind="info")
         if info and ('symbol' in info or 'longName' in info or 'shortName' in info or 'currentPrice' in info):
             return True
         
         # Fallback: check history
-        hist = stock.history(period="1d")
+        hist = FETCH_SCHEDULER.call(stock.history, period="1d", kind="history")
         if not hist.empty:
             return True
             
         return False
+    except ThrottledError:
+        raise
     except Exception as e:
         return False
 
@@ -48,7 +53,7 @@ def fetch_tickers_from_wikipedia() -> List[str]:
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = FETCH_SCHEDULER.call(HTTP_SESSIONS.get, url, headers=headers, timeout=10, kind="http", is_empty=None)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -108,7 +113,7 @@ def fetch_tickers_from_github() -> List[str]:
     for url in sources:
         try:
             logger.info(f"Mencoba fetch dari: {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = FETCH_SCHEDULER.call(HTTP_SESSIONS.get, url, headers=headers, timeout=10, kind="http", is_empty=None)
             
             if response.status_code == 200:
                 text = response.text
@@ -0,0 +1,216 @@
+"""
+Engine Indikator Vectorized (Cross-Sectional)
+Menghitung SMA/EMA/RSI/MACD/ATR/ADX untuk seluruh universe sekaligus di atas array 2D
+[ticker, hari]. Hasilnya sama (dalam toleransi float) dengan method calculate_* di
+StockAnalyzer yang memakai pandas rolling/ewm per ticker.
+
+Aturan NaN mengikuti pandas:
+- NaN di depan (sebelum listing) diabaikan, seri dianggap mulai dari bar valid pertama.
+- Rolling window yang memuat NaN menghasilkan NaN.
+- EWM (adjust=False) melewati NaN dengan bobot yang tetap meluruh (ignore_na=False).
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from price_panel import PricePanel
+
+
+def shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    """Geser sepanjang sumbu waktu (setara Series.shift(n))"""
+    out = np.full_like(x, np.nan, dtype=float)
+    if n < x.shape[1]:
+        out[:, n:] = x[:, :-n] if n > 0 else x
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Setara Series.rolling(window).mean() untuk tiap baris (rolling sum via cumsum)"""
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    valid = ~np.isnan(x)
+    cs = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(np.where(valid, x, 0.0), axis=1, out=cs[:, 1:])
+    cnt = np.zeros((x.shape[0], x.shape[1] + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=cnt[:, 1:])
+    sums = cs[:, window:] - cs[:, :-window]
+    full = (cnt[:, window:] - cnt[:, :-window]) == window
+    out[:, window - 1:] = np.where(full, sums / window, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Setara Series.rolling(window).std() (ddof=1)"""
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+    out[:, window - 1:] = windows.std(axis=-1, ddof=1)
+    return out
+
+
+def ewm_mean(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Setara Series.ewm(alpha=alpha, adjust=False).mean() untuk tiap baris.
+    Kernel rekursif sepanjang sumbu waktu, vectorized lintas ticker.
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.size == 0:
+        return out
+    decay = 1.0 - alpha
+    mean = np.full(x.shape[0], np.nan)
+    old_wt = np.ones(x.shape[0])
+    started = np.zeros(x.shape[0], dtype=bool)
+    for d in range(x.shape[1]):
+        cur = x[:, d]
+        obs = ~np.isnan(cur)
+        first = obs & ~started
+        cont = obs & started
+        # Bobot lama meluruh juga saat NaN (ignore_na=False), tapi hanya setelah seri mulai
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        mean = np.where(first, cur, mean)
+        mean = np.where(cont, (old_wt * mean + alpha * np.where(cont, cur, 0.0)) / (old_wt + alpha), mean)
+        old_wt = np.where(obs, 1.0, old_wt)
+        started |= obs
+        out[:, d] = mean
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Setara calculate_ema (ewm span, adjust=False)"""
+    return ewm_mean(x, 2.0 / (span + 1.0))
+
+
+def wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing (ewm alpha=1/period, adjust=False)"""
+    return ewm_mean(x, 1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Setara calculate_rsi (rata-rata gain/loss dengan rolling mean biasa)"""
+    delta = close - shift(close)
+    present = ~np.isnan(close)
+    # pandas: delta.where(delta > 0, 0) -> NaN delta di bar pertama menjadi 0
+    gain = np.where(present, np.where(delta > 0, delta, 0.0), np.nan)
+    loss = np.where(present, np.where(delta < 0, -delta, 0.0), np.nan)
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Setara calculate_macd: (macd_line, signal_line, histogram)"""
+    macd_line = ema(close, 12) - ema(close, 26)
+    signal_line = ema(macd_line, 9)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = shift(close)
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    # pandas max(axis=1) skipna: bar pertama memakai high-low saja
+    all_nan = np.isnan(ranges).all(axis=0)
+    tr = np.max(np.where(np.isnan(ranges), -np.inf, ranges), axis=0)
+    return np.where(all_nan, np.nan, tr)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Setara calculate_atr (rolling mean dari True Range)"""
+    return rolling_mean(true_range(high, low, close), period)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+        period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Setara calculate_adx: (adx, plus_di, minus_di)"""
+    present = ~np.isnan(close)
+    tr = true_range(high, low, close)
+    up_move = high - shift(high)
+    down_move = shift(low) - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    plus_dm = np.where(present, plus_dm, np.nan)
+    minus_dm = np.where(present, minus_dm, np.nan)
+
+    tr_smooth = wilder(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * (wilder(plus_dm, period) / tr_smooth)
+        minus_di = 100 * (wilder(minus_dm, period) / tr_smooth)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    dx = np.where(np.isinf(dx), np.nan, dx)
+    return wilder(dx, period), plus_di, minus_di
+
+
+def compute_indicators(panel: PricePanel, compact: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Hitung seluruh indikator is_uptrend untuk semua ticker dalam satu pass.
+    compact=True: indikator dihitung di atas bar milik ticker sendiri (compact_last selebar kalender,
+    rata kanan) sehingga hari suspend tidak menjadi baris NaN yang menggeser EWM/MACD & prev close.
+    Kolom hasil lalu bukan lagi tanggal kalender: kolom terakhir = bar valid terakhir tiap ticker.
+    """
+    close = panel.field('Close')
+    high = panel.field('High')
+    low = panel.field('Low')
+    volume = panel.field('Volume')
+    if compact:
+        valid = ~np.isnan(close)
+        width = close.shape[1]
+        close, high, low, volume = (compact_last(x, valid, width) for x in (close, high, low, volume))
+
+    macd_line, signal_line, histogram = macd(close)
+    adx_line, plus_di, minus_di = adx(high, low, close, 14)
+    return {
+        "close": close,
+        "volume": volume,
+        "sma20": rolling_mean(close, 20),
+        "sma50": rolling_mean(close, 50),
+        "sma200": rolling_mean(close, 200),
+        "rsi": rsi(close, 14),
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": histogram,
+        "volume_sma": rolling_mean(volume, 20),
+        "adx": adx_line,
+        "plus_di": plus_di,
+        "minus_di": minus_di,
+        "atr": atr(high, low, close, 14),
+    }
+
+
+def last_valid_index(close: np.ndarray) -> np.ndarray:
+    """Index bar valid terakhir per ticker (-1 jika tidak ada data)"""
+    valid = ~np.isnan(close)
+    last = close.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    return np.where(valid.any(axis=1), last, -1)
+
+
+def take_last(x: np.ndarray, last_idx: np.ndarray, offset: int = 0) -> np.ndarray:
+    """Ambil nilai x pada (bar valid terakhir - offset) untuk tiap ticker"""
+    idx = last_idx - offset
+    ok = idx >= 0
+    values = np.take_along_axis(x, np.clip(idx, 0, None)[:, None], axis=1)[:, 0]
+    return np.where(ok, values, np.nan)
+
+
+def compact_last(x: np.ndarray, valid: np.ndarray, width: int) -> np.ndarray:
+    """
+    `width` bar valid terakhir per ticker, rata kanan ([:, -1] = bar valid terakhir), NaN di kiri
+    jika bar valid kurang dari width. Hari bolong (suspend) dibuang sehingga hasilnya sama dengan
+    DataFrame per ticker (get_history) yang hanya berisi hari ticker punya bar.
+    """
+    x = np.asarray(x, dtype=float)
+    if x.shape[1] < width:
+        pad = width - x.shape[1]
+        x = np.concatenate([np.full((x.shape[0], pad), np.nan), x], axis=1)
+        valid = np.concatenate([np.zeros((valid.shape[0], pad), dtype=bool), valid], axis=1)
+    # Sort stabil per baris: bar tidak valid ke kiri, urutan bar valid tetap
+    order = np.argsort(valid, axis=1, kind='stable')[:, -width:]
+    out = np.take_along_axis(x, order, axis=1)
+    out[~np.take_along_axis(valid, order, axis=1)] = np.nan
+    return out
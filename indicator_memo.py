@@ -0,0 +1,86 @@
+"""
+Memo Indikator per Analisa
+Satu memo per DataFrame harga: setiap pasangan (indikator, parameter) dihitung paling
+banyak sekali per versi data, lalu dipakai bersama oleh is_uptrend, calculate_entry_tp,
+blok Bollinger di analyze_stock_detailed dan chart_generator.
+
+Key yang dipakai bersama (tuple):
+    ("sma", kolom, period), ("std", kolom, period), ("rsi", period),
+    ("macd",) -> (macd_line, signal_line, histogram), ("adx", period) -> (adx, +DI, -DI)
+
+Versi data = (jumlah bar, index terakhir, OHLCV bar terakhir). Jika bar terakhir diubah
+in-place (mis. update harga realtime), memo otomatis dikosongkan.
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import pandas as pd
+
+
+def data_version(data: pd.DataFrame) -> Tuple:
+    """Sidik jari murah dari data: cukup bar terakhir karena history hanya bertambah di ujung"""
+    if data.empty:
+        return (0,)
+    last = data.iloc[-1]
+    return (len(data), data.index[-1]) + tuple(
+        float(last[c]) if c in last.index else None for c in ('Open', 'High', 'Low', 'Close', 'Volume')
+    )
+
+
+class IndicatorMemo:
+    """Cache hasil indikator untuk satu DataFrame"""
+
+    def __init__(self, data: pd.DataFrame):
+        self._data = weakref.ref(data)
+        self._version = data_version(data)
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Ambil indikator dari memo, atau hitung dengan compute() jika belum ada / data berubah"""
+        with self._lock:
+            data = self._data()
+            version = data_version(data) if data is not None else None
+            if version != self._version:
+                self._values.clear()
+                self._version = version
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+            value = compute()
+            self._values[key] = value
+            return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._values), "hits": self.hits, "misses": self.misses}
+
+
+# Registry id(DataFrame) -> memo. df.attrs tidak dipakai karena pandas men-deep-copy attrs
+# pada hampir setiap operasi; entry dihapus otomatis saat DataFrame di-garbage-collect.
+_MEMOS: Dict[int, IndicatorMemo] = {}
+_MEMOS_LOCK = threading.Lock()
+
+
+def memo_for(data: pd.DataFrame) -> IndicatorMemo:
+    """Memo yang melekat pada DataFrame ini (dibuat saat pertama kali diminta)"""
+    key = id(data)
+    with _MEMOS_LOCK:
+        memo = _MEMOS.get(key)
+        if memo is not None and memo._data() is data:
+            return memo
+        memo = IndicatorMemo(data)
+        _MEMOS[key] = memo
+    weakref.finalize(data, _drop, key, memo)
+    return memo
+
+
+def _drop(key: int, memo: IndicatorMemo):
+    with _MEMOS_LOCK:
+        if _MEMOS.get(key) is memo:
+            del _MEMOS[key]
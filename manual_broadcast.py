@@ -2,8 +2,9 @@
 import asyncio
 import config
 from stock_analyzer import StockAnalyzer
+from news_fetcher import fetch_news_many
+from http_session import HTTP_SESSIONS
 from telegram import Bot
-import yfinance as yf
 
 # Logic copied from telegram_bot.py for consistency
 def format_daily_signal(result: dict) -> str:
@@ -73,14 +74,12 @@ async def main():
     
     summary = "🔥 *TEST MANUAL - SINYAL MARKET SESI 2*\n\n"
     
-    # Enrichment
+    # Enrichment (berita semua pick diambil bersamaan)
+    news = await fetch_news_many(analyzer, [r['ticker'] for r in top_picks])
+    await HTTP_SESSIONS.aclose()  # Script sekali jalan: tutup koneksi sebelum event loop selesai
     for r in top_picks:
          r['session'] = 2
-         try:
-             stock_obj = yf.Ticker(r['ticker'])
-             r['news'] = analyzer.get_stock_news(stock_obj)
-         except Exception as e:
-             r['news'] = "-"
+         r['news'] = news.get(r['ticker'], "-")
          summary += f"• {r['ticker']} (Score: {r['analysis']['score']})\n"
 
     print("Sending Summary...")
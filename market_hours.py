@@ -0,0 +1,59 @@
+"""
+Helper Jam Bursa (IDX)
+Dipakai oleh layer data untuk menentukan apakah bar harian masih bisa berubah
+"""
+
+from datetime import datetime, timedelta, time
+from typing import Optional
+import pytz
+
+WIB = pytz.timezone('Asia/Jakarta')
+
+# Pre-opening (IEP) mulai 08:45, closing auction selesai sekitar 16:15
+MARKET_OPEN = time(8, 45)
+MARKET_CLOSE = time(16, 15)
+
+
+def now_wib() -> datetime:
+    """Waktu sekarang dalam WIB (timezone-aware)"""
+    return datetime.now(WIB)
+
+
+def to_wib(dt: datetime) -> datetime:
+    """Normalisasi datetime (naive dianggap WIB) ke WIB"""
+    if dt.tzinfo is None:
+        return WIB.localize(dt)
+    return dt.astimezone(WIB)
+
+
+def is_trading_day(dt: datetime) -> bool:
+    """Senin-Jumat (libur bursa tidak diperhitungkan)"""
+    return to_wib(dt).weekday() < 5
+
+
+def is_market_open(dt: Optional[datetime] = None) -> bool:
+    """True jika bar harian hari ini masih bisa berubah (pre-opening s/d closing)"""
+    dt = to_wib(dt or now_wib())
+    return is_trading_day(dt) and MARKET_OPEN <= dt.time() < MARKET_CLOSE
+
+
+def last_session_close(dt: Optional[datetime] = None) -> datetime:
+    """Waktu closing sesi terakhir yang sudah lewat (<= dt)"""
+    dt = to_wib(dt or now_wib())
+    day = dt.date()
+    if dt.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return WIB.localize(datetime.combine(day, MARKET_CLOSE))
+
+
+def data_version(dt: Optional[datetime] = None, bucket_seconds: int = 60) -> str:
+    """
+    Versi data pasar: berganti tiap bucket_seconds saat market buka,
+    dan tetap (closing terakhir) saat market tutup.
+    """
+    dt = to_wib(dt or now_wib())
+    if is_market_open(dt):
+        return f"live-{int(dt.timestamp()) // bucket_seconds}"
+    return f"close-{last_session_close(dt).date().isoformat()}"
@@ -0,0 +1,128 @@
+"""
+Cache Berita Per Ticker
+Item berita hasil parse (title/link) disimpan per ticker bersama ETag/Last-Modified dari
+respons RSS, dipakai bersama daily scan dan /analisa.
+
+- Entry segar (umur < TTL) dilayani langsung tanpa request.
+- Entry kadaluarsa direvalidasi dengan conditional GET (If-None-Match / If-Modified-Since):
+  304 Not Modified -> item lama dipakai lagi tanpa download & parse ulang.
+- TTL lebih pendek saat jam bursa (berita bergerak cepat) dibanding malam/akhir pekan.
+"""
+
+import threading
+import time as time_mod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from market_hours import is_market_open
+
+DEFAULT_TTL_OPEN = 15 * 60       # Detik, saat jam bursa
+DEFAULT_TTL_CLOSED = 3 * 60 * 60  # Detik, di luar jam bursa
+DEFAULT_MAX_ENTRIES = 2000
+
+
+class _Entry:
+    __slots__ = ("items", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, items: List[Dict], etag: Optional[str], last_modified: Optional[str], fetched_at: float):
+        self.items = items
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+
+class NewsCache:
+    """Cache LRU {ticker: item berita + validator HTTP}, thread-safe"""
+
+    def __init__(self, ttl_open: int = DEFAULT_TTL_OPEN, ttl_closed: int = DEFAULT_TTL_CLOSED,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_open = ttl_open
+        self.ttl_closed = ttl_closed
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0          # Belum ada entry: fetch & parse penuh
+        self.revalidations = 0   # Conditional GET dijawab 304 (item lama dipakai)
+        self.refetches = 0       # Entry kadaluarsa dan feed memang berubah (200)
+
+    def ttl(self) -> int:
+        return self.ttl_open if is_market_open() else self.ttl_closed
+
+    def configure(self, ttl_open: int = None, ttl_closed: int = None):
+        if ttl_open is not None:
+            self.ttl_open = ttl_open
+        if ttl_closed is not None:
+            self.ttl_closed = ttl_closed
+
+    # === LOOKUP ===
+
+    def fresh(self, ticker: str) -> Optional[List[Dict]]:
+        """Item berita jika entry masih dalam TTL (hit), None jika perlu request"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or time_mod.time() - entry.fetched_at > self.ttl():
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            return entry.items
+
+    def conditional_headers(self, ticker: str) -> Dict[str, str]:
+        """Header validator untuk revalidasi entry kadaluarsa (kosong jika tidak ada)"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    # === UPDATE ===
+
+    def not_modified(self, ticker: str) -> Optional[List[Dict]]:
+        """Respons 304: perpanjang entry & kembalikan item lama (None jika entry sudah terbuang)"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None:
+                return None  # Caller parse ulang & put() (dihitung miss di sana)
+            entry.fetched_at = time_mod.time()
+            self._entries.move_to_end(ticker)
+            self.revalidations += 1
+            return entry.items
+
+    def put(self, ticker: str, items: List[Dict], headers=None):
+        """Simpan item hasil parse; headers = header respons 200 (sumber ETag/Last-Modified)"""
+        headers = headers or {}
+        entry = _Entry(items, headers.get("ETag"), headers.get("Last-Modified"), time_mod.time())
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self.refetches += 1
+            else:
+                self.misses += 1
+            self._entries[ticker] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses + self.revalidations + self.refetches
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "refetches": self.refetches,
+                # Proporsi lookup yang tidak perlu download & parse RSS
+                "hit_ratio": round((self.hits + self.revalidations) / requests, 3) if requests else 0.0,
+            }
+
+
+# Cache bersama untuk seluruh proses
+NEWS_CACHE = NewsCache()
@@ -0,0 +1,146 @@
+"""
+Fetch Berita Async
+Enrichment berita untuk top picks dari event loop bot tanpa memblok handler lain:
+semua ticker di-fetch bersamaan (AsyncClient keep-alive bersama HTTP_SESSIONS, dibatasi
+semaphore) dengan satu deadline total. Request tetap lewat token bucket & cooldown FETCH_SCHEDULER (acall) dan
+cache berita (entry segar tanpa request, entry lama direvalidasi conditional GET); parse RSS +
+fallback berita Yahoo (blocking) dijalankan di executor, bukan di event loop.
+NewsPrefetch memulai fetch top pick selagi scan masih berjalan (overlap dengan ekor scan).
+"""
+
+import asyncio
+import logging
+import time as time_mod
+from typing import Dict, Iterable, List
+
+import httpx
+
+from fetch_scheduler import FETCH_SCHEDULER
+from http_session import HTTP_SESSIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 5
+DEFAULT_DEADLINE = 15.0      # Detik untuk seluruh fan-out
+DEFAULT_TIMEOUT = 5.0        # Detik per request RSS (sama dengan get_stock_news)
+
+NEWS_FAILED = "Gagal mengambil berita."
+NEWS_TIMEOUT = "Berita belum tersedia (timeout)."
+
+
+async def _fetch_one(analyzer, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, ticker: str,
+                     timeout: float) -> str:
+    cached = analyzer.news_cache.fresh(ticker)
+    if cached is not None:
+        return analyzer.render_news(cached)
+    status = content = headers = None
+    async with semaphore:
+        try:
+            headers = {**analyzer.NEWS_HEADERS, **analyzer.news_cache.conditional_headers(ticker)}
+            response = await FETCH_SCHEDULER.acall(client.get, analyzer.news_url(ticker), kind="news",
+                                                   headers=headers, timeout=timeout)
+            status, content, headers = response.status_code, response.content, response.headers
+        except Exception as e:
+            # RSS gagal: news_from_response tetap mencoba fallback berita Yahoo
+            logger.warning(f"RSS berita {ticker} gagal: {e}")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, analyzer.news_from_response, ticker, status, content, headers)
+
+
+class NewsPrefetch:
+    """
+    Fan-out berita yang bisa dimulai sebelum daftar pick final: daily_scan_job memulai fetch untuk
+    pick yang sudah memegang tempat di top-K penuh selagi ekor scan masih berjalan (offer, dipanggil
+    dari thread scan), dan membatalkan fetch pick yang tergeser. collect() menunggu sisanya.
+    Dibuat di event loop bot; semua task berjalan di loop tersebut.
+    """
+
+    def __init__(self, analyzer, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        self.analyzer = analyzer
+        self.timeout = timeout
+        self.loop = asyncio.get_running_loop()
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Client keep-alive bersama: koneksi ke news.google.com dipakai ulang antar scan
+        self.client = HTTP_SESSIONS.async_http()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled: List[asyncio.Task] = []
+        self.prefetched = 0   # Fetch yang dimulai sebelum collect()
+
+    def start(self, tickers: Iterable[str]):
+        """Mulai fetch untuk ticker yang belum punya task (di event loop)"""
+        for ticker in tickers:
+            if ticker not in self.tasks:
+                self.tasks[ticker] = asyncio.create_task(
+                    _fetch_one(self.analyzer, self.client, self.semaphore, ticker, self.timeout))
+
+    def cancel(self, ticker: str):
+        task = self.tasks.pop(ticker, None)
+        if task is not None and not task.done():
+            task.cancel()
+            self._cancelled.append(task)
+
+    def offer(self, top, entered: bool, evicted=None):
+        """
+        Callback TopK.push_all dari thread scan: pick tergeser dibatalkan, dan begitu heap penuh
+        setiap pick di top-K yang belum punya task mulai di-fetch di event loop.
+        """
+        if evicted is not None:
+            self.loop.call_soon_threadsafe(self.cancel, evicted['ticker'])
+        if entered and top.full():
+            self.loop.call_soon_threadsafe(self._prefetch, [r['ticker'] for r in top.items()])
+
+    def _prefetch(self, tickers: List[str]):
+        before = len(self.tasks)
+        self.start(tickers)
+        self.prefetched += len(self.tasks) - before
+
+    async def collect(self, tickers: Iterable[str], deadline: float = DEFAULT_DEADLINE) -> Dict[str, str]:
+        """
+        Tunggu berita untuk `tickers` (task yang belum ada dimulai sekarang) dengan satu deadline total.
+        Task ticker lain (tergeser) dibatalkan.
+        Returns: {ticker: teks berita}; ticker yang gagal/melewati deadline tetap ada
+                 (NEWS_FAILED / NEWS_TIMEOUT) agar pesan broadcast tidak kosong.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        started = time_mod.monotonic()
+        for ticker in [t for t in self.tasks if t not in tickers]:
+            self.cancel(ticker)
+        self.start(tickers)
+        tasks = {self.tasks[t]: t for t in tickers}
+        done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        if pending or self._cancelled:
+            await asyncio.gather(*pending, *self._cancelled, return_exceptions=True)
+        self._cancelled = []
+
+        news = {}
+        for task, ticker in tasks.items():
+            if task in pending:
+                news[ticker] = NEWS_TIMEOUT
+            elif task.exception() is not None:
+                logger.error(f"News fetch failed for {ticker}: {task.exception()}")
+                news[ticker] = NEWS_FAILED
+            else:
+                news[ticker] = task.result()
+        if tickers:
+            logger.info(f"Berita {len(done)}/{len(tickers)} ticker dalam {time_mod.monotonic() - started:.1f}s "
+                        f"({len(pending)} timeout, {self.prefetched} dimulai saat scan)")
+        return news
+
+    async def aclose(self):
+        """Batalkan semua fetch (mis. scan gagal sebelum collect)"""
+        for ticker in list(self.tasks):
+            self.cancel(ticker)
+        await asyncio.gather(*self._cancelled, return_exceptions=True)
+        self._cancelled = []
+
+
+async def fetch_news_many(analyzer, tickers: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                          deadline: float = DEFAULT_DEADLINE, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, str]:
+    """
+    Berita terformat untuk banyak ticker sekaligus.
+    Returns: {ticker: teks berita}; ticker yang gagal/melewati deadline tetap ada
+             (NEWS_FAILED / NEWS_TIMEOUT) agar pesan broadcast tidak kosong.
+    """
+    return await NewsPrefetch(analyzer, concurrency, timeout).collect(tickers, deadline)
@@ -0,0 +1,374 @@
+"""
+Penyimpanan Lokal Data OHLCV (SQLite)
+Bar harian disimpan per ticker, scan berikutnya hanya mengunduh bar yang lebih baru
+dari tanggal terakhir yang tersimpan (delta fetch).
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time as time_mod
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from fetch_scheduler import FETCH_SCHEDULER
+from http_session import HTTP_SESSIONS
+from market_hours import WIB, is_market_open, last_session_close, now_wib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = "ohlcv_store.db"
+BOOTSTRAP_PERIOD = "2y"  # Unduhan awal; request period lebih pendek (mis. "6mo") dilayani dari store
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def period_to_start(period: str, now: Optional[datetime] = None) -> Optional[pd.Timestamp]:
+    """
+    Konversi period gaya yfinance ("6mo", "1y", ...) menjadi tanggal awal.
+    Return None untuk "max" atau period berbasis jumlah bar ("5d").
+    """
+    now = pd.Timestamp(now or now_wib()).tz_convert(WIB).normalize()
+    period = period.strip().lower()
+    if period == "max" or period.endswith("d"):
+        return None
+    if period == "ytd":
+        return now.replace(month=1, day=1)
+    if period.endswith("wk"):
+        return now - pd.DateOffset(weeks=int(period[:-2]))
+    if period.endswith("mo"):
+        return now - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return now - pd.DateOffset(years=int(period[:-1]))
+    raise ValueError(f"Period tidak dikenal: {period}")
+
+
+def slice_period(data: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Potong data sesuai period (meniru hasil yfinance.history(period=...))"""
+    if data.empty:
+        return data
+    period = period.strip().lower()
+    if period.endswith("d") and period[:-1].isdigit():
+        return data.tail(int(period[:-1]))
+    start = period_to_start(period)
+    if start is None:
+        return data
+    return data.loc[data.index >= start]
+
+
+def normalize_history(data: pd.DataFrame) -> pd.DataFrame:
+    """Ambil kolom OHLCV saja dengan index tanggal (WIB, jam 00:00)"""
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    data = data[OHLCV_COLUMNS].dropna(subset=['Close'])
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is None:
+        index = index.tz_localize(WIB)
+    else:
+        index = index.tz_convert(WIB)
+    data = data.copy()
+    data.index = index.normalize()
+    data.index.name = 'Date'
+    data = data[~data.index.duplicated(keep='last')]
+    return data
+
+
+class OHLCVStore:
+    """
+    Cache OHLCV harian di SQLite dengan delta fetch.
+
+    - Ticker baru di-bootstrap dengan BOOTSTRAP_PERIOD.
+    - Ticker lama hanya mengambil bar sejak 2 bar terakhir yang tersimpan
+      (bar terakhir bisa berubah intraday, bar sebelumnya dipakai cek corporate action).
+    - Di luar jam bursa, data yang diambil setelah closing terakhir dianggap final.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, bootstrap_period: str = BOOTSTRAP_PERIOD,
+                 min_refresh_seconds: int = 60):
+        self.path = path
+        self.bootstrap_period = bootstrap_period
+        self.min_refresh_seconds = min_refresh_seconds
+        self._local = threading.local()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.batch_stats = []
+        self._init_schema()
+
+    # === SQLITE ===
+
+    def _conn(self) -> sqlite3.Connection:
+        """Koneksi per-thread (sqlite3 tidak boleh dipakai lintas thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")  # Reader (bot, scheduler) tidak blok writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                " ticker TEXT NOT NULL, date TEXT NOT NULL,"
+                " open REAL, high REAL, low REAL, close REAL, volume INTEGER,"
+                " PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fetch_meta ("
+                " ticker TEXT PRIMARY KEY, fetched_at REAL, history_start TEXT)"
+            )
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(ticker)
+            if lock is None:
+                lock = self._locks[ticker] = threading.Lock()
+            return lock
+
+    def _read_meta(self, ticker: str):
+        row = self._conn().execute(
+            "SELECT fetched_at, history_start FROM fetch_meta WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        """Baca semua bar tersimpan untuk ticker (tanpa network)"""
+        rows = self._conn().execute(
+            "SELECT date, open, high, low, close, volume FROM bars WHERE ticker = ? ORDER BY date",
+            (ticker,)
+        ).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        data = pd.DataFrame(rows, columns=['Date'] + OHLCV_COLUMNS)
+        data['Date'] = pd.to_datetime(data['Date']).dt.tz_localize(WIB)
+        data['Volume'] = data['Volume'].fillna(0).astype('int64')
+        return data.set_index('Date')
+
+    def _write(self, ticker: str, bars: pd.DataFrame, history_start: Optional[str], replace_all: bool = False):
+        records = [
+            (ticker, idx.strftime('%Y-%m-%d'), float(row.Open), float(row.High),
+             float(row.Low), float(row.Close), int(row.Volume) if pd.notna(row.Volume) else 0)
+            for idx, row in bars.iterrows()
+        ]
+        conn = self._conn()
+        with conn:
+            if replace_all:
+                conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+            conn.execute(
+                "INSERT OR REPLACE INTO fetch_meta VALUES (?, ?, ?)",
+                (ticker, time_mod.time(), history_start)
+            )
+
+    def invalidate(self, ticker: str):
+        """Hapus data ticker (paksa bootstrap ulang)"""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.execute("DELETE FROM fetch_meta WHERE ticker = ?", (ticker,))
+
+    # === FETCH ===
+
+    def _fetch_remote(self, ticker: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        # yf.Ticker baru per panggilan: request hedge tidak berbagi state dengan request utama
+        if start is not None:
+            # Delta mulai dari bar tersimpan, jadi respons kosong dicurigai throttling (deteksi default)
+            data = FETCH_SCHEDULER.call(lambda: HTTP_SESSIONS.ticker(ticker).history(start=start),
+                                        kind="history_delta", hedge=True)
+        else:
+            data = FETCH_SCHEDULER.call(lambda: HTTP_SESSIONS.ticker(ticker).history(period=period),
+                                        kind="history", hedge=True)
+        return normalize_history(data)
+
+    def _is_fresh(self, fetched_at: Optional[float]) -> bool:
+        """Cek apakah delta fetch masih perlu dilakukan"""
+        if fetched_at is None:
+            return False
+        if time_mod.time() - fetched_at < self.min_refresh_seconds:
+            return True
+        # Di luar jam bursa: data yang diambil setelah closing terakhir sudah final
+        fetched_dt = datetime.fromtimestamp(fetched_at, WIB)
+        return not is_market_open() and fetched_dt >= last_session_close()
+
+    def _needs_bootstrap(self, stored: pd.DataFrame, history_start: Optional[str], period: str) -> bool:
+        if stored.empty or history_start is None:
+            return True
+        if period.strip().lower() == "max":
+            return history_start != "max"
+        wanted = period_to_start(period)
+        if wanted is None or history_start == "max":
+            return False
+        return wanted < pd.Timestamp(history_start).tz_localize(WIB)
+
+    def _bootstrap_period(self, period: str) -> str:
+        """Period unduhan awal: minimal bootstrap_period, atau period diminta jika lebih panjang"""
+        if period.strip().lower() == "max":
+            return period
+        wanted_start = period_to_start(period)
+        if wanted_start is None or wanted_start > period_to_start(self.bootstrap_period):
+            return self.bootstrap_period
+        return period
+
+    def _apply_bootstrap(self, ticker: str, data: pd.DataFrame, fetch_period: str) -> pd.DataFrame:
+        if data.empty:
+            return data
+        start = period_to_start(fetch_period)
+        history_start = "max" if start is None else start.strftime('%Y-%m-%d')
+        self._write(ticker, data, history_start, replace_all=True)
+        return data
+
+    def _bootstrap(self, ticker: str, period: str) -> pd.DataFrame:
+        fetch_period = self._bootstrap_period(period)
+        data = self._fetch_remote(ticker, period=fetch_period)
+        return self._apply_bootstrap(ticker, data, fetch_period)
+
+    @staticmethod
+    def _delta_anchor(stored: pd.DataFrame) -> pd.Timestamp:
+        return stored.index[-2] if len(stored) >= 2 else stored.index[-1]
+
+    def _apply_delta(self, ticker: str, stored: pd.DataFrame, history_start: Optional[str],
+                     delta: pd.DataFrame) -> pd.DataFrame:
+        if delta.empty:
+            # Delta selalu memuat bar anchor yang sudah tersimpan: kosong = respons gagal/throttled,
+            # bukan libur/suspend. fetch_meta tidak disentuh agar delta dicoba lagi pada request berikutnya
+            logger.warning(f"{ticker}: delta history kosong, memakai data tersimpan")
+            return stored
+
+        # Corporate action (dividen/split) mengubah harga adjusted historis -> bootstrap ulang
+        anchor = self._delta_anchor(stored)
+        if anchor in delta.index and len(stored) >= 2:
+            old_close = stored.at[anchor, 'Close']
+            new_close = delta.at[anchor, 'Close']
+            if old_close and abs(new_close - old_close) / old_close > 0.005:
+                logger.info(f"{ticker}: harga historis berubah (corporate action), bootstrap ulang")
+                return self._bootstrap(ticker, self.bootstrap_period)
+
+        self._write(ticker, delta, history_start)
+        merged = pd.concat([stored[stored.index < delta.index[0]], delta])
+        return merged
+
+    def _delta(self, ticker: str, stored: pd.DataFrame, history_start: Optional[str]) -> pd.DataFrame:
+        anchor = self._delta_anchor(stored)
+        delta = self._fetch_remote(ticker, start=anchor.strftime('%Y-%m-%d'))
+        return self._apply_delta(ticker, stored, history_start, delta)
+
+    def get_history(self, ticker: str, period: str = "6mo") -> pd.DataFrame:
+        """
+        Ambil history OHLCV harian untuk period tertentu.
+        Data dibaca dari store lokal, hanya bar baru yang diunduh dari yfinance.
+        """
+        with self._ticker_lock(ticker):
+            stored = self.load(ticker)
+            fetched_at, history_start = self._read_meta(ticker)
+
+            if self._needs_bootstrap(stored, history_start, period):
+                data = self._bootstrap(ticker, period)
+            elif self._is_fresh(fetched_at):
+                data = stored
+            else:
+                data = self._delta(ticker, stored, history_start)
+
+        return slice_period(data, period)
+
+    # === BATCH FETCH ===
+
+    def _download_batch(self, tickers: List[str], period: Optional[str] = None,
+                        start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """Unduh OHLCV banyak ticker sekaligus via yf.download lalu pecah per ticker"""
+        raw = FETCH_SCHEDULER.call(
+            HTTP_SESSIONS.download, tickers, period=period, start=start, group_by='ticker',
+            auto_adjust=True, progress=False, threads=True, kind="download"
+        )
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                sub = raw[ticker]
+            else:
+                sub = raw
+            frames[ticker] = normalize_history(sub.dropna(how='all'))
+        return frames
+
+    def iter_history_batches(self, tickers: List[str], period: str = "6mo",
+                             batch_size: int = 50) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Ambil history banyak ticker per batch (satu request multi-symbol per batch).
+        Yield dict {ticker: DataFrame} per batch agar analisis bisa dimulai sebelum
+        seluruh universe selesai diunduh. Ticker yang gagal diunduh tidak ada di dict,
+        caller sebaiknya fallback ke get_history per ticker.
+        Timing per batch dicatat di self.batch_stats.
+        """
+        self.batch_stats = []
+        fresh, bootstrap, delta = {}, [], {}
+        for ticker in tickers:
+            stored = self.load(ticker)
+            fetched_at, history_start = self._read_meta(ticker)
+            if self._needs_bootstrap(stored, history_start, period):
+                bootstrap.append(ticker)
+            elif self._is_fresh(fetched_at):
+                fresh[ticker] = slice_period(stored, period)
+            else:
+                delta[ticker] = (stored, history_start)
+
+        if fresh:
+            self.batch_stats.append({"kind": "local", "tickers": len(fresh), "fetched": len(fresh), "seconds": 0.0})
+            yield fresh
+
+        fetch_period = self._bootstrap_period(period)
+        for i in range(0, len(bootstrap), batch_size):
+            batch = bootstrap[i:i + batch_size]
+            t0 = time_mod.perf_counter()
+            try:
+                frames = self._download_batch(batch, period=fetch_period)
+            except Exception as e:
+                logger.warning(f"Batch bootstrap gagal ({len(batch)} ticker): {e}")
+                frames = {}
+            result = {}
+            for ticker, data in frames.items():
+                data = self._apply_bootstrap(ticker, data, fetch_period)
+                if not data.empty:
+                    result[ticker] = slice_period(data, period)
+            self._record_batch("bootstrap", batch, result, t0)
+            yield result
+
+        delta_tickers = list(delta)
+        for i in range(0, len(delta_tickers), batch_size):
+            batch = delta_tickers[i:i + batch_size]
+            start = min(self._delta_anchor(delta[t][0]) for t in batch).strftime('%Y-%m-%d')
+            t0 = time_mod.perf_counter()
+            try:
+                frames = self._download_batch(batch, start=start)
+            except Exception as e:
+                logger.warning(f"Batch delta gagal ({len(batch)} ticker): {e}")
+                frames = {}
+            result = {}
+            for ticker, new_bars in frames.items():
+                stored, history_start = delta[ticker]
+                new_bars = new_bars[new_bars.index >= self._delta_anchor(stored)]
+                data = self._apply_delta(ticker, stored, history_start, new_bars)
+                result[ticker] = slice_period(data, period)
+            self._record_batch("delta", batch, result, t0)
+            yield result
+
+    def _record_batch(self, kind: str, batch: List[str], result: Dict[str, pd.DataFrame], t0: float):
+        elapsed = time_mod.perf_counter() - t0
+        stats = {"kind": kind, "tickers": len(batch), "fetched": len(result), "seconds": round(elapsed, 2)}
+        self.batch_stats.append(stats)
+        logger.info(f"Batch {kind}: {len(result)}/{len(batch)} ticker dalam {elapsed:.2f}s")
+
+    def get_history_many(self, tickers: List[str], period: str = "6mo",
+                         batch_size: int = 50) -> Dict[str, pd.DataFrame]:
+        """Versi non-streaming dari iter_history_batches"""
+        frames = {}
+        for batch in self.iter_history_batches(tickers, period, batch_size):
+            frames.update(batch)
+        return frames
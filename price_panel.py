@@ -0,0 +1,159 @@
+"""
+Panel Harga Universe (NumPy)
+Array float kontigu berbentuk [ticker, hari, field] untuk seluruh universe IDX,
+dengan index ticker dan kalender. Bisa disimpan ke disk dan di-memory-map sehingga
+bot, scheduler dan manual_broadcast membaca satu salinan yang sama.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_hours import WIB
+from ohlcv_store import normalize_history
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+DEFAULT_PANEL_PATH = "price_panel"
+
+
+class PricePanel:
+    """
+    values[t, d, f] = nilai field f untuk ticker t pada hari d (NaN jika tidak ada bar).
+    Baris sebelum listing / sebelum history tersedia berisi NaN.
+    """
+
+    def __init__(self, values: np.ndarray, tickers: List[str], dates: pd.DatetimeIndex):
+        if values.ndim != 3 or values.shape != (len(tickers), len(dates), len(FIELDS)):
+            raise ValueError(f"Shape panel tidak valid: {values.shape}")
+        self.values = values
+        self.tickers = list(tickers)
+        self.dates = dates
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self._first_valid = None
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.ticker_index
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    # === BUILD ===
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], tickers: Optional[List[str]] = None) -> "PricePanel":
+        """Bangun panel dari dict {ticker: DataFrame OHLCV} dengan kalender gabungan"""
+        frames = {t: normalize_history(f) for t, f in frames.items() if f is not None}
+        tickers = [t for t in (tickers or list(frames)) if t in frames and not frames[t].empty]
+        if not tickers:
+            return cls(np.empty((0, 0, len(FIELDS))), [], pd.DatetimeIndex([], tz=WIB))
+
+        dates = frames[tickers[0]].index
+        for t in tickers[1:]:
+            dates = dates.union(frames[t].index)
+
+        values = np.full((len(tickers), len(dates), len(FIELDS)), np.nan)
+        for i, t in enumerate(tickers):
+            frame = frames[t]
+            rows = dates.get_indexer(frame.index)
+            values[i, rows, :] = frame[list(FIELDS)].to_numpy(dtype=float)
+        return cls(values, tickers, dates)
+
+    # === ACCESS ===
+
+    def field(self, name: str) -> np.ndarray:
+        """View 2D [ticker, hari] untuk satu field (tanpa copy)"""
+        return self.values[:, :, FIELD_INDEX[name]]
+
+    def first_valid(self) -> np.ndarray:
+        """Index hari pertama yang punya Close per ticker (len(dates) jika kosong)"""
+        if self._first_valid is None:
+            valid = ~np.isnan(self.field('Close'))
+            first = valid.argmax(axis=1)
+            first[~valid.any(axis=1)] = len(self.dates)
+            self._first_valid = first
+        return self._first_valid
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """
+        DataFrame per ticker seperti hasil get_history (hanya hari ticker punya bar).
+        Baris NaN sebelum listing dibuang lewat slicing (tetap view, tanpa copy); hari bolong di
+        tengah kalender gabungan (suspend/tidak ada transaksi) ikut dibuang, dan hanya untuk
+        ticker seperti itu hasilnya berupa copy. Jangan dimodifikasi; pakai .copy() jika perlu
+        mengubah data.
+        """
+        i = self.ticker_index[ticker]
+        start = int(self.first_valid()[i]) if len(self.dates) else 0
+        block = self.values[i, start:, :]
+        dates = self.dates[start:]
+        valid = ~np.isnan(block[:, FIELD_INDEX['Close']])
+        if not valid.all():
+            block, dates = block[valid], dates[valid]
+        frame = pd.DataFrame(block, index=dates, columns=list(FIELDS), copy=False)
+        frame.index.name = 'Date'
+        return frame
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        return {t: self.frame(t) for t in self.tickers}
+
+    def latest(self, name: str, offset: int = 0) -> np.ndarray:
+        """Nilai field pada hari terakhir kalender (offset=1 -> hari sebelumnya)"""
+        return self.field(name)[:, -1 - offset]
+
+    # === DISK / MMAP ===
+
+    def save(self, path: str = DEFAULT_PANEL_PATH):
+        """Simpan ke <path>.npy + <path>.json (atomic replace)"""
+        meta = {
+            "tickers": self.tickers,
+            "dates": [d.strftime('%Y-%m-%d') for d in self.dates],
+        }
+        tmp_npy, tmp_json = f"{path}.tmp.npy", f"{path}.json.tmp"
+        np.save(tmp_npy, np.ascontiguousarray(self.values))
+        with open(tmp_json, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_npy, f"{path}.npy")
+        os.replace(tmp_json, f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PANEL_PATH, mmap: bool = True) -> "PricePanel":
+        """Load panel dari disk. mmap=True -> read-only, dibagi antar proses via page cache"""
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        values = np.load(f"{path}.npy", mmap_mode='r' if mmap else None)
+        dates = pd.DatetimeIndex(pd.to_datetime(meta["dates"])).tz_localize(WIB)
+        dates.name = 'Date'
+        return cls(values, meta["tickers"], dates)
+
+
+def load_panel(analyzer, tickers: List[str], period: str = "6mo", batch_size: int = 50,
+               max_workers: int = 10) -> PricePanel:
+    """
+    Isi panel dari layer fetch (cache -> store batch -> fallback per ticker).
+    analyzer: StockAnalyzer (dipakai iter_history_batches & get_history).
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    for batch in analyzer.iter_history_batches(tickers, period, batch_size):
+        frames.update(batch)
+
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        def fetch(ticker):
+            try:
+                return ticker, analyzer.get_history(ticker, period)
+            except Exception:
+                return ticker, None
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for ticker, data in executor.map(fetch, missing):
+                if data is not None and not data.empty:
+                    frames[ticker] = data
+
+    return PricePanel.from_frames(frames, tickers)
@@ -0,0 +1,256 @@
+"""
+Snapshot Quote Realtime
+Harga terakhir/open/high/low/volume hari ini + previous close untuk seluruh universe, diambil
+dalam beberapa request batch (yf.download 5 hari, per batch ticker) dan dipublikasikan sebagai
+snapshot immutable bertimestamp. Dibaca bersama oleh scan (IEP sesi 1), momentum scan dan
+/analisa, menggantikan fast_info / stock.info / history 5d per ticker.
+
+Refresh membuat snapshot baru (copy-on-write) lalu menukar referensi: pembaca tidak pernah
+melihat snapshot setengah jadi dan tidak perlu lock. Ticker yang batch-nya gagal tetap memakai
+quote lama (quote.as_of menunjukkan umurnya). Lookup satu ticker yang basi (/analisa) diunduh
+di luar lock refresh universe dan disimpan terpisah (tanpa menyalin snapshot), sehingga tidak
+menunggu refresh seluruh universe yang sedang berjalan; request satu ticker ini boleh di-hedge
+(FETCH_HEDGE), refresh batch tidak.
+"""
+
+import logging
+import threading
+import time as time_mod
+from datetime import date
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from fetch_scheduler import FETCH_SCHEDULER, ThrottledError
+from http_session import HTTP_SESSIONS
+from market_hours import is_market_open, last_session_close, now_wib, to_wib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_AGE = 60        # Detik, umur maksimal quote saat market buka
+QUOTE_PERIOD = "5d"         # Cukup untuk bar hari ini + close hari bursa sebelumnya
+
+NAN = float('nan')
+
+
+class Quote(NamedTuple):
+    ticker: str
+    last: float
+    open: float
+    high: float
+    low: float
+    volume: float
+    prev_close: float
+    bar_date: Optional[date]   # Tanggal bar terakhir (WIB); != hari ini jika belum ada transaksi
+    as_of: float               # Epoch saat quote diambil
+
+    def is_today(self) -> bool:
+        return self.bar_date == now_wib().date()
+
+
+def quote_from_history(ticker: str, data: pd.DataFrame, as_of: float) -> Optional[Quote]:
+    """Quote dari bar harian terakhir (harga mentah, tidak di-adjust) + close bar sebelumnya"""
+    data = data.dropna(subset=['Close'])
+    if data.empty:
+        return None
+    last = data.iloc[-1]
+    prev_close = float(data['Close'].iloc[-2]) if len(data) > 1 else NAN
+    return Quote(ticker, float(last['Close']), float(last['Open']), float(last['High']), float(last['Low']),
+                 float(last['Volume']), prev_close, to_wib(data.index[-1].to_pydatetime()).date(), as_of)
+
+
+class QuoteSnapshot:
+    """Snapshot immutable {ticker: Quote} pada satu waktu"""
+
+    __slots__ = ("_quotes", "taken_at")
+
+    def __init__(self, quotes: Mapping[str, Quote], taken_at: float):
+        object.__setattr__(self, "_quotes", MappingProxyType(dict(quotes)))
+        object.__setattr__(self, "taken_at", taken_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuoteSnapshot immutable")
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._quotes
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def get(self, ticker: str) -> Optional[Quote]:
+        return self._quotes.get(ticker)
+
+    def age(self) -> float:
+        return time_mod.time() - self.taken_at
+
+    def arrays(self, tickers: List[str]) -> Dict[str, np.ndarray]:
+        """Array per field (urutan = tickers, NaN jika tidak ada) untuk screen vektor"""
+        fields = ("last", "open", "high", "low", "volume", "prev_close")
+        out = {field: np.full(len(tickers), NAN) for field in fields}
+        for i, ticker in enumerate(tickers):
+            quote = self._quotes.get(ticker)
+            if quote is not None:
+                for field in fields:
+                    out[field][i] = getattr(quote, field)
+        return out
+
+
+class QuoteService:
+    """Pemilik snapshot terkini; refresh batch thread-safe (satu refresh berjalan per waktu)"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, max_age: float = DEFAULT_MAX_AGE):
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self._snapshot = QuoteSnapshot({}, 0.0)
+        self._refresh_lock = threading.Lock()   # Satu refresh universe berjalan per waktu
+        self._swap_lock = threading.Lock()      # Critical section pendek: publish snapshot / quote on-demand
+        self._on_demand: Dict[str, Quote] = {}  # Quote per ticker yang lebih baru dari snapshot
+        self.refreshes = 0
+        self.requests = 0
+        self.failed_batches = 0
+        self.last_seconds = 0.0
+
+    def configure(self, batch_size: int = None, max_age: float = None):
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if max_age is not None:
+            self.max_age = max_age
+
+    def snapshot(self) -> QuoteSnapshot:
+        return self._snapshot
+
+    # === FETCH ===
+
+    def _download(self, tickers: List[str]) -> Dict[str, Quote]:
+        raw = FETCH_SCHEDULER.call(
+            HTTP_SESSIONS.download, tickers, period=QUOTE_PERIOD, interval="1d", group_by='ticker',
+            auto_adjust=False, progress=False, threads=True, kind="quote"
+        )
+        as_of = time_mod.time()
+        quotes = {}
+        if raw is None or raw.empty:
+            return quotes
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                sub = raw[ticker]
+            else:
+                sub = raw
+            quote = quote_from_history(ticker, sub, as_of)
+            if quote is not None:
+                quotes[ticker] = quote
+        return quotes
+
+    def _download_one(self, ticker: str) -> Optional[Quote]:
+        # Satu ticker (/analisa): Ticker.history dengan objek baru per panggilan (idempoten, tanpa state
+        # global yf.download) sehingga boleh di-hedge seperti fetch history. Refresh universe tidak di-hedge.
+        data = FETCH_SCHEDULER.call(
+            lambda: HTTP_SESSIONS.ticker(ticker).history(period=QUOTE_PERIOD, interval="1d", auto_adjust=False),
+            kind="quote", hedge=True
+        )
+        if data is None or data.empty:
+            return None
+        return quote_from_history(ticker, data, time_mod.time())
+
+    def refresh(self, tickers: Iterable[str]) -> QuoteSnapshot:
+        """Ambil quote tickers per batch, publikasikan snapshot baru (quote ticker lain dipertahankan)"""
+        tickers = list(dict.fromkeys(tickers))
+        with self._refresh_lock:
+            started = time_mod.time()
+            quotes = dict(self._snapshot._quotes)
+            retry = []
+            for i in range(0, len(tickers), self.batch_size):
+                batch = tickers[i:i + self.batch_size]
+                try:
+                    self.requests += 1
+                    quotes.update(self._download(batch))
+                except ThrottledError:
+                    retry.append(batch)
+                except Exception as e:
+                    self.failed_batches += 1
+                    logger.warning(f"Quote batch {len(batch)} ticker gagal: {e}")
+            # Batch yang kena rate limit diulang sekali setelah cooldown, sisanya memakai quote lama
+            if retry:
+                FETCH_SCHEDULER.wait_cooldown()
+            for batch in retry:
+                try:
+                    self.requests += 1
+                    quotes.update(self._download(batch))
+                except Exception as e:
+                    self.failed_batches += 1
+                    logger.warning(f"Quote batch {len(batch)} ticker gagal setelah requeue: {e}")
+            snapshot = QuoteSnapshot(quotes, time_mod.time())
+            with self._swap_lock:
+                self._snapshot = snapshot
+                # Quote on-demand yang sudah tersusul snapshot baru tidak perlu disimpan lagi
+                for ticker, quote in list(self._on_demand.items()):
+                    latest = snapshot.get(ticker)
+                    if latest is not None and latest.as_of >= quote.as_of:
+                        del self._on_demand[ticker]
+            self.refreshes += 1
+            self.last_seconds = time_mod.time() - started
+            return self._snapshot
+
+    # === LOOKUP ===
+
+    def _is_fresh(self, quote: Quote, max_age: Optional[float]) -> bool:
+        if not is_market_open():
+            # Di luar jam bursa quote tidak berubah: cukup diambil setelah closing terakhir
+            return quote.as_of >= last_session_close().timestamp()
+        return time_mod.time() - quote.as_of <= (self.max_age if max_age is None else max_age)
+
+    def _latest(self, ticker: str) -> Optional[Quote]:
+        quote = self._snapshot.get(ticker)
+        on_demand = self._on_demand.get(ticker)
+        if on_demand is not None and (quote is None or on_demand.as_of > quote.as_of):
+            return on_demand
+        return quote
+
+    def quote(self, ticker: str, max_age: Optional[float] = None, fetch: bool = True) -> Optional[Quote]:
+        """
+        Quote terbaru (snapshot / on-demand); jika tidak ada/basi dan fetch=True, unduh ticker ini saja
+        tanpa menunggu refresh universe yang sedang berjalan.
+        """
+        quote = self._latest(ticker)
+        if quote is not None and self._is_fresh(quote, max_age):
+            return quote
+        if not fetch:
+            return quote
+        try:
+            self.requests += 1
+            fetched = self._download_one(ticker)
+        except Exception as e:
+            logger.warning(f"Quote {ticker} gagal: {e}")
+            return quote
+        if fetched is None:
+            return quote
+        with self._swap_lock:
+            self._on_demand[ticker] = fetched
+        return fetched
+
+    def open_price(self, ticker: str) -> Optional[float]:
+        """Open hari ini dari snapshot (IEP hasil pre-opening), tanpa request tambahan"""
+        quote = self._snapshot.get(ticker)
+        if quote is None or not quote.is_today() or not quote.open > 0:
+            return None
+        return quote.open
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "tickers": len(snapshot),
+            "on_demand": len(self._on_demand),
+            "age_seconds": round(snapshot.age(), 1) if snapshot.taken_at else None,
+            "refreshes": self.refreshes,
+            "requests": self.requests,
+            "failed_batches": self.failed_batches,
+            "last_seconds": round(self.last_seconds, 2),
+        }
+
+
+# Snapshot quote bersama untuk seluruh proses
+QUOTE_SERVICE = QuoteService()
@@ -0,0 +1,228 @@
+"""
+Streaming Quote (Red-to-Green Realtime)
+Tick harga dari source streaming di-ingest ke LiveStateBook (update O(1) per tick), lalu
+is_red_to_green_live dievaluasi hanya untuk ticker yang harga/volumenya berubah. Alert tidak
+lagi menunggu siklus polling 15 menit continuous_momentum_scan (job itu tetap jalan untuk seed
+state harian & sebagai fallback).
+
+Source pluggable, cukup punya async generator ticks():
+- YahooStreamSource: websocket Yahoo (yf.AsyncWebSocket), reconnect otomatis, opsional merekam
+  setiap pesan ke file JSONL.
+- ReplaySource: memutar ulang rekaman JSONL tersebut (offline / test), secepatnya atau
+  dengan pacing waktu asli (speed).
+"""
+
+import asyncio
+import json
+import logging
+import time as time_mod
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import yfinance as yf
+
+from market_hours import WIB
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECONNECT_DELAY = 5.0
+DEFAULT_QUEUE_SIZE = 10000
+
+
+class Tick(NamedTuple):
+    ticker: str
+    price: float
+    ts: float                       # Epoch detik waktu transaksi
+    day_volume: Optional[float]     # Volume kumulatif hari ini
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+
+
+def _number(message: Dict, key: str) -> Optional[float]:
+    # Protobuf int64 (time, day_volume) di-decode yfinance sebagai string
+    value = message.get(key)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def tick_from_message(message: Dict) -> Optional[Tick]:
+    """Pesan pricing yfinance (dict hasil decode protobuf) -> Tick; None jika bukan update harga"""
+    ticker = message.get("id")
+    price = _number(message, "price")
+    if not ticker or not price or price <= 0:
+        return None
+    ts = _number(message, "time")
+    return Tick(ticker, price, ts / 1000 if ts else time_mod.time(), _number(message, "day_volume"),
+                _number(message, "open_price"), _number(message, "day_high"), _number(message, "day_low"))
+
+
+# === SOURCES ===
+
+class YahooStreamSource:
+    """Tick live dari websocket Yahoo; record_path opsional untuk merekam pesan (bahan ReplaySource)"""
+
+    def __init__(self, tickers: List[str], record_path: Optional[str] = None,
+                 reconnect_delay: float = DEFAULT_RECONNECT_DELAY, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.tickers = list(tickers)
+        self.record_path = record_path
+        self.reconnect_delay = reconnect_delay
+        self.queue_size = queue_size
+        self.connects = 0
+
+    async def _pump(self, queue: "asyncio.Queue", stop: "asyncio.Event"):
+        while not stop.is_set():
+            ws = yf.AsyncWebSocket(verbose=False)
+            try:
+                self.connects += 1
+                await ws.subscribe(self.tickers)
+                # listen() menelan CancelledError & return normal: cek stop sebelum reconnect
+                await ws.listen(queue.put)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Websocket quote terputus: {e}")
+            finally:
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+            if stop.is_set():
+                return
+            logger.warning(f"Websocket quote berhenti, reconnect {self.reconnect_delay:.0f}s lagi")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.reconnect_delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def ticks(self) -> AsyncIterator[Tick]:
+        queue: "asyncio.Queue" = asyncio.Queue(maxsize=self.queue_size)
+        stop = asyncio.Event()
+        pump = asyncio.create_task(self._pump(queue, stop))
+        record = open(self.record_path, 'a', encoding='utf-8') if self.record_path else None
+        try:
+            while True:
+                message = await queue.get()
+                if record is not None:
+                    record.write(json.dumps(message) + "\n")
+                tick = tick_from_message(message)
+                if tick is not None:
+                    yield tick
+        finally:
+            stop.set()
+            pump.cancel()
+            # Tunggu websocket benar-benar tertutup sebelum source dianggap selesai
+            await asyncio.gather(pump, return_exceptions=True)
+            if record is not None:
+                record.close()
+
+
+class ReplaySource:
+    """
+    Putar ulang rekaman JSONL (satu pesan pricing per baris, format YahooStreamSource).
+    speed None = secepatnya; 1.0 = mengikuti jeda waktu asli antar tick; 10 = 10x lebih cepat.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        self.path = path
+        self.speed = speed
+
+    async def ticks(self) -> AsyncIterator[Tick]:
+        previous = None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    tick = tick_from_message(json.loads(line))
+                except ValueError:
+                    continue
+                if tick is None:
+                    continue
+                if self.speed and previous is not None:
+                    await asyncio.sleep(max(0.0, tick.ts - previous) / self.speed)
+                else:
+                    await asyncio.sleep(0)  # Tetap beri giliran ke task lain di event loop
+                previous = tick.ts
+                yield tick
+
+
+# === INGESTION ===
+
+class QuoteStream:
+    """
+    Ingest tick ke LiveStateBook & evaluasi Red-to-Green per ticker yang berubah.
+    Ticker yang belum di-seed (belum ada state) dilewati sampai continuous_momentum_scan men-seed-nya.
+    """
+
+    def __init__(self, book, analyzer):
+        self.book = book
+        self.analyzer = analyzer
+        self._last: Dict[str, Tuple[float, Optional[float]]] = {}
+        self.running = False
+        self.ticks = 0
+        self.unchanged = 0
+        self.unknown = 0
+        self.evaluated = 0
+        self.signals = 0
+        self.last_tick_at: Optional[float] = None
+
+    def ingest(self, tick: Tick) -> Optional[Dict]:
+        """Update state dari satu tick. Returns: match {"ticker", "data"} jika lolos Red-to-Green"""
+        self.ticks += 1
+        self.last_tick_at = tick.ts
+        key = (tick.price, tick.day_volume)
+        ts = datetime.fromtimestamp(tick.ts, WIB)
+        # LiveStateBook juga diubah continuous_momentum_scan (seed & snapshot quote) dari thread executor
+        with self.book.lock:
+            state = self.book.get(tick.ticker)
+            if state is None:
+                self.unknown += 1
+                return None
+            if self._last.get(tick.ticker) == key:
+                self.unchanged += 1
+                return None
+            self._last[tick.ticker] = key
+
+            if tick.open and tick.high and tick.low and tick.day_volume is not None:
+                # Pesan membawa OHLC harian: bar hari ini tetap benar walau ada tick yang terlewat
+                state.update_bar(tick.open, max(tick.high, tick.price), min(tick.low, tick.price), tick.price,
+                                 tick.day_volume, bar_date=ts.date())
+            else:
+                state.update(tick.price, tick.day_volume, ts)
+            state.streamed_at = tick.ts
+            passed, data = self.analyzer.is_red_to_green_live(state)
+
+        self.evaluated += 1
+        if not passed:
+            return None
+        self.signals += 1
+        return {"ticker": tick.ticker, "data": data}
+
+    async def run(self, source, on_signal: Optional[Callable[[Dict], Awaitable]] = None):
+        """Konsumsi source sampai habis (replay) atau task di-cancel (live)"""
+        self.running = True
+        ticks = source.ticks()
+        try:
+            async for tick in ticks:
+                match = self.ingest(tick)
+                if match is not None and on_signal is not None:
+                    await on_signal(match)
+        finally:
+            # Tutup source sekarang (bukan saat di-GC): websocket berhenti sebelum run() kembali
+            await ticks.aclose()
+            self.running = False
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "ticks": self.ticks,
+            "unchanged": self.unchanged,
+            "unknown": self.unknown,
+            "evaluated": self.evaluated,
+            "signals": self.signals,
+            "last_tick_at": self.last_tick_at,
+        }
@@ -0,0 +1,134 @@
+"""
+Budget Waktu Scan
+Deadline untuk satu scan universe plus timeout per ticker, agar satu ticker yang lambat/hang
+tidak menahan broadcast. Saat budget habis scan berhenti menunggu: ticker yang belum selesai
+di-yield sebagai hasil timed_out, task yang masih berjalan menjadi straggler dan hasilnya
+ditampung untuk addendum (late_results).
+"""
+
+import queue
+import threading
+import time as time_mod
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterator, Optional, Set
+
+from scan_result import ScanResult
+
+DEFAULT_POLL_SECONDS = 1.0
+
+_CLOSED = object()
+
+
+class ScanBudget:
+    """
+    total_seconds: deadline seluruh scan (None = tanpa deadline)
+    ticker_seconds: batas waktu analisa satu ticker sejak mulai dijalankan (None = tanpa batas)
+    """
+
+    def __init__(self, total_seconds: Optional[float] = None, ticker_seconds: Optional[float] = None,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS):
+        self.started = time_mod.monotonic()
+        self.deadline = self.started + total_seconds if total_seconds else None
+        self.ticker_seconds = ticker_seconds
+        self.poll_seconds = poll_seconds
+        self.stragglers: Set[str] = set()
+        self.timed_out = 0
+        self._running_since: Dict[str, float] = {}
+        self._late: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    # === WAKTU ===
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time_mod.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time_mod.monotonic() >= self.deadline
+
+    def poll_timeout(self) -> float:
+        """Timeout satu kali tunggu: cukup pendek untuk cek timeout per ticker & deadline"""
+        remaining = self.remaining()
+        return self.poll_seconds if remaining is None else min(self.poll_seconds, remaining)
+
+    def run(self, ticker: str, fn: Callable, *args):
+        """Wrapper task: catat kapan ticker mulai dianalisa (untuk timeout per ticker)"""
+        with self._lock:
+            self._running_since[ticker] = time_mod.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running_since.pop(ticker, None)
+
+    def ticker_expired(self, ticker: str) -> bool:
+        if not self.ticker_seconds:
+            return False
+        with self._lock:
+            since = self._running_since.get(ticker)
+        return since is not None and time_mod.monotonic() - since > self.ticker_seconds
+
+    # === TIMED OUT / STRAGGLER ===
+
+    def timed_out_result(self, ticker: str, reason: str = "deadline scan") -> ScanResult:
+        with self._lock:
+            self.timed_out += 1
+        return ScanResult.timed_out_failure(ticker, f"Timeout ({reason}), hasil menyusul jika sempat selesai")
+
+    def expect_late(self, ticker: str):
+        """Ticker yang masih berjalan setelah ditandai timed_out: hasilnya dikirim lewat deliver_late"""
+        with self._lock:
+            self.stragglers.add(ticker)
+            self._pending += 1
+
+    def deliver_late(self, result: ScanResult):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+        self._late.put(result)
+
+    def track_future(self, ticker: str, future: Future):
+        """Straggler berupa Future: hasil (atau error) dikirim ke antrean late saat selesai"""
+        self.expect_late(ticker)
+
+        def done(f):
+            try:
+                result = f.result()
+            except Exception as e:
+                result = ScanResult.failure(ticker, str(e))
+            self.deliver_late(result)
+
+        future.add_done_callback(done)
+
+    def close_late(self):
+        """Tidak ada lagi hasil straggler yang akan datang"""
+        with self._lock:
+            self._pending = 0
+        self._late.put(_CLOSED)
+
+    def late_results(self, grace_seconds: float) -> Iterator[ScanResult]:
+        """Yield hasil straggler yang selesai dalam grace_seconds (berhenti lebih awal jika semua sudah datang)"""
+        until = time_mod.monotonic() + grace_seconds
+        while True:
+            with self._lock:
+                if self._pending == 0 and self._late.empty():
+                    return
+            wait = until - time_mod.monotonic()
+            if wait <= 0:
+                return
+            try:
+                item = self._late.get(timeout=wait)
+            except queue.Empty:
+                return
+            if item is _CLOSED:
+                continue
+            yield item
+
+    def stats(self) -> Dict:
+        return {
+            "seconds": round(time_mod.monotonic() - self.started, 1),
+            "timed_out": self.timed_out,
+            "stragglers": len(self.stragglers),
+            "pending_late": self._pending,
+        }
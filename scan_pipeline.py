@@ -0,0 +1,374 @@
+"""
+Pipeline Scan Dua Stage
+Stage 1 (I/O): thread pool mengunduh bar (batch multi-symbol, fallback per ticker) ke queue terbatas.
+Stage 2 (CPU): ProcessPoolExecutor berisi analyzer yang sudah di-import & hangat menjalankan
+analyze_stock (is_uptrend + calculate_entry_tp) di luar GIL proses utama.
+
+Back-pressure: stage I/O berhenti saat queue penuh, dan jumlah task yang sedang berjalan di
+process pool dibatasi max_in_flight sehingga memori tidak meledak saat CPU lebih lambat dari network.
+
+Dengan ScanBudget: saat deadline lewat kedua stage berhenti mengambil ticker baru, task yang
+sudah di process pool menjadi straggler (hasilnya ke budget.late_results()). Timeout per ticker
+dihitung sejak task dikirim ke process pool.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time as time_mod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from fetch_scheduler import ThrottledError, requeue_throttled
+from scan_budget import ScanBudget
+from scan_result import ScanResult, StageCounter
+
+DEFAULT_IO_WORKERS = 10
+DEFAULT_CPU_WORKERS = os.cpu_count() or 2
+DEFAULT_QUEUE_SIZE = 200
+
+_DONE = object()
+
+# Worker tidak di-fork dari proses bot yang multithread (PTB, executor, scheduler, lock sqlite/HTTP)
+_MP_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# === WORKER PROCESS ===
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    """Initializer process pool: import modul berat & buat analyzer sekali per proses"""
+    global _worker_analyzer
+    from stock_analyzer import StockAnalyzer
+    # Data selalu dikirim dari stage I/O, worker tidak butuh store lokal
+    _worker_analyzer = StockAnalyzer(use_store=False)
+
+
+def _warmup(_=None) -> int:
+    return os.getpid()
+
+
+def _analyze_in_worker(ticker: str, period: str, session: Optional[int], data: pd.DataFrame,
+                       iep: Optional[float] = None):
+    """Returns: (ScanResult, detik CPU di worker)"""
+    started = time_mod.time()
+    result = _worker_analyzer.analyze_stock(ticker, period, session, data, iep)
+    return result, time_mod.time() - started
+
+
+class _StageStats:
+    __slots__ = ("items", "started", "finished", "busy", "blocked")
+
+    def __init__(self):
+        self.items = 0
+        self.started = None
+        self.finished = None
+        self.busy = 0.0     # Detik kerja (CPU stage: total waktu analyze di worker)
+        self.blocked = 0.0  # Detik menunggu karena back-pressure
+
+    def as_dict(self) -> Dict:
+        wall = (self.finished or time_mod.time()) - self.started if self.started else 0.0
+        return {
+            "items": self.items,
+            "seconds": round(wall, 2),
+            "per_second": round(self.items / wall, 1) if wall > 0 else 0.0,
+            "busy_seconds": round(self.busy, 2),
+            "blocked_seconds": round(self.blocked, 2),
+        }
+
+
+class ScanPipeline:
+    """
+    Scan universe dengan stage I/O (thread) -> stage CPU (process).
+    Pool proses dibuat sekali dan dipakai ulang antar scan (warm).
+    """
+
+    def __init__(self, analyzer, io_workers: int = DEFAULT_IO_WORKERS, cpu_workers: int = DEFAULT_CPU_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, max_in_flight: Optional[int] = None, batch_size: int = 50):
+        self.analyzer = analyzer
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight or cpu_workers * 4
+        self.batch_size = batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.last_stats: Dict = {}
+
+    # === POOL ===
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.cpu_workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context(_MP_START_METHOD))
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Buang pool yang rusak (worker mati, mis. OOM) agar scan berikutnya membuat pool baru"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def warmup(self):
+        """Spawn semua worker sekarang (import pandas/yfinance) agar scan pertama tidak menunggu"""
+        pool = self.pool()
+        list(pool.map(_warmup, range(self.cpu_workers)))
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # === STAGE 1: I/O ===
+
+    def _produce(self, tickers: List[str], period: str, out: "queue.Queue", stats: _StageStats,
+                 stop: threading.Event):
+        stats.started = time_mod.time()
+
+        def put(item):
+            wait_start = time_mod.time()
+            out.put(item)  # Blok saat queue penuh (back-pressure dari stage CPU)
+            stats.blocked += time_mod.time() - wait_start
+
+        try:
+            fetched = set()
+            if self.batch_size and self.analyzer.store is not None:
+                for frames in self.analyzer.iter_history_batches(tickers, period, self.batch_size):
+                    for ticker, data in frames.items():
+                        fetched.add(ticker)
+                        stats.items += 1
+                        put((ticker, data))
+                    if stop.is_set():
+                        return
+
+            def fetch(ticker):
+                if stop.is_set():
+                    return ticker, None
+                try:
+                    return ticker, self.analyzer.get_history(ticker, period)
+                except Exception as e:
+                    return ticker, e
+
+            missing = [t for t in tickers if t not in fetched]
+            with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+                # as_completed: satu ticker lambat tidak menahan ticker lain masuk stage CPU
+                futures = [executor.submit(fetch, t) for t in missing]
+                for future in as_completed(futures):
+                    ticker, data = future.result()
+                    if stop.is_set():
+                        break
+                    stats.items += 1
+                    put((ticker, data))
+        finally:
+            stats.finished = time_mod.time()
+            out.put(_DONE)
+
+    # === RUN ===
+
+    def run(self, tickers: List[str], period: str = "6mo", session: Optional[int] = None,
+            budget: Optional[ScanBudget] = None) -> List[ScanResult]:
+        return list(self.iter_run(tickers, period, session, budget))
+
+    def iter_run(self, tickers: List[str], period: str = "6mo", session: Optional[int] = None,
+                 budget: Optional[ScanBudget] = None):
+        """
+        Yield hasil analisa begitu selesai di process pool (urutan selesai, bukan urutan ticker).
+        Ticker yang kena rate limit di stage I/O di-requeue setelah pass utama.
+        """
+        # Stage penolak dihitung di proses utama dari hasil worker (counter per scan)
+        stages = StageCounter(self.analyzer.UPTREND_STAGES)
+
+        def rerun(retry):
+            if budget is not None and budget.expired():
+                return (budget.timed_out_result(t) for t in retry)
+            return self._iter_run_once(retry, period, session, budget)
+
+        for result in requeue_throttled(self._iter_run_once(tickers, period, session, budget), rerun):
+            stages.record_result(result)
+            yield result
+        print(f"Filter stage: {stages.format()}")
+
+    def _iter_run_once(self, tickers: List[str], period: str, session: Optional[int],
+                       budget: Optional[ScanBudget] = None):
+        io_stats, cpu_stats = _StageStats(), _StageStats()
+        stop = threading.Event()
+        submitted: Dict[str, float] = {}  # Ticker di process pool -> waktu submit (timeout per ticker)
+        bars: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        done: "queue.Queue" = queue.Queue()
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        stats_lock = threading.Lock()
+        pool = self.pool()
+
+        def collect(future, ticker):
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                result, seconds = ScanResult.failure(ticker, str(e)), 0.0
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_pool(pool)
+            with stats_lock:
+                cpu_stats.busy += seconds
+                cpu_stats.items += 1
+                cpu_stats.finished = time_mod.time()
+                submitted.pop(ticker, None)
+            done.put(result)
+            in_flight.release()
+
+        def dispatch():
+            cpu_stats.started = time_mod.time()
+            broken = None
+            try:
+                while True:
+                    item = bars.get()
+                    if item is _DONE:
+                        break
+                    ticker, data = item
+                    if broken is not None:
+                        # Pool rusak: kuras antrean agar producer tidak blok, ticker dilaporkan gagal
+                        done.put(ScanResult.failure(ticker, broken))
+                        continue
+                    if stop.is_set():
+                        continue  # Deadline lewat: sisa antrean tidak dianalisa
+                    if isinstance(data, ThrottledError):
+                        done.put(ScanResult.throttled_failure(ticker, str(data)))
+                        continue
+                    if isinstance(data, Exception):
+                        done.put(ScanResult.failure(ticker, str(data)))
+                        continue
+                    if data is None or data.empty:
+                        done.put(ScanResult.failure(ticker, f"Data tidak mencukupi/kosong untuk {ticker}", stage="data"))
+                        continue
+                    wait_start = time_mod.time()
+                    in_flight.acquire()  # Batasi task di process pool
+                    cpu_stats.blocked += time_mod.time() - wait_start
+                    with stats_lock:
+                        submitted[ticker] = time_mod.monotonic()
+                    # Snapshot quote hanya ada di proses utama: IEP sesi 1 dikirim bersama data
+                    iep = self.analyzer.quotes.open_price(ticker) if session == 1 else None
+                    try:
+                        future = pool.submit(_analyze_in_worker, ticker, period, session, data, iep)
+                    except BrokenProcessPool as e:
+                        broken = f"Process pool rusak: {e}"
+                        print(f"Pipeline: {broken}, sisa scan dihentikan")
+                        with stats_lock:
+                            submitted.pop(ticker, None)
+                        in_flight.release()
+                        stop.set()
+                        self._discard_pool(pool)
+                        done.put(ScanResult.failure(ticker, broken))
+                        continue
+                    future.add_done_callback(lambda f, t=ticker: collect(f, t))
+
+                # Tunggu semua task selesai
+                for _ in range(self.max_in_flight):
+                    in_flight.acquire()
+                for _ in range(self.max_in_flight):
+                    in_flight.release()
+            finally:
+                done.put(_DONE)
+
+        producer = threading.Thread(target=self._produce, args=(tickers, period, bars, io_stats, stop), daemon=True)
+        dispatcher = threading.Thread(target=dispatch, daemon=True)
+        producer.start()
+        dispatcher.start()
+
+        def finish():
+            producer.join()
+            dispatcher.join()
+            self._report(io_stats, cpu_stats)
+
+        if budget is None:
+            while True:
+                result = done.get()
+                if result is _DONE:
+                    break
+                yield result
+            finish()
+            return
+
+        outstanding = set(tickers)  # Belum di-yield
+        late = set()                # Sudah di-yield timed_out, hasilnya menyusul
+        finished = False
+        while not finished:
+            try:
+                result = done.get(timeout=budget.poll_timeout())
+            except queue.Empty:
+                result = None
+            if result is _DONE:
+                finished = True
+            elif result is not None:
+                if result.ticker in late:
+                    budget.deliver_late(result)
+                else:
+                    outstanding.discard(result.ticker)
+                    yield result
+
+            if budget.expired() and not finished:
+                # Deadline: hentikan kedua stage, task di process pool menjadi straggler
+                stop.set()
+                with stats_lock:
+                    running = dict(submitted)
+                # Hasil yang sudah selesai tapi belum dibaca tetap masuk broadcast
+                while True:
+                    try:
+                        result = done.get_nowait()
+                    except queue.Empty:
+                        break
+                    if result is _DONE:
+                        finished = True
+                        break
+                    if result.ticker not in late:
+                        outstanding.discard(result.ticker)
+                        yield result
+                for ticker in sorted(outstanding):
+                    if ticker in running:
+                        budget.expect_late(ticker)
+                        late.add(ticker)
+                    yield budget.timed_out_result(ticker)
+                outstanding.clear()
+                if not finished:
+                    break
+            if budget.ticker_seconds:
+                with stats_lock:
+                    running = dict(submitted)
+                now = time_mod.monotonic()
+                for ticker, since in running.items():
+                    if ticker in outstanding and now - since > budget.ticker_seconds:
+                        outstanding.discard(ticker)
+                        budget.expect_late(ticker)
+                        late.add(ticker)
+                        yield budget.timed_out_result(ticker, f"> {budget.ticker_seconds}s per ticker")
+
+        if finished:
+            budget.close_late()
+            finish()
+            return
+
+        def forward_late():
+            # Teruskan hasil straggler ke budget sampai kedua stage selesai
+            while True:
+                item = done.get()
+                if item is _DONE:
+                    break
+                if item.ticker in late:
+                    budget.deliver_late(item)
+            budget.close_late()
+            finish()
+
+        threading.Thread(target=forward_late, daemon=True).start()
+
+    def _report(self, io_stats: _StageStats, cpu_stats: _StageStats):
+        self.last_stats = {"io": io_stats.as_dict(), "cpu": cpu_stats.as_dict()}
+        io, cpu = self.last_stats["io"], self.last_stats["cpu"]
+        print(f"Pipeline I/O: {io['items']} ticker, {io['seconds']}s ({io['per_second']}/s), "
+              f"blocked {io['blocked_seconds']}s")
+        print(f"Pipeline CPU ({self.cpu_workers} proses): {cpu['items']} ticker, {cpu['seconds']}s "
+              f"({cpu['per_second']}/s), busy {cpu['busy_seconds']}s, blocked {cpu['blocked_seconds']}s")
@@ -0,0 +1,225 @@
+"""
+Record Hasil Scan (Compact)
+Pengganti dict hasil analyze_stock: atribut __slots__ berisi nilai scalar Python (bukan
+numpy scalar), field turunan (analysis, message, timestamp) dibangun saat dibaca.
+Tetap bisa dipakai seperti dict (r["ticker"], r.get("analysis"), r["news"] = ...),
+dan to_dict() memberi dict lengkap untuk kode lama. Field turunan (analysis, message,
+timestamp, field TP) read-only lewat dict view.
+"""
+
+import time as time_mod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+NOT_UPTREND_MESSAGE = "Saham tidak memenuhi kriteria strong uptrend"
+
+# Urutan indikator yang disimpan sebagai tuple di record uptrend
+INDICATOR_KEYS = ("close", "sma20", "sma50", "rsi", "macd", "signal", "histogram", "adx", "volume_ratio")
+
+# Field hasil calculate_entry_tp yang ikut disalin ke hasil scan
+TP_FIELDS = (
+    "profit_pct", "is_ara_potential", "support", "resistance", "entry_haka", "entry_pullback",
+    "iep", "recommended_option", "recom_reason", "entry_pullback_reason", "strategy", "market_cond",
+)
+
+_MISSING = object()
+
+
+def _scalar(x):
+    """numpy scalar -> float/int/bool Python (lebih kecil & aman di-pickle/JSON)"""
+    return x.item() if hasattr(x, "item") else x
+
+
+class ScanResult:
+    """Satu hasil analisa per ticker"""
+
+    __slots__ = (
+        "ticker", "success", "is_uptrend", "error", "reason", "stage", "score", "reasons", "indicator_values",
+        "name", "current_price", "entry", "tp", "created_at", "throttled", "timed_out", "_tp_values", "_extra",
+    )
+
+    _FIELDS = ("success", "ticker", "error", "name", "is_uptrend", "current_price", "entry", "tp")
+    _DERIVED = ("analysis", "message", "timestamp", "throttled", "timed_out") + TP_FIELDS
+
+    def __init__(self, ticker: str, success: bool = True, is_uptrend: bool = False, error: Optional[str] = None,
+                 reason: Optional[str] = None, stage: Optional[str] = None):
+        self.ticker = ticker
+        self.success = success
+        self.is_uptrend = is_uptrend
+        self.error = error
+        self.reason = reason
+        self.stage = stage  # Id stage UPTREND_STAGES yang menolak (data/liquidity/...), None jika lolos/error lain
+        self.score = None
+        self.reasons: Tuple[str, ...] = ()
+        self.indicator_values: Optional[Tuple] = None
+        self.name = None
+        self.current_price = None
+        self.entry = None
+        self.tp = None
+        self.created_at = None
+        self.throttled = False  # Gagal karena rate limit (ticker di-requeue, bukan data kosong)
+        self.timed_out = False  # Melewati deadline scan / timeout per ticker
+        self._tp_values: Optional[Tuple] = None
+        self._extra: Optional[Dict[str, Any]] = None
+
+    # === CONSTRUCTORS ===
+
+    @classmethod
+    def failure(cls, ticker: str, error: str, stage: Optional[str] = None) -> "ScanResult":
+        return cls(ticker, success=False, error=error, stage=stage)
+
+    @classmethod
+    def throttled_failure(cls, ticker: str, error: str) -> "ScanResult":
+        result = cls(ticker, success=False, error=error)
+        result.throttled = True
+        return result
+
+    @classmethod
+    def timed_out_failure(cls, ticker: str, error: str) -> "ScanResult":
+        result = cls(ticker, success=False, error=error)
+        result.timed_out = True
+        return result
+
+    @classmethod
+    def rejected(cls, ticker: str, reason: str, stage: Optional[str] = None) -> "ScanResult":
+        """Saham yang tidak lolos is_uptrend: cukup simpan alasan & stage penolakan"""
+        return cls(ticker, success=True, is_uptrend=False, reason=str(reason),
+                   stage=str(stage) if stage is not None else None)
+
+    @classmethod
+    def uptrend(cls, ticker: str, name: str, current_price: float, entry: float, tp: float,
+                analysis: Dict, tp_analysis: Dict) -> "ScanResult":
+        result = cls(ticker, success=True, is_uptrend=True)
+        result.name = name
+        result.current_price = _scalar(current_price)
+        result.entry = _scalar(entry)
+        result.tp = _scalar(tp)
+        result.score = _scalar(analysis.get("score"))
+        result.reasons = tuple(analysis.get("reasons", ()))
+        indicators = analysis.get("indicators", {})
+        result.indicator_values = tuple(_scalar(indicators.get(k)) for k in INDICATOR_KEYS)
+        result._tp_values = tuple(_scalar(tp_analysis.get(k, 0 if k == "iep" else None)) for k in TP_FIELDS)
+        result.created_at = time_mod.time()
+        return result
+
+    # === LAZY FIELDS ===
+
+    @property
+    def analysis(self) -> Dict:
+        if not self.is_uptrend:
+            return {"reason": self.reason} if self.reason is not None else {}
+        return {
+            "score": self.score,
+            "reasons": list(self.reasons),
+            "indicators": dict(zip(INDICATOR_KEYS, self.indicator_values or ())),
+        }
+
+    @property
+    def message(self) -> Optional[str]:
+        return NOT_UPTREND_MESSAGE if self.success and not self.is_uptrend else None
+
+    @property
+    def timestamp(self) -> Optional[str]:
+        if self.created_at is None:
+            return None
+        return datetime.fromtimestamp(self.created_at).strftime("%Y-%m-%d %H:%M:%S")
+
+    # === DICT VIEW ===
+
+    def _get(self, key: str):
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is None and key in ("error", "name", "current_price", "entry", "tp"):
+                return _MISSING
+            return value
+        if key == "analysis":
+            return self.analysis if (self.is_uptrend or self.reason is not None) else _MISSING
+        if key == "message":
+            return self.message or _MISSING
+        if key == "timestamp":
+            return self.timestamp or _MISSING
+        if key == "throttled":
+            return True if self.throttled else _MISSING
+        if key == "timed_out":
+            return True if self.timed_out else _MISSING
+        if key in TP_FIELDS:
+            if self._tp_values is None:
+                return _MISSING
+            return self._tp_values[TP_FIELDS.index(key)]
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        return _MISSING
+
+    def __getitem__(self, key: str):
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: str) -> bool:
+        return self._get(key) is not _MISSING
+
+    def __setitem__(self, key: str, value):
+        if key in self._FIELDS:
+            setattr(self, key, value)
+            return
+        if key in self._DERIVED:
+            # Dibangun dari field lain saat dibaca: nilai yang di-set tidak akan pernah terbaca lagi
+            raise TypeError(f"ScanResult[{key!r}] read-only (field turunan), pakai to_dict() untuk dict yang bisa diubah")
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def keys(self) -> Iterator[str]:
+        for key in self._FIELDS + TP_FIELDS + ("message", "analysis", "timestamp", "throttled", "timed_out"):
+            if key in self:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def to_dict(self) -> Dict:
+        """Dict lengkap seperti format hasil analyze_stock sebelumnya"""
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        if not self.success:
+            return f"ScanResult({self.ticker}, error={self.error!r}{', throttled' if self.throttled else ''}{', timed_out' if self.timed_out else ''})"
+        if not self.is_uptrend:
+            return f"ScanResult({self.ticker}, rejected={self.reason!r})"
+        return f"ScanResult({self.ticker}, score={self.score}, entry={self.entry}, tp={self.tp})"
+
+
+class StageCounter:
+    """
+    Hitungan hasil screening per stage untuk satu scan (dibuat per scan, bukan state analyzer).
+    Dihitung dari ScanResult yang di-yield scan, sehingga hasil dari worker process pipeline ikut
+    terhitung dan panggilan is_uptrend lain (/analisa, BSJP, momentum) tidak tercampur.
+    stages: (stage, alasan penolakan) urut, mis. StockAnalyzer.UPTREND_STAGES; hasil dihitung dari
+    ScanResult.stage (bukan teks alasan) sehingga mengubah kalimat alasan tidak menggeser hitungan.
+    """
+
+    def __init__(self, stages: Iterable[Tuple[str, str]]):
+        self.order = tuple(stage for stage, _ in stages)
+        self.counts: Dict[str, int] = {}
+
+    def record(self, stage: str, count: int = 1):
+        self.counts[stage] = self.counts.get(stage, 0) + count
+
+    def record_result(self, result: ScanResult):
+        """Stage penolak (ScanResult.stage) atau 'passed'; throttled/timeout & error lain tidak dihitung"""
+        if result.throttled or result.timed_out:
+            return
+        stage = "passed" if result.success and result.is_uptrend else result.stage
+        if stage is not None:
+            self.record(stage)
+
+    def format(self) -> str:
+        parts = [f"{stage}={self.counts[stage]}" for stage in self.order if stage in self.counts]
+        return ", ".join(parts + [f"passed={self.counts.get('passed', 0)}"])
@@ -0,0 +1,79 @@
+"""
+Single-Flight + Cache Hasil Singkat (asyncio)
+Request yang sama (key identik) yang datang bersamaan menunggu satu komputasi yang sedang
+berjalan, dan hasilnya disimpan sebentar untuk melayani request ulang.
+"""
+
+import asyncio
+import time as time_mod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_ENTRIES = 128
+
+
+class SingleFlight:
+    """Coalescing per key: satu task per key, hasil sukses di-cache selama ttl detik"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 cacheable: Optional[Callable[[Any], bool]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = cacheable or (lambda value: True)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.coalesced = 0
+        self.computed = 0
+
+    def _cached(self, key: Hashable):
+        item = self._cache.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if time_mod.monotonic() > expires:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return item
+
+    def _store(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        if self.ttl <= 0 or not self.cacheable(value):
+            return
+        self._cache[key] = (time_mod.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Jalankan fn() untuk key, atau ikut menunggu/ambil hasil yang sudah ada"""
+        cached = self._cached(key)
+        if cached is not None:
+            self.hits += 1
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.computed += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._store(k, t))
+        # shield: caller yang dibatalkan tidak membatalkan komputasi milik caller lain
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "coalesced": self.coalesced, "computed": self.computed,
+                "inflight": len(self._inflight), "cached": len(self._cache)}
@@ -6,15 +6,123 @@ Menggunakan kombinasi indikator teknikal terbaik
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import re
+import time as time_mod
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ohlcv_store import OHLCVStore, slice_period
+from history_cache import HistoryCache, HISTORY_CACHE
+from price_panel import PricePanel
+from indicator_memo import memo_for
+from scan_result import ScanResult, StageCounter
+from company_directory import CompanyDirectory
+from news_cache import NewsCache, NEWS_CACHE
+from headline_sentiment import HEADLINE_CLASSIFIER, SENTIMENT_EMOJI
+from quote_snapshot import QuoteService, QUOTE_SERVICE
+from fetch_scheduler import FETCH_SCHEDULER, ThrottledError, requeue_throttled
+from http_session import HTTP_SESSIONS
+import indicator_engine
+
+# Link cluster berita di <description> RSS Google News
+_NEWS_CLUSTER_LINK = re.compile(r'<a href="(.*?)".*?>(.*?)</a>')
+
+DETAIL_DEADLINE = 8.0    # Detik, deadline bersama enrichment /analisa (fundamental, berita, quote, chart)
+DETAIL_QUOTE_SHARE = 0.5  # Porsi deadline untuk menunggu harga realtime
+DETAIL_WORKERS = 8
+
+
+def _future_result(future: Future, timeout: float, default: Any) -> Any:
+    """Hasil future dalam timeout; lewat deadline / gagal -> default (future dibiarkan selesai di background)"""
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        return default
+    except Exception as e:
+        print(f"Enrichment analisa gagal: {e}")
+        return default
+
+
+class _LazyIndicators(dict):
+    """
+    Nilai indikator terbaru untuk is_uptrend yang baru dihitung saat pertama kali dibaca.
+    Series lengkap disimpan di memo DataFrame sehingga dipakai ulang oleh entry/TP & chart.
+    """
+
+    def __init__(self, analyzer: "StockAnalyzer", data: pd.DataFrame):
+        close = data['Close']
+        volume = data['Volume']
+        super().__init__(close=close.iloc[-1], prev_close=close.iloc[-2], volume=volume.iloc[-1])
+        self._analyzer = analyzer
+        self._data = data
+        self._memo = memo_for(data)
+
+    def __missing__(self, key):
+        a, data, memo = self._analyzer, self._data, self._memo
+        close = data['Close']
+        if key in ("sma20", "sma50"):
+            period = int(key[3:])
+            value = memo.get(("sma", "Close", period), lambda: a.calculate_sma(close, period)).iloc[-1]
+        elif key == "volume_sma":
+            volume = data['Volume']
+            value = memo.get(("sma", "Volume", 20), lambda: a.calculate_volume_sma(volume, 20)).iloc[-1]
+        elif key == "rsi":
+            value = memo.get(("rsi", 14), lambda: a.calculate_rsi(close, 14)).iloc[-1]
+        elif key in ("macd", "signal", "histogram", "prev_histogram", "prev2_histogram"):
+            macd_line, signal_line, histogram = memo.get(("macd",), lambda: a.calculate_macd(close))
+            self.update(macd=macd_line.iloc[-1], signal=signal_line.iloc[-1], histogram=histogram.iloc[-1],
+                        prev_histogram=histogram.iloc[-2], prev2_histogram=histogram.iloc[-3])
+            return self[key]
+        elif key == "adx":
+            adx = memo.get(("adx", 14), lambda: a.calculate_adx(data['High'], data['Low'], close, 14))[0]
+            value = adx.iloc[-1]
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
 
 
 class StockAnalyzer:
     """Kelas untuk menganalisis saham dan mendeteksi uptrend"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[OHLCVStore] = None, cache: Optional[HistoryCache] = None,
+                 use_store: bool = True, directory: Optional[CompanyDirectory] = None,
+                 news_cache: Optional[NewsCache] = None, quotes: Optional[QuoteService] = None):
         self.min_data_days = 30  # Adjusted to 30 to allow analysis of more stocks (e.g. recent IPOs or sparse data)
+        
+        # Store OHLCV lokal: scan hanya mengunduh bar terbaru (delta fetch)
+        if store is None and use_store:
+            try:
+                store = OHLCVStore()
+            except Exception as e:
+                print(f"OHLCV store tidak tersedia, fallback ke yfinance langsung: {e}")
+        self.store = store
+        # Cache in-process dipakai bersama semua job (daily, BSJP, momentum, /analisa)
+        self.cache = cache if cache is not None else HISTORY_CACHE
+        # Metadata emiten (nama, sektor, fundamental) dari file lokal, di-refresh tiap malam
+        self.directory = directory if directory is not None else CompanyDirectory.load()
+        # Item berita per ticker (ETag/Last-Modified), dipakai bersama daily scan & /analisa
+        self.news_cache = news_cache if news_cache is not None else NEWS_CACHE
+        # Snapshot quote realtime bersama (IEP sesi 1, harga /analisa, momentum scan)
+        self.quotes = quotes if quotes is not None else QUOTE_SERVICE
+        # Enrichment paralel analyze_stock_detailed (thread dibuat saat pertama kali dipakai)
+        self._detail_pool = ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix="analisa")
+
+    def get_history(self, ticker: str, period: str = "6mo") -> pd.DataFrame:
+        """Ambil history OHLCV harian: cache in-process -> store lokal -> yfinance"""
+        return self.cache.get(ticker, period, self._load_history)
+
+    def _load_history(self, ticker: str, period: str) -> pd.DataFrame:
+        """Loader untuk cache: store lokal (delta fetch), fallback ke yfinance langsung"""
+        if self.store is not None:
+            try:
+                return self.store.get_history(ticker, period)
+            except ThrottledError:
+                raise  # Jangan langsung menembak yfinance lagi saat sedang dibatasi
+            except Exception as e:
+                print(f"OHLCV store error untuk {ticker}: {e}")
+        return FETCH_SCHEDULER.call(lambda: HTTP_SESSIONS.ticker(ticker).history(period=period), kind="history", hedge=True)
 
     def get_tick_size(self, price: float) -> int:
         """Mendapatkan fraksi harga (tick size) sesuai aturan BEI"""
@@ -194,131 +302,124 @@ class StockAnalyzer:
         """
         Mendeteksi apakah saham dalam kondisi uptrend KUAT.
         Kriteria diperketat untuk mengurangi false signal.
+        Indikator dihitung lazy per stage (lihat UPTREND_STAGES): saham illiquid/flat
+        ditolak setelah beberapa perbandingan scalar tanpa menghitung MACD/RSI/ADX.
         """
         if len(data) < self.min_data_days:
-            return False, {"reason": "Data tidak mencukupi"}
-        
-        close = data['Close']
-        high = data['High']
-        low = data['Low']
-        volume = data['Volume']
-        
-        # 1. SMA Analysis
-        sma20 = self.calculate_sma(close, 20)
-        sma50 = self.calculate_sma(close, 50)
-        sma200 = self.calculate_sma(close, 200) # Optional long term context
-        
-        # 2. RSI Analysis
-        rsi = self.calculate_rsi(close, 14)
-        
-        # 3. MACD Analysis
-        macd_line, signal_line, histogram = self.calculate_macd(close)
-        
-        # 4. Volume Analysis
-        volume_sma = self.calculate_volume_sma(volume, 20)
+            return self._rejection("data")
+        return self._evaluate_uptrend(_LazyIndicators(self, data))
 
-        # 5. ADX Analysis (Trend Strength)
-        adx, plus_di, minus_di = self.calculate_adx(high, low, close, 14)
-        
-        # Get latest values
-        latest_close = close.iloc[-1]
-        latest_sma20 = sma20.iloc[-1]
-        latest_sma50 = sma50.iloc[-1]
-        
-        latest_rsi = rsi.iloc[-1]
-        latest_macd = macd_line.iloc[-1]
-        latest_signal = signal_line.iloc[-1]
-        latest_histogram = histogram.iloc[-1]
-        prev_histogram = histogram.iloc[-2]
-        prev2_histogram = histogram.iloc[-3]
-        
-        latest_volume = volume.iloc[-1]
-        latest_volume_sma = volume_sma.iloc[-1]
-        
-        latest_adx = adx.iloc[-1]
-        
+    def is_uptrend_live(self, state) -> Tuple[bool, Dict]:
+        """is_uptrend dari TickerState streaming (tanpa menghitung ulang history)"""
+        values = state.snapshot()
+        if "close" not in values or values["n_bars"] < self.min_data_days:
+            return self._rejection("data")
+        return self._evaluate_uptrend(values)
+
+    # === STAGED FILTER ===
+    # (stage, alasan penolakan) urut dari yang paling murah. Setiap stage hanya membaca
+    # indikator yang ia butuhkan; urutan alasan sama dengan filter is_uptrend sebelumnya.
+    # Penolakan selalu lewat _rejection(stage) sehingga hasil scan membawa id stage-nya.
+    UPTREND_STAGES = (
+        ("data", "Data tidak mencukupi"),                  # len(data)
+        ("liquidity", "Likuiditas Rendah (< 1M)"),         # close * volume
+        ("momentum", "Momentum Lemah (Kenaikan < 1%)"),    # % change (+ MACD hanya jika < 1%)
+        ("trend", "Trend Bearish Parah (<SMA50)"),         # SMA50
+        ("macd", "MACD Belum Confirm"),                    # SMA20, volume SMA, MACD
+        ("rsi", "RSI Overbought (>85)"),                   # RSI
+    )
+    UPTREND_REASONS = dict(UPTREND_STAGES)
+
+    @classmethod
+    def _rejection(cls, stage: str) -> Tuple[bool, Dict]:
+        """Penolakan di `stage`: id stage ikut disimpan (dihitung StageCounter), alasan dari UPTREND_STAGES"""
+        return False, {"reason": cls.UPTREND_REASONS[stage], "stage": stage}
+
+    @staticmethod
+    def _macd_reversal(values) -> Tuple[bool, str]:
         # === STRATEGY: MACD REVERSAL (Video Based) ===
         # Mencari saham yang akan Uptrend menggunakan MACD
         # Kunci: Histogram naik (Momentum Bearish melemah atau Bullish menguat)
-        
-        is_macd_reversal = False
-        reversal_reason = ""
+        latest_histogram = values["histogram"]
+        prev_histogram = values["prev_histogram"]
         
         # 1. Bearish Weakening (Merah Tua -> Merah Muda/Pendek)
         if prev_histogram < 0 and latest_histogram < 0 and latest_histogram > prev_histogram:
-             is_macd_reversal = True
-             reversal_reason = "MACD Histogram Bearish Melemah (Early Signal)"
+             return True, "MACD Histogram Bearish Melemah (Early Signal)"
              
         # 2. Bullish Crossover (Merah -> Hijau)
         elif prev_histogram < 0 and latest_histogram > 0:
-             is_macd_reversal = True
-             reversal_reason = "MACD Golden Cross (Konfirmasi Bullish)"
+             return True, "MACD Golden Cross (Konfirmasi Bullish)"
              
         # 3. Bullish Strengthening (Hijau -> Hijau Tinggi)
         elif latest_histogram > 0 and latest_histogram > prev_histogram:
-             is_macd_reversal = True
-             reversal_reason = "MACD Momentum Bullish Menguat"
+             return True, "MACD Momentum Bullish Menguat"
+        return False, ""
 
-        # === FILTERING ===
-        reasons = []
-        is_strong_uptrend = True
-        
-        
-        # Calculate Price Change Today
-        price_change_pct = (latest_close - close.iloc[-2]) / close.iloc[-2] * 100
-        
-        # === CRITICAL FIX: Calculate vol_ratio HERE before using it ===
-        vol_ratio = latest_volume / latest_volume_sma if latest_volume_sma > 0 else 1
-        
-        # === 0. DETEKSI NAIK KENCANG / MOMENTUM (PRIORITAS UTAMA) ===
-        # Request User: Fokus saham yang "Naik Kenceng" untuk mengurangi waktu tunggu.
-        
-        is_spike = False
-        is_high_momentum = False
-        
-        # Criteria 1: Price Change > 2% AND Price > MA5 (Short term trend up)
-        # Criteria 2: Significant Value (>1B)
+    def _evaluate_uptrend(self, values) -> Tuple[bool, Dict]:
+        """
+        Aturan filter & scoring is_uptrend di atas nilai indikator terbaru.
+        values: dict biasa (snapshot streaming) atau _LazyIndicators (dihitung saat dibaca).
+        """
+        latest_close = values["close"]
+        latest_volume = values["volume"]
         
+        # === 1. LIQUIDITY: Value minimal 1 Miliar (Biar liquid) ===
         transaction_value = latest_close * latest_volume
-        
-        if price_change_pct > 2 and latest_close > latest_sma20:
-             is_high_momentum = True
-             
-        if price_change_pct > 4 and vol_ratio > 1.2:
-             is_spike = True
-             reasons.append(f"🚀 HARGA NAIK KENCANG (+{price_change_pct:.1f}%)")
-             
-        # === FILTERING BARU (STRICT FOR MOMENTUM) ===
-        
-        # 1. Filter: Value minimal 1 Miliar (Biar liquid)
         if transaction_value < 1_000_000_000:
-             return False, {"reason": "Likuiditas Rendah (< 1M)"}
-             
-        # 2. Filter: Momentum Check
+             return self._rejection("liquidity")
+        
+        # === 2. MOMENTUM ===
         # User wants "Naik Kenceng". Reject if Price Change < 1% unless it's a perfect Golden Cross Setup
-        if price_change_pct < 1 and not (prev_histogram < 0 and latest_histogram > 0):
-             return False, {"reason": "Momentum Lemah (Kenaikan < 1%)"}
+        price_change_pct = (latest_close - values["prev_close"]) / values["prev_close"] * 100
+        if price_change_pct < 1 and not (values["prev_histogram"] < 0 and values["histogram"] > 0):
+             return self._rejection("momentum")
 
-        # 3. Base Trend Filter
+        # === 3. BASE TREND ===
         # Still need basic trend filter but allow reversals
+        latest_sma50 = values["sma50"]
         if latest_close < latest_sma50 * 0.90: # Allow deeper discount but not trash
-             return False, {"reason": "Trend Bearish Parah (<SMA50)"}
+             return self._rejection("trend")
 
-        # 4. MACD / Indicator Check
+        # === 4. MACD / MOMENTUM CONFIRMATION ===
+        # Request User: Fokus saham yang "Naik Kenceng" untuk mengurangi waktu tunggu.
+        # Criteria 1: Price Change > 2% AND Price > MA20 (Short term trend up)
+        # Criteria 2: Price Change > 4% AND Volume spike
+        latest_sma20 = values["sma20"]
+        latest_volume_sma = values["volume_sma"]
+        vol_ratio = latest_volume / latest_volume_sma if latest_volume_sma > 0 else 1
+        
+        is_high_momentum = price_change_pct > 2 and latest_close > latest_sma20
+        is_spike = price_change_pct > 4 and vol_ratio > 1.2
+        is_macd_reversal, reversal_reason = self._macd_reversal(values)
+        
+        latest_macd = values["macd"]
+        latest_signal = values["signal"]
+        
         # If it is high momentum (spike), we trust the volume and price more than lagging MACD.
         # But if not spike, we need MACD confirmation.
-        
         if not is_spike and not is_high_momentum:
              # Normal strict mode for slower stocks
              if not is_macd_reversal and not (latest_macd > latest_signal):
-                  return False, {"reason": "MACD Belum Confirm"}
+                  return self._rejection("macd")
         
+        # === 5. RSI (Support Filter) ===
+        latest_rsi = values["rsi"]
+        if latest_rsi > 85: # Sedikit longgar untuk saham gorengan/momentum
+             return self._rejection("rsi")
+        
+        reasons = []
+        if is_spike:
+             reasons.append(f"🚀 HARGA NAIK KENCANG (+{price_change_pct:.1f}%)")
         if is_macd_reversal:
              reasons.append(f"✓ {reversal_reason}")
         
-        # Support Filters
-        if latest_rsi > 85: # Sedikit longgar untuk saham gorengan/momentum
-             return False, {"reason": "RSI Overbought (>85)"}
+        latest_histogram = values["histogram"]
+        prev_histogram = values["prev_histogram"]
+        prev2_histogram = values["prev2_histogram"]
+        
+        # ADX (paling mahal) hanya untuk saham yang lolos semua filter
+        latest_adx = values["adx"]
 
         # Scoring
         score = 60
@@ -333,7 +434,6 @@ class StockAnalyzer:
             score += 15
             
         # 2. Volume Spike
-        # vol_ratio is calculated above (CRITICAL FIX)
         if vol_ratio > 1.2:
             score += 10
             
@@ -359,6 +459,74 @@ class StockAnalyzer:
         
         return True, analysis
     
+    def screen_uptrend_panel(self, panel: PricePanel) -> Dict[str, np.ndarray]:
+        """
+        Versi vectorized dari is_uptrend untuk seluruh universe sekaligus.
+        Aturan & scoring identik dengan is_uptrend, dihitung dengan array ops di atas panel.
+        Returns: dict array per ticker (urutan panel.tickers):
+                 passed (bool), reason (str, kosong jika lolos), stage (id UPTREND_STAGES penolak),
+                 score, n_bars, dll.
+        """
+        # Indikator per bar milik ticker sendiri (seperti DataFrame get_history di is_uptrend):
+        # hari suspend di kalender gabungan tidak ikut dihitung
+        ind = indicator_engine.compute_indicators(panel, compact=True)
+        last = indicator_engine.last_valid_index(ind["close"])
+        n_bars = (~np.isnan(panel.field('Close'))).sum(axis=1)
+        
+        def at(name, offset=0):
+            return indicator_engine.take_last(ind[name], last, offset)
+        
+        close, prev_close = at("close"), at("close", 1)
+        sma20, sma50 = at("sma20"), at("sma50")
+        hist0, hist1, hist2 = at("histogram"), at("histogram", 1), at("histogram", 2)
+        macd_v, signal_v = at("macd"), at("signal")
+        volume, volume_sma = at("volume"), at("volume_sma")
+        rsi_v, adx_v = at("rsi"), at("adx")
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change_pct = (close - prev_close) / prev_close * 100
+            vol_ratio = np.where(volume_sma > 0, volume / volume_sma, 1.0)
+        transaction_value = close * volume
+        
+        is_high_momentum = (price_change_pct > 2) & (close > sma20)
+        is_spike = (price_change_pct > 4) & (vol_ratio > 1.2)
+        golden_cross = (hist1 < 0) & (hist0 > 0)
+        is_macd_reversal = ((hist1 < 0) & (hist0 < 0) & (hist0 > hist1)) | golden_cross | ((hist0 > 0) & (hist0 > hist1))
+        
+        # Urutan penolakan sama dengan is_uptrend (alasan pertama yang kena dipakai)
+        masks = {
+            "data": n_bars < self.min_data_days,
+            "liquidity": transaction_value < 1_000_000_000,
+            "momentum": (price_change_pct < 1) & ~golden_cross,
+            "trend": close < sma50 * 0.90,
+            "macd": ~is_spike & ~is_high_momentum & ~is_macd_reversal & ~(macd_v > signal_v),
+            "rsi": rsi_v > 85,
+        }
+        reason = np.full(len(panel.tickers), "", dtype=object)
+        stage_of = np.full(len(panel.tickers), None, dtype=object)
+        rejected = np.zeros(len(panel.tickers), dtype=bool)
+        for stage, text in self.UPTREND_STAGES:
+            hit = masks[stage] & ~rejected
+            reason[hit] = text
+            stage_of[hit] = stage
+            rejected |= hit
+        
+        score = (60 + 20 * is_spike + 10 * is_high_momentum + 10 * (transaction_value > 5_000_000_000)
+                 + np.where(golden_cross, 25, np.where((hist0 > hist1) & (hist0 > hist2), 15, 0))
+                 + 10 * (vol_ratio > 1.2) + 5 * ((adx_v > 20) & (adx_v < 40)))
+        
+        return {
+            "tickers": np.array(panel.tickers, dtype=object),
+            "passed": ~rejected,
+            "reason": reason,
+            "stage": stage_of,
+            "score": score,
+            "n_bars": n_bars,
+            "price_change_pct": price_change_pct,
+            "volume_ratio": vol_ratio,
+            "transaction_value": transaction_value,
+        }
+
     def is_bsjp(self, data: pd.DataFrame) -> bool:
         """
         Screening BSJP (BELI SORE JUAL PAGI) updated criteria:
@@ -407,6 +575,55 @@ class StockAnalyzer:
         if prev_close < 1: return False
         
         return True
+
+    def screen_bsjp_panel(self, panel: PricePanel) -> Dict:
+        """
+        Versi vectorized dari is_bsjp untuk seluruh universe sekaligus (7 aturan yang sama).
+        Returns: dict array per ticker (urutan panel.tickers) + "matches":
+                 list ticker yang lolos, diurutkan dari transaction value terbesar.
+        """
+        # Hanya hari ticker punya bar (seperti DataFrame per ticker di is_bsjp): hari suspend di
+        # kalender gabungan tidak membuat MA/prev close menjadi NaN
+        valid = ~np.isnan(panel.field('Close'))
+        n_bars = valid.sum(axis=1)
+        close = indicator_engine.compact_last(panel.field('Close'), valid, 20)
+        volume = indicator_engine.compact_last(panel.field('Volume'), valid, 20)
+        
+        latest_close, prev_close = close[:, -1], close[:, -2]
+        latest_volume, prev_volume = volume[:, -1], volume[:, -2]
+        vol_ma20 = volume.mean(axis=1)
+        price_ma10 = close[:, -10:].mean(axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_return_pct = (latest_close - prev_close) / prev_close * 100
+            volume_ratio = latest_volume / vol_ma20
+        transaction_value = latest_close * latest_volume
+        
+        # Perbandingan dengan NaN = False -> ticker dengan bar < 25 / volume kosong tidak lolos
+        passed = (
+            (n_bars >= 25)
+            & (price_return_pct > 1)                      # 1. 1 Day Price Returns (%) > 1
+            & (latest_volume > 2 * vol_ma20)              # 2. Volume > 2 * Volume MA 20
+            & (latest_volume > 2 * prev_volume)           # 3. Volume > 2 * Previous Volume
+            & (transaction_value > 10_000_000_000)        # 4. Value > 10 Miliar
+            & (latest_close > prev_close)                 # 5. Price > Previous Price
+            & (latest_close > price_ma10)                 # 6. Price > Price MA 10
+            & (prev_close >= 1)                           # 7. Previous Price >= 1
+        )
+        
+        tickers = np.array(panel.tickers, dtype=object)
+        order = np.argsort(-np.where(passed, transaction_value, -np.inf), kind='stable')
+        matches = [tickers[i] for i in order if passed[i]]
+        
+        return {
+            "tickers": tickers,
+            "passed": passed,
+            "matches": matches,
+            "n_bars": n_bars,
+            "price_return_pct": price_return_pct,
+            "volume_ratio": volume_ratio,
+            "transaction_value": transaction_value,
+        }
     
     def is_red_to_green_momentum(self, data: pd.DataFrame) -> Tuple[bool, Dict]:
         """
@@ -417,21 +634,29 @@ class StockAnalyzer:
         if len(data) < 25: return False, {}
         
         close = data['Close']
-        high = data['High']
-        low = data['Low']
-        open_price = data['Open']
         volume = data['Volume']
         
-        # Latest Candle
-        latest_close = close.iloc[-1]
-        latest_open = open_price.iloc[-1]
-        latest_low = low.iloc[-1]
-        latest_high = high.iloc[-1]
-        latest_volume = volume.iloc[-1]
-        
-        # Previous Day
-        prev_close = close.iloc[-2]
+        # 5. Volume Spike (Relative to MA20)
+        # Kita asumsikan ini intraday, jadi volume mungkin belum full daily.
+        # Tapi "Momentum" biasanya volume deres.
+        vol_ma20 = volume.rolling(window=20).mean().iloc[-2] # Pakai rata2 historical
         
+        return self._red_to_green_check(
+            data['Open'].iloc[-1], data['High'].iloc[-1], data['Low'].iloc[-1],
+            close.iloc[-1], volume.iloc[-1], close.iloc[-2], vol_ma20
+        )
+
+    def is_red_to_green_live(self, state) -> Tuple[bool, Dict]:
+        """is_red_to_green_momentum dari TickerState streaming (O(1) per evaluasi)"""
+        v = state.snapshot()
+        if "close" not in v or v["n_bars"] < 25: return False, {}
+        return self._red_to_green_check(
+            v["open"], v["high"], v["low"], v["close"], v["volume"], v["prev_close"], v["prev_volume_sma"]
+        )
+
+    def _red_to_green_check(self, latest_open, latest_high, latest_low, latest_close, latest_volume,
+                            prev_close, vol_ma20) -> Tuple[bool, Dict]:
+        """Aturan Red-to-Green di atas nilai candle terbaru"""
         # 1. Condition: Was Red (Low < PrevClose)
         # Artinya sempat turun di bawah harga kemarin
         if latest_low >= prev_close:
@@ -450,11 +675,7 @@ class StockAnalyzer:
         if change_pct < 1.0 or change_pct > 24:
              return False, {}
              
-        # 5. Volume Spike (Relative to MA20)
-        # Kita asumsikan ini intraday, jadi volume mungkin belum full daily.
-        # Tapi "Momentum" biasanya volume deres.
-        vol_ma20 = volume.rolling(window=20).mean().iloc[-2] # Pakai rata2 historical
-        
+        # 5. Volume Spike (Relative to MA20, dihitung oleh caller)
         # Minimal volume sudah tembus 25% dari rata-rata harian (untuk pagi)
         # atau Ratio > 1.5x volume kemarin di jam yang sama (susah dpt data jam)
         # Kita pakai threshold simple: Volume > 0.3 * MA20Volume
@@ -484,6 +705,70 @@ class StockAnalyzer:
             "reason": f"Sempat turun ke {int(latest_low)}, Rebound kuat ke {int(latest_close)} (+{change_pct:.1f}%)"
         }
 
+    def screen_red_to_green(self, tickers, open_p, high, low, last, volume, prev_close, vol_ma20,
+                            n_bars=None) -> Dict:
+        """
+        Versi cross-sectional dari _red_to_green_check untuk seluruh universe sekaligus.
+        Input: array per ticker (harga & volume hari ini, prev close, Volume MA20 historis,
+        opsional jumlah bar history). Returns: dict array + "passed" (mask) dan field alasan
+        yang dipakai pesan alert (price, change_pct, volume, prev_close, low, reason).
+        """
+        tickers = np.asarray(tickers, dtype=object)
+        open_p, high, low, last, volume, prev_close, vol_ma20 = (
+            np.asarray(x, dtype=float) for x in (open_p, high, low, last, volume, prev_close, vol_ma20)
+        )
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = (last - prev_close) / prev_close * 100
+        transaction_value = last * volume
+        
+        # Aturan 1-7 sama dengan _red_to_green_check (NaN -> tidak lolos)
+        passed = (
+            (low < prev_close)                                   # 1. Sempat merah
+            & (last > prev_close)                                # 2. Sekarang hijau
+            & (last > open_p)                                    # 3. Candle hijau
+            & (change_pct >= 1.0) & (change_pct <= 24)           # 4. Momentum
+            & (volume >= vol_ma20 * 0.3)                         # 5. Volume vs MA20
+            & (transaction_value >= 2_000_000_000)               # 6. Value > 2 Miliar
+            & ~((high - last) > (last - open_p) * 1.5)           # 7. Upper shadow tidak kepanjangan
+        )
+        if n_bars is not None:
+            passed &= np.asarray(n_bars) >= 25
+        
+        reason = np.full(len(tickers), "", dtype=object)
+        for i in np.flatnonzero(passed):
+            reason[i] = f"Sempat turun ke {int(low[i])}, Rebound kuat ke {int(last[i])} (+{change_pct[i]:.1f}%)"
+        
+        return {
+            "tickers": tickers,
+            "passed": passed,
+            "price": last,
+            "change_pct": change_pct,
+            "volume": volume,
+            "prev_close": prev_close,
+            "low": low,
+            "transaction_value": transaction_value,
+            "reason": reason,
+        }
+
+    def red_to_green_matches(self, screen: Dict) -> list:
+        """Ubah hasil screen_red_to_green ke format {"ticker", "data"} seperti is_red_to_green_momentum"""
+        matches = []
+        for i in np.flatnonzero(screen["passed"]):
+            matches.append({
+                "ticker": screen["tickers"][i],
+                "data": {
+                    "strategy": "RED TO GREEN MOMENTUM",
+                    "price": screen["price"][i],
+                    "change_pct": screen["change_pct"][i],
+                    "volume": screen["volume"][i],
+                    "prev_close": screen["prev_close"][i],
+                    "low": screen["low"][i],
+                    "reason": screen["reason"][i],
+                }
+            })
+        return matches
+
     def calculate_entry_tp(self, data: pd.DataFrame, analysis: Dict, session: int = None, iep: float = None) -> Tuple[Optional[float], Optional[float], Dict]:
         """
         Menghitung Entry Point & TP dengan Analisis Mendalam (Deep Research):
@@ -505,8 +790,9 @@ class StockAnalyzer:
         fib = self.calculate_fibonacci(data)
         
         # 2. Moving Averages Support
-        ma5 = self.calculate_sma(close, 5).iloc[-1]
-        ma10 = self.calculate_sma(close, 10).iloc[-1]
+        memo = memo_for(data)
+        ma5 = memo.get(("sma", "Close", 5), lambda: self.calculate_sma(close, 5)).iloc[-1]
+        ma10 = memo.get(("sma", "Close", 10), lambda: self.calculate_sma(close, 10)).iloc[-1]
         
         # 3. Indicators
         indicators = analysis.get("indicators", {})
@@ -669,240 +955,183 @@ class StockAnalyzer:
         
         return entry_final, int(tp2), result
     
-    def analyze_stock(self, ticker: str, period: str = "6mo", session: int = None) -> Dict: # Using 6mo for better SMA200/ADX context
+    def analyze_stock(self, ticker: str, period: str = "6mo", session: int = None, data: pd.DataFrame = None,
+                      iep: float = None) -> Dict: # Using 6mo for better SMA200/ADX context
         """
         Main function untuk menganalisis saham
         Returns: Dictionary dengan hasil analisis lengkap
+        `data` opsional: history yang sudah diunduh (mis. dari batch fetch)
+        `iep` opsional: open sesi 1 dari snapshot quote milik caller (mis. worker process pipeline)
         """
         try:
-            # Download data dari yfinance
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
+            # Data dari store lokal (hanya bar baru yang diunduh)
+            stock = HTTP_SESSIONS.ticker(ticker)
+            if data is None:
+                data = self.get_history(ticker, period)
             
             if data.empty or len(data) < self.min_data_days:
                 # Log but don't delete from file, just return failure for this run
-                return {
-                    "success": False,
-                    "error": f"Data tidak mencukupi/kosong untuk {ticker}",
-                    "ticker": ticker
-                }
+                return ScanResult.failure(ticker, f"Data tidak mencukupi/kosong untuk {ticker}", stage="data")
             
-            # Fetch IEP / Market Status if Session 1
-            iep = 0.0
+            # IEP / Market Status if Session 1: open hari ini dari snapshot quote batch
+            # (di-refresh sekali sebelum scan), tanpa request per ticker
             if session == 1:
                 try:
-                    # Try to get Open price from info (sometimes delayed 15m)
-                    # Or 'regularMarketOpen'
-                    # Note: This increases latency.
-                    # Optimization: Only fetch if needed, but we do need it for the logic.
-                    # stock.info is slow. Check fast_info first if possible?
-                    # fast_info is available in newer yfinance.
-                    
-                    # Try fast_info (requires yfinance >= 0.2)
-                    if hasattr(stock, 'fast_info'):
-                        # 'open' might be available
-                        if 'open' in stock.fast_info:
-                             iep = stock.fast_info['open']
-                    
-                    # Fallback to info
                     if not iep:
-                         iep = stock.info.get('open', 0)
-                         if not iep:
-                             iep = stock.info.get('regularMarketOpen', 0)
-                         if not iep:
-                             # Try getting today's data from history if available
-                             if data.index[-1].date() == datetime.now().date():
-                                 iep = data['Open'].iloc[-1]
+                        iep = self.quotes.open_price(ticker) or 0.0
+                    # Fallback: bar hari ini di history (sudah di memori), baru stock.info (paling lambat)
+                    if not iep and data.index[-1].date() == datetime.now().date():
+                         iep = data['Open'].iloc[-1]
+                    if not iep:
+                         info = FETCH_SCHEDULER.call(lambda: stock.info, kind="info")
+                         iep = info.get('open', 0) or info.get('regularMarketOpen', 0)
                 except:
                     pass
+            iep = iep or 0.0
 
             # Deteksi uptrend
             is_uptrend, trend_analysis = self.is_uptrend(data)
             
             if not is_uptrend:
-                return {
-                    "success": True,
-                    "ticker": ticker,
-                    "is_uptrend": False,
-                    "message": "Saham tidak memenuhi kriteria strong uptrend",
-                    "analysis": trend_analysis
-                }
+                return ScanResult.rejected(ticker, trend_analysis.get("reason", ""), trend_analysis.get("stage"))
             
             # Calculate Entry dan TP
             entry, tp, tp_analysis = self.calculate_entry_tp(data, trend_analysis, session=session, iep=iep)
             
             if entry is None or tp is None:
-                return {
-                    "success": False,
-                    "error": "Gagal menghitung entry dan TP",
-                    "ticker": ticker
-                }
+                return ScanResult.failure(ticker, "Gagal menghitung entry dan TP")
             
-            # Get stock info (Optional, might slow down if too many requests)
-            try:
-                info = stock.info
-                stock_name = info.get('longName', ticker)
-            except:
-                stock_name = ticker
+            # Nama dari direktori emiten lokal (stock.info hanya jika ticker belum ada)
+            stock_name = self.directory.name(ticker, stock)
             
             current_price = data['Close'].iloc[-1]
             
-            # Prepare result
-            result = {
-                "success": True,
-                "ticker": ticker,
-                "name": stock_name,
-                "is_uptrend": True,
-                "current_price": current_price,
-                "entry": entry,
-                "tp": tp,
-                "profit_pct": tp_analysis["profit_pct"],
-                "is_ara_potential": tp_analysis["is_ara_potential"],
-                "support": tp_analysis["support"],
-                "resistance": tp_analysis["resistance"],
-                "entry_haka": tp_analysis["entry_haka"],
-                "entry_pullback": tp_analysis["entry_pullback"],
-                "iep": tp_analysis.get("iep", 0),
-                "recommended_option": tp_analysis["recommended_option"],
-                "recom_reason": tp_analysis["recom_reason"],
-                "entry_pullback_reason": tp_analysis["entry_pullback_reason"],
-                "strategy": tp_analysis["strategy"],
-                "market_cond": tp_analysis["market_cond"],
-                "analysis": trend_analysis,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            return result
+            # Record compact (dict view via result["key"] / result.to_dict())
+            return ScanResult.uptrend(ticker, stock_name, current_price, entry, tp, trend_analysis, tp_analysis)
             
+        except ThrottledError as e:
+            # Bedakan dari "Data tidak mencukupi": ticker di-requeue oleh scan
+            return ScanResult.throttled_failure(ticker, str(e))
         except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "ticker": ticker
-            }
+            return ScanResult.failure(ticker, str(e))
+    
+    NEWS_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+    
+    @staticmethod
+    def news_url(ticker: str) -> str:
+        """URL Google News RSS untuk ticker"""
+        ticker_clean = ticker.replace(".JK", "")
+        # Use quotes to ensure specific ticker search (e.g. "BUMI")
+        query = f'"{ticker_clean}" saham'
+        return f"https://news.google.com/rss/search?q={query}&hl=id-ID&gl=ID&ceid=ID:id"
     
     def get_stock_news(self, stock: yf.Ticker) -> str:
-        """Mengambil dan menganalisis sentimen berita terbaru via Google News RSS"""
-        import requests
+        """Mengambil dan menganalisis sentimen berita terbaru via Google News RSS (lewat cache berita)"""
+        ticker = stock.ticker
+        cached = self.news_cache.fresh(ticker)
+        if cached is not None:
+            return self.render_news(cached)
+        try:
+            # 1. Try Google News RSS first (More up to date for IDX), revalidasi entry lama jika ada
+            headers = {**self.NEWS_HEADERS, **self.news_cache.conditional_headers(ticker)}
+            response = FETCH_SCHEDULER.call(HTTP_SESSIONS.get, self.news_url(ticker), headers=headers,
+                                            timeout=5, kind="news", is_empty=None)
+            return self.news_from_response(ticker, response.status_code, response.content, response.headers, stock)
+            
+        except Exception as e:
+            print(f"News fetch error: {e}")
+            return "Gagal mengambil berita."
+    
+    def news_from_response(self, ticker: str, status: Optional[int], content: Optional[bytes],
+                           headers=None, stock: Optional[yf.Ticker] = None) -> str:
+        """
+        Respons RSS -> teks berita. 304 memakai item di cache, 200 di-parse lalu disimpan ke cache;
+        selain itu (status None = request gagal) hanya fallback Yahoo tanpa mengisi cache.
+        Blocking (parse XML & fallback yfinance): dari event loop panggil lewat executor.
+        """
+        items = self.news_cache.not_modified(ticker) if status == 304 else None
+        if items is None:
+            items = self.news_items(ticker, content if status == 200 else None, stock)
+            if status in (200, 304):
+                self.news_cache.put(ticker, items, headers if status == 200 else None)
+        return self.render_news(items)
+    
+    def news_items(self, ticker: str, content: Optional[bytes], stock: Optional[yf.Ticker] = None) -> List[Dict]:
+        """Parse RSS Google News (content None jika tidak ada), fallback ke berita Yahoo. Maks 3 item"""
         import xml.etree.ElementTree as ET
         import html
-        import re
         
-        try:
-            # 1. Try Google News RSS first (More up to date for IDX)
-            ticker_clean = stock.ticker.replace(".JK", "")
-            # Use quotes to ensure specific ticker search (e.g. "BUMI")
-            query = f'"{ticker_clean}" saham'
-            url = f"https://news.google.com/rss/search?q={query}&hl=id-ID&gl=ID&ceid=ID:id"
-            
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-            response = requests.get(url, headers=headers, timeout=5)
-            news_items = []
+        ticker_clean = ticker.replace(".JK", "").lower()
+        news_items = []
+        seen_titles = set()
+        
+        # Helper to clean and add item (dedupe by title sekaligus)
+        def add_item(t, l):
+            t = html.unescape(t)
+            for sept in [' - ', ' | ']: # Remove source suffix
+                if sept in t:
+                    t = t.rsplit(sept, 1)[0]
+            # Filter: Ticker must be present (lenient) or generic huge news
+            # But user wants specific.
+            if ticker_clean in t.lower() and t not in seen_titles:
+                 seen_titles.add(t)
+                 news_items.append({"title": t, "link": l})
+
+        if content is not None:
+            root = ET.fromstring(content)
+            items = root.findall('./channel/item')
             
-            # Helper to clean and add item
-            def add_item(t, l):
-                t = html.unescape(t)
-                for sept in [' - ', ' | ']: # Remove source suffix
-                    if sept in t:
-                        t = t.rsplit(sept, 1)[0]
-                # Filter: Ticker must be present (lenient) or generic huge news
-                # But user wants specific.
-                if ticker_clean.lower() in t.lower():
-                     news_items.append({"title": t, "link": l})
-
-            if response.status_code == 200:
-                root = ET.fromstring(response.content)
-                items = root.findall('./channel/item')
+            for item in items[:5]: # Check top 5 parent items
+                title_elem = item.find('title')
+                link_elem = item.find('link')
+                desc_elem = item.find('description') # Description often has the cluster
                 
-                for item in items[:5]: # Check top 5 parent items
-                    title_elem = item.find('title')
-                    link_elem = item.find('link')
-                    desc_elem = item.find('description') # Description often has the cluster
-                    
-                    if title_elem is None or link_elem is None: continue
+                if title_elem is None or link_elem is None: continue
 
-                    title_raw = title_elem.text
-                    link_raw = link_elem.text
-                    desc_raw = desc_elem.text if desc_elem is not None else ""
-                    
-                    # Check if description has clustered stories (HTML list)
-                    if desc_raw and '<ol>' in desc_raw:
-                        # Extract links from HTML
-                        matches = re.findall(r'<a href="(.*?)".*?>(.*?)</a>', desc_raw)
-                        for link, title in matches:
-                            add_item(title, link)
-                    else:
-                        add_item(title_raw, link_raw)
-                        
-            # 2. Deduplicate by title
-            unique_news = []
-            seen_titles = set()
-            for n in news_items:
-                if n['title'] not in seen_titles:
-                    unique_news.append(n)
-                    seen_titles.add(n['title'])
-            
-            news_items = unique_news[:5] # Limit pool
-
-            # 3. Fallback to Yahoo if empty
-            if not news_items:
-                 try:
-                     y_news = stock.news
-                     for item in y_news[:3]:
-                        content = item.get('content', {})
-                        t = content.get('title', item.get('title', ''))
-                        l = content.get('clickThroughUrl', item.get('link', ''))
-                        if t and l:
-                            add_item(t, l)
-                 except: 
-                     pass
-                 
-                 # Deduplicate again after fallback
-                 unique_news = []
-                 seen_titles = set()
-                 for n in news_items:
-                    if n['title'] not in seen_titles:
-                        unique_news.append(n)
-                        seen_titles.add(n['title'])
-
-            news_items = unique_news[:3] # Final Check limit 3
-
-            if not news_items:
-                return "Tidak ada berita terbaru saat ini."
-            
-            # Keywords for sentiment
-            pos_keywords = ["profit", "jump", "surge", "gain", "buy", "bull", "growth", "record", "revenue up", "income up", "acquisition", "laba", "naik", "tumbuh", "dividen", "akuisisi", "kerjasama", "positif", "hijau", "cuan", "melejit", "terbang", "disetujui", "divestasi", "untung", "kinclong", "bersinar", "net buy", "full senyum", "dividen"]
-            neg_keywords = ["loss", "drop", "plunge", "fall", "sell", "bear", "down", "revenue down", "income down", "suit", "fine", "debt", "bankrupt", "rugi", "turun", "anjlok", "utang", "pailit", "gugat", "merah", "koreksi", "suspend", "net sell", "boncos", "melorot", "anjlok", "kebakaran", "phk"]
-            
-            formatted_news = []
-            
-            for item in news_items:
-                title = item['title']
-                link = item['link']
+                title_raw = title_elem.text
+                link_raw = link_elem.text
+                desc_raw = desc_elem.text if desc_elem is not None else ""
                 
-                # Sentiment
-                text_to_check = title.lower()
-                if any(k in text_to_check for k in pos_keywords):
-                    emoji = "🟢"
-                elif any(k in text_to_check for k in neg_keywords):
-                    emoji = "🔴"
+                # Check if description has clustered stories (HTML list)
+                if desc_raw and '<ol>' in desc_raw:
+                    # Extract links from HTML
+                    for link, title in _NEWS_CLUSTER_LINK.findall(desc_raw):
+                        add_item(title, link)
                 else:
-                    emoji = "⚪"
-                
-                # Format: "• [Emoji] Title" -> Link (Clean & clickable)
-                news_entry = f"• {emoji} [{title}]({link})"
-                formatted_news.append(news_entry)
-                
-            return "\n".join(formatted_news)
-            
-        except Exception as e:
-            print(f"News fetch error: {e}")
-            return "Gagal mengambil berita."
+                    add_item(title_raw, link_raw)
+
+        # Fallback to Yahoo if empty
+        if not news_items:
+             try:
+                 stock = stock or HTTP_SESSIONS.ticker(ticker)
+                 y_news = FETCH_SCHEDULER.call(lambda: stock.news, kind="news", is_empty=None)
+                 for item in y_news[:3]:
+                    y_content = item.get('content', {})
+                    t = y_content.get('title', item.get('title', ''))
+                    l = y_content.get('clickThroughUrl', item.get('link', ''))
+                    if t and l:
+                        add_item(t, l)
+             except: 
+                 pass
+
+        return news_items[:3] # Final Check limit 3
+    
+    def render_news(self, news_items: List[Dict]) -> str:
+        """Format item berita dengan emoji sentimen (regex leksikon terkompilasi, satu pass per batch)"""
+        if not news_items:
+            return "Tidak ada berita terbaru saat ini."
+        
+        labels = HEADLINE_CLASSIFIER.classify_many([item['title'] for item in news_items])
+        # Format: "• [Emoji] Title" -> Link (Clean & clickable)
+        return "\n".join(f"• {SENTIMENT_EMOJI[label]} [{item['title']}]({item['link']})"
+                         for item, label in zip(news_items, labels))
 
     def get_stock_fundamentals(self, stock: yf.Ticker) -> Dict:
         """Mengambil data fundamental perusahaan"""
         try:
-            info = stock.info
+            info = self.directory.info(stock.ticker, stock)
+            if not info:
+                return {"eps": "-", "net_income": "-", "total_assets": "-", "error": "Data fundamental tidak tersedia"}
             
             # Helper to format big numbers
             def fmt_num(n):
@@ -984,41 +1213,62 @@ class StockAnalyzer:
              
         return narrative
 
-    def analyze_stock_detailed(self, ticker: str) -> Dict:
+    def _fetch_realtime_quote(self, ticker: str) -> Tuple[Optional[float], Optional[float]]:
+        """Harga realtime & previous close dari snapshot quote (refresh ticker ini jika basi), fallback stock.info"""
+        quote = self.quotes.quote(ticker)
+        if quote is not None and quote.last > 0:
+            return quote.last, quote.prev_close
+        stock = HTTP_SESSIONS.ticker(ticker)
+        info = FETCH_SCHEDULER.call(lambda: stock.info, kind="info")
+        return (info.get('currentPrice') or info.get('regularMarketPrice'),
+                info.get('previousClose') or info.get('regularMarketPreviousClose'))
+
+    def analyze_stock_detailed(self, ticker: str, render_chart: Optional[Callable[[pd.DataFrame, str], Any]] = None,
+                               deadline: float = DETAIL_DEADLINE) -> Dict:
         """
         Analisis mendalam single shot untuk command bot interaktif
         Termasuk fundamental dan format pesan lengkap
-        """
-        # 1. Base Analysis
-        base_result = self.analyze_stock(ticker, period="6mo")
-        
-        # If analyze_stock failed completely (e.g. no data)
-        if base_result.get("error"):
-             return base_result
 
-        stock = yf.Ticker(ticker)
-        
-        # 2. Add Fundamentals (Refresh in case base analysis skipped it)
-        finals = self.get_stock_fundamentals(stock)
-        base_result["fundamentals"] = finals
-        
-        # 2b. Add News
-        news_summary = self.get_stock_news(stock)
-        base_result["news"] = news_summary
-        
-        # 3. Check technicals again if base_result was 'false' on uptrend
-        # or if we are just doing a detailed lookup.
-        # Retry mechanism for data fetching
+        History diambil sekali; fundamental, berita, harga realtime dan chart (render_chart(data, ticker),
+        opsional, hasilnya di result["chart"]) berjalan paralel dengan satu deadline bersama yang
+        dihitung sejak history siap. Bagian yang belum selesai saat deadline diisi placeholder.
+        """
+        # 1. Fetch history sekali (retry), frame yang sama dipakai analisa dasar,
+        # update realtime, Bollinger dan chart sehingga memo indikatornya ikut terpakai.
+        # Retry tidak dimulai lagi setelah deadline lewat.
+        history_started = time_mod.monotonic()
         data = pd.DataFrame()
         for attempt in range(3):
+            if attempt and time_mod.monotonic() - history_started > deadline:
+                break
             try:
-                data = stock.history(period="6mo")
+                data = self.get_history(ticker, "6mo")
                 if not data.empty and len(data) > 30: # 30 days min for basic MA
                     break
             except Exception as e:
                 print(f"Retry {attempt+1} for {ticker}: {e}")
+
+        # Deadline enrichment dihitung sejak history siap: history lambat tidak menghabiskan
+        # jatah harga realtime & chart
+        started = time_mod.monotonic()
+
+        def remaining():
+            return max(0.0, deadline - (time_mod.monotonic() - started))
+
+        # 2. Enrichment I/O langsung jalan di background (Ticker terpisah per thread:
+        # objek yf.Ticker yang sama tidak aman dipakai dua thread sekaligus)
+        fundamentals_future = self._detail_pool.submit(self.get_stock_fundamentals, HTTP_SESSIONS.ticker(ticker))
+        news_future = self._detail_pool.submit(self.get_stock_news, HTTP_SESSIONS.ticker(ticker))
+        quote_future = self._detail_pool.submit(self._fetch_realtime_quote, ticker)
+
+        # 3. Base Analysis selagi request berjalan (dict penuh: hasil detail ditambah banyak field di bawah)
+        base_result = self.analyze_stock(ticker, period="6mo", data=data).to_dict()
+        
+        # If analyze_stock failed completely (e.g. no data)
+        if base_result.get("error"):
+             return base_result
             
-        # 2c. Force Realtime Price Update
+        # 4. Force Realtime Price Update
         
         # Helper for safe float -> int
         def safe_int(val):
@@ -1037,26 +1287,10 @@ class StockAnalyzer:
         change_pct = 0
 
         try:
-            # Get realtime price from fast_info (most accurate for IDX)
-            current_price = None
-            prev_close = None
-            
-            # Try fast_info first (most reliable/fast)
-            if hasattr(stock, 'fast_info'):
-                try:
-                    current_price = stock.fast_info.last_price
-                    prev_close = stock.fast_info.previous_close
-                    if current_price is None: 
-                        current_price = stock.fast_info.get('last_price')
-                        prev_close = stock.fast_info.get('previous_close')
-                except:
-                    pass
-            
-            # Fallback to stock.info
-            if current_price is None:
-                 info = stock.info
-                 current_price = info.get('currentPrice') or info.get('regularMarketPrice')
-                 prev_close = info.get('previousClose') or info.get('regularMarketPreviousClose')
+            # Harga realtime (snapshot quote, fallback stock.info); lewat jatahnya -> pakai close terakhir,
+            # sisa deadline untuk chart yang menunggu frame final
+            quote_timeout = max(0.0, remaining() - deadline * (1 - DETAIL_QUOTE_SHARE))
+            current_price, prev_close = quote_future.result(timeout=quote_timeout)
 
             if current_price and prev_close:
                 change_pct = calc_pct(current_price, prev_close)
@@ -1099,6 +1333,10 @@ class StockAnalyzer:
                         except:
                            pass # If concat fails, ignore realtime update to dataframe
                         
+        except FutureTimeout:
+            print(f"Realtime price {ticker} melewati deadline, pakai close terakhir")
+            current_price = data['Close'].iloc[-1] if not data.empty else 0
+            change_pct = 0
         except Exception as e:
             print(f"Realtime price fetch error: {e}")
             current_price = data['Close'].iloc[-1] if not data.empty else 0
@@ -1111,6 +1349,9 @@ class StockAnalyzer:
         if data.empty or len(data) < 30:
              return {"success": False, "error": f"Data tidak cukup/kosong untuk {ticker} (Coba lagi nanti)"}
 
+        # Frame final (dengan candle realtime): chart dirender paralel dengan analisa di bawah
+        chart_future = self._detail_pool.submit(render_chart, data, ticker) if render_chart is not None else None
+
         if not base_result.get("is_uptrend"):
              if not data.empty and len(data) > 50:
                  is_up, analysis = self.is_uptrend(data)
@@ -1129,8 +1370,9 @@ class StockAnalyzer:
         # 4. Add Bollinger Bands Analysis
         # Re-calculate with updated data
         close = data['Close']
-        sma20 = close.rolling(window=20).mean()
-        std20 = close.rolling(window=20).std()
+        memo = memo_for(data)
+        sma20 = memo.get(("sma", "Close", 20), lambda: self.calculate_sma(close, 20))
+        std20 = memo.get(("std", "Close", 20), lambda: close.rolling(window=20).std())
         upper_bb = sma20 + (std20 * 2)
         lower_bb = sma20 - (std20 * 2)
         
@@ -1195,6 +1437,16 @@ class StockAnalyzer:
         
         price_icon = "🟢" if change_pct_clean >= 0 else "🔴"
         
+        # 5. Kumpulkan enrichment dalam sisa deadline
+        finals = _future_result(fundamentals_future, remaining(), {
+            "eps": "-", "net_income": "-", "total_assets": "-", "error": "Data fundamental belum tersedia (timeout)"})
+        base_result["fundamentals"] = finals
+        base_result["news"] = _future_result(news_future, remaining(), "Berita belum tersedia (timeout).")
+        if chart_future is not None:
+            base_result["chart"] = _future_result(chart_future, remaining(), None)
+        # Nama dari direktori (sudah diisi thread fundamental jika miss), tanpa stock.info tambahan
+        name = (self.directory.peek(ticker) or {}).get("name") or base_result.get("name") or ticker
+        
         # Safe Int wrappers
         c_price = safe_int(current_price)
         s_eps = finals.get('eps', '-')
@@ -1202,7 +1454,7 @@ class StockAnalyzer:
         s_ast = finals.get('total_assets', '-')
         
         message = (
-            f"⚡ *ANALISA SAHAM - {stock.info.get('longName', ticker)} ({ticker})*\n"
+            f"⚡ *ANALISA SAHAM - {name} ({ticker})*\n"
             f"🕒 Waktu: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
             f"{price_icon} *Harga Saat Ini: {c_price:,}* ({change_pct_clean:+.2f}%)\n\n"
             f"{narrative}\n\n"
@@ -1235,49 +1487,224 @@ class StockAnalyzer:
     def analyze_bsjp_ticker(self, ticker: str) -> bool:
         """Helper to quickly check BSJP status for a ticker"""
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="3mo") # Need 20 days MA
+            data = self.get_history(ticker, "3mo") # Need 20 days MA
             return self.is_bsjp(data)
         except:
             return False
 
-    def analyze_tickers_parallel(self, tickers: list, period: str = "6mo", max_workers: int = 10, session: int = None) -> list:
+    def iter_history_batches(self, tickers: list, period: str = "6mo", batch_size: int = 50):
+        """
+        Yield dict {ticker: DataFrame} per batch.
+        Batch pertama berisi ticker yang masih segar di cache, sisanya diunduh
+        multi-symbol lewat store lalu disimpan ke cache. Ticker yang gagal diunduh
+        tidak muncul di hasil (caller fallback ke get_history).
+        """
+        cached = {}
+        to_fetch = []
+        for ticker in tickers:
+            data = self.cache.peek(ticker, period)
+            if data is None:
+                to_fetch.append(ticker)
+            else:
+                cached[ticker] = data
+        if cached:
+            yield cached
+        
+        if not to_fetch or self.store is None:
+            return
+        load_period = self.cache.load_period(period)
+        for frames in self.store.iter_history_batches(to_fetch, load_period, batch_size):
+            batch = {}
+            for ticker, data in frames.items():
+                self.cache.put(ticker, data, load_period)
+                batch[ticker] = slice_period(data, period).copy()
+            yield batch
+
+    def analyze_tickers_parallel(self, tickers: list, period: str = "6mo", max_workers: int = 10, session: int = None,
+                                 batch_size: int = None, prescreen: bool = False) -> list:
         """
         Menganalisis multiple saham secara parallel
+        batch_size: jika diisi, history diunduh per batch (multi-symbol) lalu
+                    analisis tiap ticker memakai data batch tanpa request tambahan.
+        prescreen: (butuh batch_size) screening is_uptrend dijalankan vectorized untuk
+                   seluruh universe, analisis lengkap hanya untuk ticker yang lolos.
         Returns: List hasil analisis
         """
-        results = []
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        return list(self.iter_analyze_tickers(tickers, period, max_workers, session, batch_size, prescreen))
+
+    def iter_analyze_tickers(self, tickers: list, period: str = "6mo", max_workers: int = 10, session: int = None,
+                             batch_size: int = None, prescreen: bool = False, budget=None):
+        """
+        Sama seperti analyze_tickers_parallel, tapi yield hasil satu per satu begitu selesai
+        sehingga caller bisa memproses (mis. ranking top-K) tanpa menunggu seluruh universe.
+        budget: ScanBudget opsional (deadline scan + timeout per ticker). Ticker yang belum selesai
+                saat budget habis di-yield sebagai hasil timed_out, hasilnya menyusul lewat
+                budget.late_results().
+        """
+        # Hitungan per stage milik scan ini (dari hasil yang di-yield, bukan state analyzer)
+        stages = StageCounter(self.UPTREND_STAGES)
+
+        def rerun(retry):
+            # Ticker yang kena rate limit diulang per ticker setelah scheduler menurunkan concurrency
+            if budget is not None and budget.expired():
+                return (budget.timed_out_result(t) for t in retry)
+            return self._iter_analyze_once(retry, period, max_workers, session, budget=budget)
+
+        for result in requeue_throttled(
+            self._iter_analyze_once(tickers, period, max_workers, session, batch_size, prescreen, budget),
+            rerun,
+        ):
+            stages.record_result(result)
+            yield result
+        print(f"Filter stage: {stages.format()}")
+        print(f"Fetch scheduler: {FETCH_SCHEDULER.stats()}")
+        print(f"HTTP session: {HTTP_SESSIONS.stats()['total']}")
+        if budget is not None:
+            print(f"Budget scan: {budget.stats()}")
+
+    def _submit(self, executor, budget, ticker: str, period: str, session: int, data: pd.DataFrame = None):
+        if budget is None:
+            return executor.submit(self.analyze_stock, ticker, period, session, data)
+        return executor.submit(budget.run, ticker, self.analyze_stock, ticker, period, session, data)
+
+    @staticmethod
+    def _iter_completed(future_to_ticker: dict, budget=None):
+        """
+        as_completed dengan budget: yield (ticker, future) begitu selesai, atau (ticker, None)
+        untuk ticker yang melewati deadline scan / timeout per ticker. Task yang masih
+        berjalan didaftarkan sebagai straggler di budget.
+        """
+        from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+        
+        if budget is None:
+            for future in as_completed(list(future_to_ticker)):
+                yield future_to_ticker.pop(future), future  # Lepas referensi agar hasil tidak menumpuk
+            return
+        
+        pending = set(future_to_ticker)
+        while pending:
+            done, pending = wait(pending, timeout=budget.poll_timeout(), return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future_to_ticker.pop(future), future
+            expired = budget.expired()
+            for future in list(pending):
+                ticker = future_to_ticker[future]
+                if not expired and not budget.ticker_expired(ticker):
+                    continue
+                pending.discard(future)
+                future_to_ticker.pop(future)
+                if not future.cancel():
+                    budget.track_future(ticker, future)  # Sudah berjalan: hasil menyusul
+                yield ticker, None
+
+    def _collect(self, future_to_ticker: dict, budget, total: int):
+        """Ubah future yang selesai menjadi ScanResult (timed_out untuk yang melewati budget)"""
+        for i, (ticker, future) in enumerate(self._iter_completed(future_to_ticker, budget)):
+            if future is None:
+                reason = "deadline scan" if budget.expired() else f"> {budget.ticker_seconds}s per ticker"
+                yield budget.timed_out_result(ticker, reason)
+                continue
+            try:
+                result = future.result()
+                
+                # Optional: Progress logging
+                if (i + 1) % 10 == 0:
+                    print(f"Progress: {i + 1}/{total} saham selesai")
+                    
+            except Exception as e:
+                print(f"Error analyzing {ticker}: {e}")
+                result = ScanResult.failure(ticker, str(e))
+            yield result
+
+    @staticmethod
+    def _shutdown(executor, budget):
+        # Jangan menunggu straggler (thread tetap jalan, hasilnya masuk budget.late_results)
+        executor.shutdown(wait=budget is None or not budget.stragglers, cancel_futures=True)
+
+    def _iter_analyze_once(self, tickers: list, period: str, max_workers: int, session: int = None,
+                           batch_size: int = None, prescreen: bool = False, budget=None):
+        """Satu putaran scan (tanpa requeue)"""
+        if prescreen and batch_size and self.store is not None:
+            yield from self._iter_prescreened(tickers, period, max_workers, session, batch_size, budget)
+            return
+        
         
         print(f"Menganalisis {len(tickers)} saham dengan {max_workers} threads...")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_ticker = {
-                executor.submit(self.analyze_stock, ticker, period, session): ticker 
-                for ticker in tickers
-            }
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            future_to_ticker = {}
+            
+            if batch_size and self.store is not None:
+                # Batch fetch: analisis batch N berjalan sambil batch N+1 diunduh
+                fetched = set()
+                for frames in self.iter_history_batches(tickers, period, batch_size):
+                    for ticker, data in frames.items():
+                        fetched.add(ticker)
+                        future_to_ticker[self._submit(executor, budget, ticker, period, session, data)] = ticker
+                    if budget is not None and budget.expired():
+                        break  # Sisa ticker tidak sempat diunduh -> timed_out di bawah
+                
+                for stats in self.store.batch_stats:
+                    print(f"Batch {stats['kind']}: {stats['fetched']}/{stats['tickers']} ticker, {stats['seconds']}s")
+                
+                # Ticker yang gagal di batch -> fallback fetch per ticker
+                missing = [t for t in tickers if t not in fetched]
+                if budget is not None and budget.expired():
+                    for ticker in missing:
+                        yield budget.timed_out_result(ticker)
+                    missing = []
+                if missing:
+                    print(f"{len(missing)} ticker tidak ada di batch, fallback fetch per ticker...")
+                for ticker in missing:
+                    future_to_ticker[self._submit(executor, budget, ticker, period, session)] = ticker
+            else:
+                # Submit all tasks
+                future_to_ticker = {
+                    self._submit(executor, budget, ticker, period, session): ticker
+                    for ticker in tickers
+                }
             
             # Process results as they complete
-            for i, future in enumerate(as_completed(future_to_ticker)):
-                ticker = future_to_ticker[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # Optional: Progress logging
-                    if (i + 1) % 10 == 0:
-                        print(f"Progress: {i + 1}/{len(tickers)} saham selesai")
-                        
-                except Exception as e:
-                    print(f"Error analyzing {ticker}: {e}")
-                    results.append({
-                        "success": False, 
-                        "ticker": ticker, 
-                        "error": str(e)
-                    })
-        
-        return results
+            yield from self._collect(future_to_ticker, budget, len(tickers))
+        finally:
+            self._shutdown(executor, budget)
+
+    def _iter_prescreened(self, tickers: list, period: str, max_workers: int, session: int, batch_size: int,
+                          budget=None):
+        """Scan universe: load panel -> screen vectorized -> analisis lengkap untuk kandidat"""
+        
+        frames = {}
+        for batch in self.iter_history_batches(tickers, period, batch_size):
+            frames.update(batch)
+            if budget is not None and budget.expired():
+                break
+        panel = PricePanel.from_frames(frames, tickers)
+        screen = self.screen_uptrend_panel(panel)
+        
+        candidates = []
+        for i, ticker in enumerate(panel.tickers):
+            if screen["n_bars"][i] < self.min_data_days:
+                yield ScanResult.failure(ticker, f"Data tidak mencukupi/kosong untuk {ticker}", stage="data")
+            elif not screen["passed"][i]:
+                yield ScanResult.rejected(ticker, screen["reason"][i], screen["stage"][i])
+            else:
+                candidates.append(ticker)
+        
+        missing = [t for t in tickers if t not in panel]
+        if budget is not None and budget.expired():
+            for ticker in missing:
+                yield budget.timed_out_result(ticker)
+            missing = []
+        print(f"Prescreen: {len(candidates)} kandidat dari {len(panel.tickers)} saham, {len(missing)} fallback per ticker")
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            future_to_ticker = {self._submit(executor, budget, t, period, session, frames.pop(t)): t for t in candidates}
+            future_to_ticker.update({self._submit(executor, budget, t, period, session): t for t in missing})
+            yield from self._collect(future_to_ticker, budget, len(future_to_ticker))
+        finally:
+            self._shutdown(executor, budget)
 
     def analyze_multiple_stocks(self, tickers: list, period: str = "6mo", session: int = None) -> list:
         """Menganalisis multiple saham sekaligus (Serial - lambat)"""
@@ -0,0 +1,438 @@
+"""
+State Indikator Incremental (Streaming)
+State per ticker yang di-seed sekali dari history harian, lalu di-update O(1)
+setiap ada harga/volume baru. Nilai yang dihasilkan sama dengan perhitungan
+pandas di StockAnalyzer (rolling mean & ewm adjust=False), termasuk bar hari ini
+yang masih berjalan (bar provisional).
+"""
+
+import json
+import math
+import os
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_hours import now_wib, to_wib
+
+NAN = float('nan')
+DEFAULT_CHECKPOINT_PATH = "live_state.json"
+
+
+def _isnan(x: float) -> bool:
+    return x is None or (isinstance(x, float) and math.isnan(x))
+
+
+class RollingMean:
+    """Rolling mean window tetap dengan running sum (setara rolling(period).mean())"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+
+    def push(self, x: float):
+        if len(self.values) == self.period:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+
+    def peek(self, x: float) -> float:
+        """Mean jika x ditambahkan sebagai nilai terbaru (tanpa mengubah state)"""
+        n = len(self.values) + 1
+        if n < self.period:
+            return NAN
+        total = self.total + x
+        if n > self.period:
+            total -= self.values[0]
+        return total / self.period
+
+    def value(self) -> float:
+        return self.total / self.period if len(self.values) == self.period else NAN
+
+    def to_dict(self) -> Dict:
+        return {"period": self.period, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "RollingMean":
+        obj = cls(d["period"])
+        for x in d["values"]:
+            obj.push(x)
+        return obj
+
+
+class EWMState:
+    """Akumulator EMA/Wilder (setara ewm(alpha, adjust=False), NaN ditangani seperti pandas)"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.mean = NAN
+        self.old_wt = 1.0
+
+    def _step(self, x: float):
+        mean, old_wt = self.mean, self.old_wt
+        if not _isnan(mean):
+            old_wt *= (1.0 - self.alpha)
+            if not _isnan(x):
+                mean = (old_wt * mean + self.alpha * x) / (old_wt + self.alpha)
+                old_wt = 1.0
+        elif not _isnan(x):
+            mean = x
+        return mean, old_wt
+
+    def push(self, x: float):
+        self.mean, self.old_wt = self._step(x)
+
+    def peek(self, x: float) -> float:
+        return self._step(x)[0]
+
+    def to_dict(self) -> Dict:
+        return {"alpha": self.alpha, "mean": self.mean, "old_wt": self.old_wt}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "EWMState":
+        obj = cls(d["alpha"])
+        obj.mean = NAN if d["mean"] is None else d["mean"]
+        obj.old_wt = d["old_wt"]
+        return obj
+
+
+class TickerState:
+    """
+    State indikator untuk satu ticker.
+    Bar yang sudah selesai di-commit ke akumulator; bar hari ini disimpan terpisah
+    (provisional) dan dievaluasi dengan peek() sehingga setiap tick hanya O(1).
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.n_bars = 0
+        self.prev_close = NAN   # Close bar commit terakhir
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_hist = deque(maxlen=2)  # Histogram MACD 2 bar commit terakhir
+
+        self.sma = {p: RollingMean(p) for p in (5, 10, 20, 50, 200)}
+        self.volume_sma = RollingMean(20)
+        self.rsi_gain = RollingMean(14)
+        self.rsi_loss = RollingMean(14)
+        self.ema12 = EWMState(2 / 13)
+        self.ema26 = EWMState(2 / 27)
+        self.signal = EWMState(2 / 10)
+        self.tr_smooth = EWMState(1 / 14)
+        self.plus_dm_smooth = EWMState(1 / 14)
+        self.minus_dm_smooth = EWMState(1 / 14)
+        self.dx_smooth = EWMState(1 / 14)
+
+        # Bar hari ini (running intraday open/high/low/last/volume)
+        self.committed_through: Optional[date] = None  # Tanggal bar commit terakhir
+        self.bar_date: Optional[date] = None
+        self.open = self.high = self.low = self.close = NAN
+        self.volume = 0.0
+        self.updated_at: Optional[float] = None
+        self.streamed_at: Optional[float] = None  # Epoch tick streaming terakhir (tidak di-checkpoint)
+
+    # === BAR MATH ===
+
+    def _bar_terms(self, high: float, low: float, close: float) -> Dict:
+        """Komponen per bar yang bergantung pada bar sebelumnya"""
+        if _isnan(self.prev_close):
+            delta = NAN
+            tr = high - low
+        else:
+            delta = close - self.prev_close
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        up_move = high - self.prev_high if not _isnan(self.prev_high) else NAN
+        down_move = self.prev_low - low if not _isnan(self.prev_low) else NAN
+        plus_dm = up_move if (not _isnan(up_move) and up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (not _isnan(down_move) and down_move > up_move and down_move > 0) else 0.0
+        return {
+            "gain": delta if (not _isnan(delta) and delta > 0) else 0.0,
+            "loss": -delta if (not _isnan(delta) and delta < 0) else 0.0,
+            "tr": tr, "plus_dm": plus_dm, "minus_dm": minus_dm,
+        }
+
+    @staticmethod
+    def _dx(plus_s: float, minus_s: float, tr_s: float) -> float:
+        try:
+            plus_di = 100 * (plus_s / tr_s)
+            minus_di = 100 * (minus_s / tr_s)
+            return 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        except ZeroDivisionError:
+            return NAN
+
+    def _commit(self, open_p: float, high: float, low: float, close: float, volume: float):
+        terms = self._bar_terms(high, low, close)
+        for window in self.sma.values():
+            window.push(close)
+        self.volume_sma.push(volume)
+        self.rsi_gain.push(terms["gain"])
+        self.rsi_loss.push(terms["loss"])
+        self.ema12.push(close)
+        self.ema26.push(close)
+        macd_line = self.ema12.mean - self.ema26.mean
+        self.signal.push(macd_line)
+        self.prev_hist.append(macd_line - self.signal.mean)
+        self.tr_smooth.push(terms["tr"])
+        self.plus_dm_smooth.push(terms["plus_dm"])
+        self.minus_dm_smooth.push(terms["minus_dm"])
+        self.dx_smooth.push(self._dx(self.plus_dm_smooth.mean, self.minus_dm_smooth.mean, self.tr_smooth.mean))
+        self.prev_close, self.prev_high, self.prev_low = close, high, low
+        self.n_bars += 1
+
+    # === SEED & UPDATE ===
+
+    @classmethod
+    def from_history(cls, ticker: str, data: pd.DataFrame, today: Optional[date] = None) -> "TickerState":
+        """Seed dari history harian. Bar bertanggal hari ini dijadikan bar provisional."""
+        state = cls(ticker)
+        today = today or now_wib().date()
+        rows = list(data[['Open', 'High', 'Low', 'Close', 'Volume']].itertuples())
+        if rows and to_wib(rows[-1].Index.to_pydatetime()).date() == today:
+            last = rows.pop()
+            state.bar_date = today
+            state.open, state.high, state.low, state.close = last.Open, last.High, last.Low, last.Close
+            state.volume = float(last.Volume)
+        for row in rows:
+            state._commit(row.Open, row.High, row.Low, row.Close, float(row.Volume))
+        if rows:
+            state.committed_through = to_wib(rows[-1].Index.to_pydatetime()).date()
+        return state
+
+    def _roll(self, bar_date: date) -> bool:
+        """
+        Commit bar provisional lama jika tick berikutnya sudah hari baru.
+        Return False jika bar_date sudah ter-commit (data basi, abaikan).
+        """
+        if self.committed_through is not None and bar_date <= self.committed_through:
+            return False
+        if self.bar_date is not None and self.bar_date != bar_date and not _isnan(self.close):
+            self._commit(self.open, self.high, self.low, self.close, self.volume)
+            self.committed_through = self.bar_date
+            self.open = self.high = self.low = self.close = NAN
+            self.volume = 0.0
+        self.bar_date = bar_date
+        return True
+
+    def update(self, price: float, day_volume: Optional[float] = None, ts: Optional[datetime] = None):
+        """
+        Update dari satu tick harga. day_volume = volume kumulatif hari ini (jika ada).
+        O(1): hanya bar provisional yang berubah.
+        """
+        ts = to_wib(ts) if ts else now_wib()
+        if not self._roll(ts.date()):
+            return
+        if _isnan(self.open):
+            self.open = self.high = self.low = price
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        if day_volume is not None:
+            self.volume = float(day_volume)
+        self.updated_at = ts.timestamp()
+
+    def update_bar(self, open_p: float, high: float, low: float, close: float, volume: float,
+                   bar_date: Optional[date] = None):
+        """Update dari bar harian terbaru (mis. quote snapshot), O(1)"""
+        if not self._roll(bar_date or now_wib().date()):
+            return
+        self.open, self.high, self.low, self.close = open_p, high, low, close
+        self.volume = float(volume)
+        self.updated_at = now_wib().timestamp()
+
+    # === EVALUATION ===
+
+    def has_live_bar(self) -> bool:
+        return not _isnan(self.close)
+
+    def snapshot(self) -> Dict:
+        """
+        Nilai indikator terbaru termasuk bar hari ini (provisional), dengan key
+        yang sama seperti yang dipakai is_uptrend / is_red_to_green_momentum.
+        """
+        if not self.has_live_bar():
+            return {"n_bars": self.n_bars}
+
+        c, h, l, v = self.close, self.high, self.low, self.volume
+        terms = self._bar_terms(h, l, c)
+        ema12 = self.ema12.peek(c)
+        ema26 = self.ema26.peek(c)
+        macd_line = ema12 - ema26
+        signal_line = self.signal.peek(macd_line)
+        histogram = macd_line - signal_line
+
+        avg_gain = self.rsi_gain.peek(terms["gain"])
+        avg_loss = self.rsi_loss.peek(terms["loss"])
+        if _isnan(avg_gain) or _isnan(avg_loss):
+            rsi = NAN
+        elif avg_loss == 0:
+            rsi = 100.0 if avg_gain > 0 else NAN
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        tr_s = self.tr_smooth.peek(terms["tr"])
+        plus_s = self.plus_dm_smooth.peek(terms["plus_dm"])
+        minus_s = self.minus_dm_smooth.peek(terms["minus_dm"])
+        adx = self.dx_smooth.peek(self._dx(plus_s, minus_s, tr_s))
+
+        hist_prev = list(self.prev_hist)
+        return {
+            "n_bars": self.n_bars + 1,
+            "open": self.open, "high": h, "low": l, "close": c, "volume": v,
+            "prev_close": self.prev_close,
+            "sma5": self.sma[5].peek(c), "sma10": self.sma[10].peek(c),
+            "sma20": self.sma[20].peek(c), "sma50": self.sma[50].peek(c), "sma200": self.sma[200].peek(c),
+            "rsi": rsi,
+            "macd": macd_line, "signal": signal_line, "histogram": histogram,
+            "prev_histogram": hist_prev[-1] if len(hist_prev) >= 1 else NAN,
+            "prev2_histogram": hist_prev[-2] if len(hist_prev) >= 2 else NAN,
+            "volume_sma": self.volume_sma.peek(v),
+            "prev_volume_sma": self.volume_sma.value(),  # MA20 historis (tanpa hari ini)
+            "adx": adx,
+        }
+
+    # === CHECKPOINT ===
+
+    def to_dict(self) -> Dict:
+        return {
+            "ticker": self.ticker, "n_bars": self.n_bars,
+            "prev": [self.prev_close, self.prev_high, self.prev_low],
+            "prev_hist": list(self.prev_hist),
+            "sma": {str(p): w.to_dict() for p, w in self.sma.items()},
+            "volume_sma": self.volume_sma.to_dict(),
+            "rsi": [self.rsi_gain.to_dict(), self.rsi_loss.to_dict()],
+            "ewm": {name: getattr(self, name).to_dict() for name in
+                    ("ema12", "ema26", "signal", "tr_smooth", "plus_dm_smooth", "minus_dm_smooth", "dx_smooth")},
+            "committed_through": self.committed_through.isoformat() if self.committed_through else None,
+            "bar": {
+                "date": self.bar_date.isoformat() if self.bar_date else None,
+                "ohlcv": [self.open, self.high, self.low, self.close, self.volume],
+                "updated_at": self.updated_at,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "TickerState":
+        state = cls(d["ticker"])
+        state.n_bars = d["n_bars"]
+        state.prev_close, state.prev_high, state.prev_low = d["prev"]
+        state.prev_hist = deque(d["prev_hist"], maxlen=2)
+        state.sma = {int(p): RollingMean.from_dict(w) for p, w in d["sma"].items()}
+        state.volume_sma = RollingMean.from_dict(d["volume_sma"])
+        state.rsi_gain, state.rsi_loss = (RollingMean.from_dict(x) for x in d["rsi"])
+        for name, ewm in d["ewm"].items():
+            setattr(state, name, EWMState.from_dict(ewm))
+        if d.get("committed_through"):
+            state.committed_through = date.fromisoformat(d["committed_through"])
+        bar = d["bar"]
+        state.bar_date = date.fromisoformat(bar["date"]) if bar["date"] else None
+        state.open, state.high, state.low, state.close, state.volume = bar["ohlcv"]
+        state.updated_at = bar["updated_at"]
+        return state
+
+
+class LiveStateBook:
+    """
+    Kumpulan TickerState untuk universe, bisa di-checkpoint ke disk.
+    State diubah dari dua arah (quote_stream di event loop, continuous_momentum_scan di thread
+    executor): seluruh mutasi & pembacaan state lewat self.lock.
+    """
+
+    def __init__(self):
+        self.states: Dict[str, TickerState] = {}
+        self.seeded_on: Dict[str, str] = {}
+        self.lock = threading.RLock()
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.states
+
+    def get(self, ticker: str) -> Optional[TickerState]:
+        return self.states.get(ticker)
+
+    def needs_seed(self, ticker: str, today: Optional[date] = None) -> bool:
+        """Seed ulang sekali per hari (bar kemarin sudah final di history)"""
+        today = today or now_wib().date()
+        return self.seeded_on.get(ticker) != today.isoformat()
+
+    def seed(self, ticker: str, data: pd.DataFrame, today: Optional[date] = None) -> TickerState:
+        today = today or now_wib().date()
+        # Replay history (mahal) di luar lock; hanya pertukaran state yang dikunci
+        state = TickerState.from_history(ticker, data, today)
+        with self.lock:
+            old = self.states.get(ticker)
+            if (old is not None and old.streamed_at is not None and old.bar_date == today
+                    and old.has_live_bar() and (state.committed_through is None or state.committed_through < today)):
+                # Bar hari ini dari stream lebih baru dari history cache: jangan mundur ke harga lama
+                state.update_bar(old.open, old.high, old.low, old.close, old.volume, bar_date=today)
+                state.updated_at, state.streamed_at = old.updated_at, old.streamed_at
+            self.states[ticker] = state
+            self.seeded_on[ticker] = today.isoformat()
+        return state
+
+    def apply_quotes(self, snapshot, tickers) -> int:
+        """
+        Update bar hari ini dari snapshot quote batch (quote_snapshot.QuoteSnapshot). Ticker yang tick
+        streaming terakhirnya lebih baru dari quote.as_of dilewati. Returns: jumlah ticker
+        """
+        updated = 0
+        with self.lock:
+            for ticker in tickers:
+                state = self.states.get(ticker)
+                quote = snapshot.get(ticker)
+                if state is None or quote is None:
+                    continue
+                if state.streamed_at is not None and state.streamed_at > quote.as_of:
+                    continue
+                state.update_bar(quote.open, quote.high, quote.low, quote.last, quote.volume,
+                                 bar_date=quote.bar_date)
+                updated += 1
+        return updated
+
+    def quote_arrays(self, tickers) -> Dict[str, np.ndarray]:
+        """
+        Kolom array (urutan tickers) untuk screening cross-sectional: bar hari ini,
+        prev close, Volume MA20 historis dan jumlah bar. Ticker tanpa state/bar -> NaN.
+        """
+        cols = {k: np.full(len(tickers), np.nan) for k in
+                ("open", "high", "low", "close", "volume", "prev_close", "prev_volume_sma", "n_bars")}
+        with self.lock:
+            for i, ticker in enumerate(tickers):
+                state = self.states.get(ticker)
+                if state is None or not state.has_live_bar():
+                    continue
+                cols["open"][i], cols["high"][i], cols["low"][i] = state.open, state.high, state.low
+                cols["close"][i], cols["volume"][i] = state.close, state.volume
+                cols["prev_close"][i] = state.prev_close
+                cols["prev_volume_sma"][i] = state.volume_sma.value()
+                cols["n_bars"][i] = state.n_bars + 1
+        return cols
+
+    def save(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        with self.lock:
+            payload = {
+                "seeded_on": dict(self.seeded_on),
+                "states": [s.to_dict() for s in self.states.values()],
+            }
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CHECKPOINT_PATH) -> "LiveStateBook":
+        book = cls()
+        if not os.path.exists(path):
+            return book
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            book.seeded_on = payload.get("seeded_on", {})
+            for d in payload.get("states", []):
+                book.states[d["ticker"]] = TickerState.from_dict(d)
+        except Exception:
+            return cls()  # Checkpoint rusak -> seed ulang dari history
+        return book
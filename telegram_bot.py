@@ -11,11 +11,26 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 import logging
+import time as time_mod
 from datetime import datetime, time
 import pytz
 from telegram import Update, Bot
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters
 from stock_analyzer import StockAnalyzer
+from streaming_indicators import LiveStateBook
+from price_panel import load_panel
+from scan_pipeline import ScanPipeline
+from top_k import TopK
+from single_flight import SingleFlight
+from market_hours import data_version
+from fetch_scheduler import FETCH_SCHEDULER, ThrottledError
+from scan_budget import ScanBudget
+from http_session import HTTP_SESSIONS
+from news_fetcher import NewsPrefetch, fetch_news_many
+from news_cache import NEWS_CACHE
+from quote_snapshot import QUOTE_SERVICE
+from quote_stream import QuoteStream, ReplaySource, YahooStreamSource
+from concurrent.futures import ThreadPoolExecutor
 from idx_ticker_fetcher import load_tickers_from_file, get_all_idx_tickers, save_tickers_to_file
 import os
 
@@ -31,7 +46,6 @@ except ImportError:
 
 from chart_generator import generate_stock_chart
 from telegram import constants
-import yfinance as yf
 
 # ... [Setup logging] ...
 
@@ -50,8 +64,43 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# Scheduler fetch bersama: semua request yfinance/HTTP proses ini lewat sini
+FETCH_SCHEDULER.configure(
+    rate=getattr(config, "FETCH_RATE", 8.0),
+    burst=getattr(config, "FETCH_BURST", 8),
+    min_concurrency=getattr(config, "FETCH_MIN_CONCURRENCY", 1),
+    max_concurrency=getattr(config, "FETCH_MAX_CONCURRENCY", 16),
+    initial_concurrency=getattr(config, "FETCH_INITIAL_CONCURRENCY", 4),
+    max_retries=getattr(config, "FETCH_MAX_RETRIES", 3),
+)
+FETCH_SCHEDULER.hedger.configure(
+    enabled=getattr(config, "FETCH_HEDGE", False),
+    max_fraction=getattr(config, "FETCH_HEDGE_MAX_FRACTION", 0.05),
+    quantile=getattr(config, "FETCH_HEDGE_QUANTILE", 0.95),
+)
+QUOTE_SERVICE.configure(
+    batch_size=getattr(config, "QUOTE_BATCH_SIZE", 200),
+    max_age=getattr(config, "QUOTE_MAX_AGE", 60),
+)
+NEWS_CACHE.configure(
+    ttl_open=getattr(config, "NEWS_TTL_OPEN", 15 * 60),
+    ttl_closed=getattr(config, "NEWS_TTL_CLOSED", 3 * 60 * 60),
+)
+
 # Global Analyzer
 analyzer = StockAnalyzer()
+
+# Pipeline scan 2 stage (fetch di thread, analisa di process pool), aktif via config.SCAN_PIPELINE
+SCAN_PIPELINE = None
+if getattr(config, "SCAN_PIPELINE", False):
+    SCAN_PIPELINE = ScanPipeline(
+        analyzer,
+        io_workers=getattr(config, "SCAN_IO_WORKERS", 10),
+        cpu_workers=getattr(config, "SCAN_CPU_WORKERS", None) or os.cpu_count() or 2,
+        queue_size=getattr(config, "SCAN_QUEUE_SIZE", 200),
+        max_in_flight=getattr(config, "SCAN_MAX_IN_FLIGHT", None),
+        batch_size=getattr(config, "SCAN_BATCH_SIZE", 50),
+    )
 WIB = pytz.timezone('Asia/Jakarta')
 
 # === HELPER FUNCTIONS ===
@@ -255,6 +304,27 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 status_msg += f"• {job.callback.__name__}: {next_t_wib.strftime('%H:%M:%S')}\n"
             else:
                 status_msg += f"• {job.callback.__name__}: (Running/Unknown)\n"
+    
+    fetch = FETCH_SCHEDULER.stats()
+    status_msg += f"\n🌐 *Fetch:* concurrency {fetch['limit']:.0f} (puncak {fetch['peak_limit']:.0f}), "
+    status_msg += f"rate limit terdeteksi {fetch['throttle_events']}x\n"
+    http = HTTP_SESSIONS.stats()['total']
+    status_msg += f"🔌 *Koneksi:* {http['requests']} request, reuse {http['reuse_ratio']:.0%}\n"
+    hedging = fetch['hedging']
+    if hedging['enabled']:
+        status_msg += f"🪁 *Hedge:* {hedging['hedges']}/{hedging['requests']} request "
+        status_msg += f"({hedging['hedge_fraction']:.1%}), menang {hedging['hedge_wins']}x\n"
+    quotes = QUOTE_SERVICE.stats()
+    if quotes['tickers']:
+        status_msg += f"💹 *Quote:* {quotes['tickers']} ticker, umur {quotes['age_seconds']:.0f}s, "
+        status_msg += f"{quotes['requests']} request batch\n"
+    if QUOTE_STREAM is not None:
+        stream = QUOTE_STREAM.stats()
+        status_msg += f"📡 *Stream:* {'aktif' if stream['running'] else 'berhenti'}, {stream['ticks']} tick, "
+        status_msg += f"dievaluasi {stream['evaluated']}, sinyal {stream['signals']}\n"
+    news = NEWS_CACHE.stats()
+    status_msg += f"📰 *Cache Berita:* {news['entries']} ticker, hit {news['hits']}, "
+    status_msg += f"304 {news['revalidations']}, miss {news['misses'] + news['refetches']}\n"
                 
     await update.message.reply_text(status_msg, parse_mode='Markdown')
 
@@ -270,6 +340,35 @@ async def scan_now_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await daily_scan_job(context)
     await update.message.reply_text("✅ Scanning Manual Selesai.")
 
+# /analisa bersamaan untuk ticker yang sama menunggu satu komputasi (hasil + chart dibagi),
+# request ulang dalam menit yang sama dilayani dari cache
+ANALYSIS_FLIGHT = SingleFlight(ttl=getattr(config, "ANALYSIS_CACHE_TTL", 60),
+                               cacheable=lambda value: bool(value[0].get("success")))
+
+def render_chart_png(hist, ticker_code: str):
+    """Render chart ke PNG bytes (dipanggil analyzer secara paralel dengan enrichment lain)"""
+    # Nama file unik: dua versi data untuk ticker yang sama bisa dirender bersamaan
+    chart_filename = f"chart_{ticker_code.replace('.','_')}_{int(time_mod.time() * 1000)}"
+    chart_path = generate_stock_chart(hist, ticker_code, chart_filename)
+    if not chart_path or not os.path.exists(chart_path):
+        return None
+    try:
+        with open(chart_path, 'rb') as f:
+            return f.read()
+    finally:
+        # Cleanup
+        try: os.remove(chart_path)
+        except: pass
+
+async def compute_analysis(ticker_code: str):
+    """Analisa detail + render chart sekali. Returns: (result, PNG bytes atau None)"""
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, analyzer.analyze_stock_detailed, ticker_code, render_chart_png,
+                                        getattr(config, "ANALYSIS_DEADLINE", 8))
+    # Jangan simpan DataFrame di cache hasil; chart sudah dirender paralel oleh analyzer
+    result.pop("chart_data", None)
+    return result, result.pop("chart", None)
+
 async def process_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE, ticker_code: str):
     """Reused Logic for Analysis"""
     # 1. Loading Animation
@@ -277,8 +376,9 @@ async def process_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE, t
     msg = await update.message.reply_text(f"⏳ Sedang menganalisa pasar untuk *{ticker_code}*...", parse_mode='Markdown')
     
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, analyzer.analyze_stock_detailed, ticker_code)
+        result, chart_png = await ANALYSIS_FLIGHT.do(
+            (ticker_code, data_version()), lambda: compute_analysis(ticker_code)
+        )
         
         if not result.get("success"):
             await msg.edit_text(f"❌ Gagal menganalisa saham {ticker_code}.\nError: {result.get('error')}")
@@ -290,15 +390,6 @@ async def process_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE, t
         # 2. Chart
         await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=constants.ChatAction.UPLOAD_PHOTO)
         
-        # Use data from analyzer if available to avoid re-fetching
-        hist = result.get("chart_data")
-        if hist is None or hist.empty:
-             stock = yf.Ticker(ticker_code)
-             hist = await loop.run_in_executor(None, stock.history, "1y")
-             
-        chart_filename = f"chart_{ticker_code.replace('.','_')}"
-        chart_path = await loop.run_in_executor(None, generate_stock_chart, hist, ticker_code, chart_filename)
-        
         # 3. Send Result
         # We delete the loading message first.
         try:
@@ -306,16 +397,12 @@ async def process_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE, t
         except:
             pass # Ignore if already deleted
         
-        if chart_path and os.path.exists(chart_path):
+        if chart_png:
             try:
-                await update.message.reply_photo(photo=open(chart_path, 'rb'), caption=message, parse_mode='Markdown')
+                await update.message.reply_photo(photo=chart_png, caption=message, parse_mode='Markdown')
             except Exception as e:
                 logger.error(f"Failed to send photo: {e}")
                 await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
-            
-            # Cleanup
-            try: os.remove(chart_path)
-            except: pass
         else:
             await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
             
@@ -363,38 +450,62 @@ async def daily_scan_job(context: ContextTypes.DEFAULT_TYPE):
     logger.info(f"Scanning {len(tickers)} tickers...")
     
     loop = asyncio.get_running_loop()
-    results = await loop.run_in_executor(None, analyzer.analyze_tickers_parallel, tickers, "6mo", 20, session_id)
+    batch_size = getattr(config, "SCAN_BATCH_SIZE", 50)
+    prescreen = getattr(config, "SCAN_PRESCREEN", True)
     
-    uptrend_results = [r for r in results if r.get("success") and r.get("is_uptrend")]
-    uptrend_results.sort(key=lambda x: x.get('analysis', {}).get('score', 0), reverse=True)
+    # Sesi 1: open hari ini (IEP) seluruh universe dari satu snapshot quote batch
+    if session_id == 1:
+        await loop.run_in_executor(None, QUOTE_SERVICE.refresh, tickers)
     
-    top_picks = uptrend_results[:10]
-    if not top_picks: 
-        logger.info("No uptrend stocks found today.")
-        if config.TELEGRAM_CHAT_ID:
-             try:
-                 await context.bot.send_message(config.TELEGRAM_CHAT_ID, "ℹ️ *Info Scan:* Tidak ada saham yang memenuhi kriteria Uptrend Kuat saat ini.", parse_mode='Markdown')
-             except: pass
-        return
+    # Deadline scan: broadcast berjalan dengan pick terbaik yang ada, ticker lambat menyusul di addendum
+    budget = ScanBudget(getattr(config, "SCAN_DEADLINE", 600), getattr(config, "SCAN_TICKER_TIMEOUT", 60))
+    top = TopK(10, key=lambda r: r.get('analysis', {}).get('score', 0))
+    
+    # Berita pick yang sudah memegang tempat di top-10 penuh mulai di-fetch (di event loop) selagi
+    # ekor scan berjalan; pick yang tergeser dibatalkan
+    prefetch = NewsPrefetch(analyzer, getattr(config, "NEWS_CONCURRENCY", 5))
+    
+    def scan_top_picks():
+        """Konsumsi hasil scan secara streaming, simpan hanya top-10 (heap)"""
+        if SCAN_PIPELINE is not None:
+            results = SCAN_PIPELINE.iter_run(tickers, "6mo", session_id, budget)
+        else:
+            # Thread pool seukuran batas atas scheduler; concurrency efektif diatur AIMD
+            results = analyzer.iter_analyze_tickers(tickers, "6mo", FETCH_SCHEDULER.max_concurrency, session_id,
+                                                    batch_size, prescreen, budget)
         
-    summary = f"🔥 *SINYAL MARKET - SESI {session_id}*\n\n"
+        top.push_all((r for r in results if r.get("success") and r.get("is_uptrend")), prefetch.offer)
+        
+        logger.info(f"Scan selesai: {top.seen} saham uptrend, {budget.timed_out} timeout, "
+                    f"{len(budget.stragglers)} straggler")
+        return top.items()
+    
+    async def enrich_news(picks):
+        """Berita semua pick diambil bersamaan (async, deadline total) tanpa memblok handler lain"""
+        news = await fetch_news_many(analyzer, [r['ticker'] for r in picks],
+                                     getattr(config, "NEWS_CONCURRENCY", 5), getattr(config, "NEWS_DEADLINE", 15))
+        for r in picks:
+            r['news'] = news.get(r['ticker'], "-")
+    
+    def late_addendum(broadcasted):
+        """Tunggu hasil straggler; return pick baru yang menggeser top-10 yang sudah di-broadcast"""
+        for r in budget.late_results(getattr(config, "SCAN_LATE_GRACE", 300)):
+            if r.get("success") and r.get("is_uptrend"):
+                top.push(r)
+        new_picks = [r for r in top.items() if r['ticker'] not in broadcasted]
+        for r in new_picks:
+            r['session'] = session_id
+        return new_picks
     
-    # Enrichment: Fetch News mostly for the top items to be broadcasted
-    logger.info("Fetching news for top picks...")
+    try:
+        top_picks = await loop.run_in_executor(None, scan_top_picks)
+    except BaseException:
+        await prefetch.aclose()
+        raise
+    news = await prefetch.collect([r['ticker'] for r in top_picks], getattr(config, "NEWS_DEADLINE", 15))
     for r in top_picks:
-        try:
-             # Add session info
-             r['session'] = session_id
-             
-             # Fetch News
-             stock_obj = yf.Ticker(r['ticker'])
-             r['news'] = analyzer.get_stock_news(stock_obj)
-        except Exception as e:
-             logger.error(f"News fetch failed for {r['ticker']}: {e}")
-             r['news'] = "-"
-
-        summary += f"• {r['ticker']} (Score: {r['analysis']['score']})\n"
-        
+        r['news'] = news.get(r['ticker'], "-")
+    
     # BROADCAST TO ALL REGISTERED GROUPS AND CONFIG ID
     # Use set to avoid duplicates and normalize to string
     raw_groups = load_broadcast_groups()
@@ -407,19 +518,50 @@ async def daily_scan_job(context: ContextTypes.DEFAULT_TYPE):
     # Filter out empty or None
     targets = {tid for tid in targets if tid}
     
-    for chat_id in targets:
-        try:
-            # 1. Send Summary List
-            await context.bot.send_message(chat_id=chat_id, text=summary, parse_mode='Markdown')
-            
-            # 2. Send Details (ALL picks as requested)
-            for pick in top_picks:
-                msg = format_daily_signal(pick)
-                await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
-                await asyncio.sleep(1) # Prevent flood limit
+    async def broadcast(summary, picks):
+        for chat_id in targets:
+            try:
+                # 1. Send Summary List
+                await context.bot.send_message(chat_id=chat_id, text=summary, parse_mode='Markdown')
                 
-        except Exception as e:
-            logger.error(f"Failed to send to {chat_id}: {e}")
+                # 2. Send Details (ALL picks as requested)
+                for pick in picks:
+                    msg = format_daily_signal(pick)
+                    await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
+                    await asyncio.sleep(1) # Prevent flood limit
+                    
+            except Exception as e:
+                logger.error(f"Failed to send to {chat_id}: {e}")
+    
+    if top_picks:
+        summary = f"🔥 *SINYAL MARKET - SESI {session_id}*\n\n"
+        
+        for r in top_picks:
+            # Add session info
+            r['session'] = session_id
+            summary += f"• {r['ticker']} (Score: {r['analysis']['score']})\n"
+        
+        await broadcast(summary, top_picks)
+    
+    # Addendum hanya jika hasil straggler mengubah top-10
+    late_picks = []
+    if budget.stragglers:
+        late_picks = await loop.run_in_executor(None, late_addendum, {r['ticker'] for r in top_picks})
+        logger.info(f"Straggler selesai: {budget.stats()}, {len(late_picks)} pick baru")
+    if late_picks:
+        await enrich_news(late_picks)
+        summary = f"📎 *ADDENDUM SINYAL - SESI {session_id}*\n"
+        summary += "_Saham berikut selesai dianalisa setelah broadcast dan masuk top 10:_\n\n"
+        for r in late_picks:
+            summary += f"• {r['ticker']} (Score: {r['analysis']['score']})\n"
+        await broadcast(summary, late_picks)
+    
+    if not top_picks and not late_picks:
+        logger.info("No uptrend stocks found today.")
+        if config.TELEGRAM_CHAT_ID:
+             try:
+                 await context.bot.send_message(config.TELEGRAM_CHAT_ID, "ℹ️ *Info Scan:* Tidak ada saham yang memenuhi kriteria Uptrend Kuat saat ini.", parse_mode='Markdown')
+             except: pass
 
 
 async def bsjp_scan_job(context: ContextTypes.DEFAULT_TYPE):
@@ -437,26 +579,20 @@ async def bsjp_scan_job(context: ContextTypes.DEFAULT_TYPE):
     
     if not tickers: return
     
-    # Run BSJP Screening Parallel
+    # Run BSJP Screening: load panel (cache -> batch fetch) lalu screen vectorized
     loop = asyncio.get_running_loop()
+    batch_size = getattr(config, "SCAN_BATCH_SIZE", 50)
     
-    # Helper for batch processing
-    def batch_bsjp(ticker_list):
-        matches = []
-        for t in ticker_list:
-            if analyzer.analyze_bsjp_ticker(t):
-                 matches.append(t)
-        return matches
-
-    chunk_size = 50
-    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
-    
-    bsjp_matches = []
+    def screen_bsjp():
+        started = time_mod.time()
+        panel = load_panel(analyzer, tickers, "3mo", batch_size) # Need 20 days MA
+        loaded = time_mod.time()
+        screen = analyzer.screen_bsjp_panel(panel)
+        logger.info(f"BSJP: load {loaded - started:.1f}s, screen {time_mod.time() - loaded:.3f}s "
+                    f"({len(panel)} saham)")
+        return screen["matches"] # Sudah urut dari transaction value terbesar
     
-    for chunk in chunks:
-        # Run chunk in executor
-        chunk_matches = await loop.run_in_executor(None, batch_bsjp, chunk)
-        bsjp_matches.extend(chunk_matches)
+    bsjp_matches = await loop.run_in_executor(None, screen_bsjp)
     
     if not bsjp_matches:
         logger.info("No BSJP matches found today.")
@@ -496,6 +632,18 @@ async def bsjp_scan_job(context: ContextTypes.DEFAULT_TYPE):
         except Exception as e:
             logger.error(f"Failed to send BSJP to {chat_id}: {e}")
 
+async def refresh_directory_job(context: ContextTypes.DEFAULT_TYPE):
+    """Job malam: refresh direktori metadata emiten (nama, sektor, fundamental) untuk seluruh universe"""
+    tickers = load_tickers_from_file("idx_tickers.txt")
+    if not tickers:
+        return
+    logger.info(f"Refreshing company directory for {len(tickers)} tickers...")
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, analyzer.directory.refresh, tickers)
+    except Exception as e:
+        logger.error(f"Company directory refresh failed: {e}")
+
 def main():
     """Run the bot"""
     print("Starting Bot...")
@@ -521,6 +669,7 @@ def main():
     job_queue.run_daily(daily_scan_job, t1, days=(0, 1, 2, 3, 4))
     job_queue.run_daily(daily_scan_job, t2, days=(0, 1, 2, 3, 4))
     job_queue.run_daily(bsjp_scan_job, t_bsjp, days=(0, 1, 2, 3, 4))
+    job_queue.run_daily(refresh_directory_job, time(19, 0, tzinfo=WIB), days=(0, 1, 2, 3, 4))
     
     # Continuous Momentum Job (Runs every 15 minutes during market hours)
     # Market Hours: 09:00 - 16:00
@@ -528,6 +677,12 @@ def main():
     
     # Startup Notification
     async def post_init(app):
+        if SCAN_PIPELINE is not None:
+            # Spawn worker process sekarang agar scan pertama tidak membayar biaya import
+            await asyncio.get_running_loop().run_in_executor(None, SCAN_PIPELINE.warmup)
+        if getattr(config, "QUOTE_STREAM_ENABLED", False) or getattr(config, "QUOTE_STREAM_REPLAY", None):
+            global QUOTE_STREAM_TASK
+            QUOTE_STREAM_TASK = app.create_task(run_quote_stream(app))
         if config.TELEGRAM_CHAT_ID:
             try:
                 msg = "🤖 *Bot Sinyal Uptrend Berhasil Direstart*\n"
@@ -537,7 +692,16 @@ def main():
             except Exception as e:
                 print(f"Failed startup msg: {e}")
 
+    async def post_shutdown(app):
+        # Hentikan stream dulu (websocket ditutup, tidak reconnect) sebelum loop berhenti
+        if QUOTE_STREAM_TASK is not None and not QUOTE_STREAM_TASK.done():
+            QUOTE_STREAM_TASK.cancel()
+            await asyncio.gather(QUOTE_STREAM_TASK, return_exceptions=True)
+        # Tutup koneksi keep-alive async (berita) dari event loop pemiliknya
+        await HTTP_SESSIONS.aclose()
+
     application.post_init = post_init
+    application.post_shutdown = post_shutdown
     
     print("Bot is polling...")
     application.run_polling()
@@ -547,6 +711,9 @@ def main():
 # Global cache to prevent spamming the same signal multiple times per day
 SENT_SIGNALS_TODAY = set()
 
+# State indikator incremental per ticker (seed sekali per hari, update O(1) tiap siklus)
+LIVE_STATES = LiveStateBook.load()
+
 async def continuous_momentum_scan(context: ContextTypes.DEFAULT_TYPE):
     """
     Job berjalan setiap 15-20 menit untuk mencari momentum RED-TO-GREEN
@@ -586,47 +753,64 @@ async def continuous_momentum_scan(context: ContextTypes.DEFAULT_TYPE):
     
     loop = asyncio.get_running_loop()
     
-    # Define Filter Function
-    def check_momentum(ticker):
+    # Seed state sekali per hari dari cache history; bar hari ini dari snapshot quote batch (O(1) per ticker)
+    # Returns False jika kena rate limit (ticker diulang setelah cooldown scheduler)
+    def seed_state(ticker):
         try:
-            # We use 5d history to be fast and light
-            s = yf.Ticker(ticker)
-            d = s.history(period="5d")
-            
-            # Use logic in analyzer
-            is_r2g, r2g_data = analyzer.is_red_to_green_momentum(d)
-            if is_r2g:
-                return {"ticker": ticker, "data": r2g_data}
-            return None
-        except:
-            return None
-    
-    # Chunking to avoid overloading
-    results = []
-    chunk_size = 50
-    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+            # Seed dari cache history bersama (frame 6mo dari daily scan)
+            LIVE_STATES.seed(ticker, analyzer.get_history(ticker, "6mo"))
+        except ThrottledError:
+            return False
+        except Exception:
+            pass
+        return True
     
-    # We might only scan a random subset or prioritised list if too slow? 
-    # Let's scan all but rely on thread pool limit.
-    from concurrent.futures import ThreadPoolExecutor
+    def seed_all(batch):
+        with ThreadPoolExecutor(max_workers=FETCH_SCHEDULER.max_concurrency) as executor:
+            return [t for t, ok in zip(batch, executor.map(seed_state, batch)) if not ok]
+    
+    def screen_momentum():
+        pending = [t for t in tickers if LIVE_STATES.get(t) is None or LIVE_STATES.needs_seed(t)]
+        throttled = seed_all(pending)
+        if throttled:
+            logger.warning(f"{len(throttled)} ticker kena rate limit, seed ulang setelah cooldown...")
+            FETCH_SCHEDULER.wait_cooldown()
+            throttled = seed_all(throttled)
+            if throttled:
+                logger.warning(f"{len(throttled)} ticker masih kena rate limit, memakai state terakhir")
+        
+        # Harga terbaru seluruh universe dalam beberapa request batch (bukan history 5d per ticker)
+        snapshot = QUOTE_SERVICE.refresh(tickers)
+        updated = LIVE_STATES.apply_quotes(snapshot, tickers)
+        logger.info(f"Quote snapshot: {updated}/{len(tickers)} ticker, {QUOTE_SERVICE.stats()}")
+        
+        # Satu screen cross-sectional untuk seluruh universe
+        q = LIVE_STATES.quote_arrays(tickers)
+        screen = analyzer.screen_red_to_green(
+            tickers, q["open"], q["high"], q["low"], q["close"], q["volume"],
+            q["prev_close"], q["prev_volume_sma"], q["n_bars"]
+        )
+        return analyzer.red_to_green_matches(screen)
     
-    matches = []
+    matches = await loop.run_in_executor(None, screen_momentum)
     
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(check_momentum, t): t for t in tickers}
-        
-        from concurrent.futures import as_completed
-        for future in as_completed(futures):
-            res = future.result()
-            if res:
-                matches.append(res)
+    try:
+        LIVE_STATES.save()
+    except Exception as e:
+        logger.error(f"Gagal menyimpan checkpoint live state: {e}")
                 
+    await send_momentum_alerts(context.bot, matches)
+
+async def send_momentum_alerts(bot, matches):
+    """Broadcast alert Red-to-Green (polling & streaming), tiap ticker maksimal sekali per hari"""
     # Filter matches: Only those NOT sent today
     new_matches = []
     for m in matches:
         t = m['ticker']
         if t not in SENT_SIGNALS_TODAY:
             new_matches.append(m)
+            # Tandai sebelum kirim: stream & polling tidak mengirim ticker yang sama dua kali
+            SENT_SIGNALS_TODAY.add(t)
             
     if not new_matches:
         logger.info("No new Red-to-Green signals found.")
@@ -664,15 +848,46 @@ async def continuous_momentum_scan(context: ContextTypes.DEFAULT_TYPE):
         # Send
         for chat_id in targets:
             try:
-                await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
+                await bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
             except Exception as e:
                 logger.error(f"Failed to send alert to {chat_id}: {e}")
         
-        # Mark as sent
-        SENT_SIGNALS_TODAY.add(m['ticker'])
-        
         # Pause slightly to avoid flood if many
         await asyncio.sleep(0.5)
 
+# Ingest tick streaming (None jika QUOTE_STREAM_ENABLED nonaktif) & task pemiliknya (di-cancel saat shutdown)
+QUOTE_STREAM = None
+QUOTE_STREAM_TASK = None
+
+async def run_quote_stream(app):
+    """
+    Tick realtime -> LIVE_STATES -> evaluasi Red-to-Green per ticker yang berubah -> alert.
+    Ticker di-seed oleh continuous_momentum_scan (tetap jalan tiap 15 menit sebagai fallback).
+    """
+    global QUOTE_STREAM
+    replay = getattr(config, "QUOTE_STREAM_REPLAY", None)
+    if replay:
+        source = ReplaySource(replay, speed=getattr(config, "QUOTE_STREAM_REPLAY_SPEED", None))
+    else:
+        tickers = load_tickers_from_file("idx_tickers.txt")
+        if not tickers:
+            logger.warning("Quote stream tidak dijalankan: daftar ticker kosong")
+            return
+        source = YahooStreamSource(tickers, record_path=getattr(config, "QUOTE_STREAM_RECORD", None))
+    QUOTE_STREAM = QuoteStream(LIVE_STATES, analyzer)
+    
+    async def on_signal(match):
+        # Ticker yang sudah dikirim tetap lolos di tiap tick berikutnya: abaikan tanpa log
+        if match['ticker'] not in SENT_SIGNALS_TODAY:
+            await send_momentum_alerts(app.bot, [match])
+    
+    try:
+        await QUOTE_STREAM.run(source, on_signal=on_signal)
+        logger.info(f"Quote stream selesai: {QUOTE_STREAM.stats()}")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Quote stream berhenti: {e}")
+
 if __name__ == "__main__":
     main()
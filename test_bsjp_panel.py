@@ -0,0 +1,53 @@
+"""
+Paritas screen_bsjp_panel (vectorized) vs is_bsjp (per ticker), termasuk ticker dengan hari
+bolong (suspend) di tengah kalender gabungan panel.
+Jalankan: python -m pytest test_bsjp_panel.py  (atau python test_bsjp_panel.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+from stock_analyzer import StockAnalyzer
+
+
+def make_frame(rng, dates, spike: bool) -> pd.DataFrame:
+    close = 1000 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+    volume = rng.uniform(5e6, 2e7, len(dates))
+    if spike:
+        # Bar terakhir: naik > 1% di atas MA10 dengan volume > 2x MA20 & > 2x kemarin
+        close[-1] = max(close[-11:-1].max(), close[-2]) * 1.05
+        volume[-1] = volume[-21:-1].max() * 3
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": volume}, index=dates)
+
+
+def test_bsjp_panel_matches_is_bsjp_with_gaps():
+    rng = np.random.default_rng(7)
+    analyzer = StockAnalyzer(use_store=False)
+    dates = pd.date_range("2024-01-01", periods=60, freq="B", tz="Asia/Jakarta")
+    frames = {}
+    for i in range(40):
+        frame = make_frame(rng, dates, spike=i % 2 == 0)
+        if i % 4 < 2:
+            # Satu hari suspend 10 bar sebelum akhir (dan satu lagi di awal untuk sebagian)
+            frame = frame.drop(dates[-10])
+            if i % 8 == 0:
+                frame = frame.drop(dates[5])
+        if i == 39:
+            frame = frame.iloc[-24:]  # Listing baru: < 25 bar
+        frames[f"T{i:02d}.JK"] = frame
+
+    panel = PricePanel.from_frames(frames)
+    screen = analyzer.screen_bsjp_panel(panel)
+    expected = {t for t, frame in frames.items() if analyzer.is_bsjp(frame)}
+
+    assert set(screen["matches"]) == expected
+    assert any(len(frames[t]) < len(dates) for t in expected)  # Ticker bolong ikut lolos
+    for i, ticker in enumerate(panel.tickers):
+        assert screen["n_bars"][i] == len(frames[ticker])
+
+
+if __name__ == "__main__":
+    test_bsjp_panel_matches_is_bsjp_with_gaps()
+    print("OK")
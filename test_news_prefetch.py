@@ -0,0 +1,72 @@
+"""
+Overlap berita dengan ekor scan (daily_scan_job): berita pick yang sudah memegang tempat di top-K
+penuh mulai di-fetch sebelum scan selesai, pick yang tergeser dibatalkan.
+Scan di-replay dengan ekor lambat & fetcher berita stub (tanpa network).
+Jalankan: python -m pytest test_news_prefetch.py  (atau python test_news_prefetch.py)
+"""
+
+import asyncio
+import threading
+import time as time_mod
+
+import news_fetcher
+from http_session import HTTP_SESSIONS
+from news_fetcher import NewsPrefetch
+from top_k import TopK
+
+
+def test_news_for_early_pick_starts_before_scan_returns():
+    started = {}
+    cancelled = []
+    early_started = threading.Event()
+    seen_during_scan = []
+
+    async def stub_fetch(analyzer, client, semaphore, ticker, timeout):
+        started[ticker] = time_mod.monotonic()
+        if ticker == "EARLY.JK":
+            early_started.set()
+        try:
+            await asyncio.sleep(10 if ticker == "LOSER.JK" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(ticker)
+            raise
+        return f"berita {ticker}"
+
+    def scan_results():
+        yield {"ticker": "EARLY.JK", "score": 90}
+        yield {"ticker": "B.JK", "score": 80}
+        yield {"ticker": "LOSER.JK", "score": 10}   # Heap penuh -> prefetch dimulai
+        yield {"ticker": "C.JK", "score": 85}       # Menggeser LOSER
+        # Ekor scan lambat: berita pick awal harus sudah mulai tanpa menunggu scan selesai
+        seen_during_scan.append(early_started.wait(5))
+        time_mod.sleep(0.2)
+        yield {"ticker": "TAIL.JK", "score": 1}
+
+    async def run():
+        prefetch = NewsPrefetch(analyzer=None, concurrency=2)
+        top = TopK(3, key=lambda r: r["score"])
+        loop = asyncio.get_running_loop()
+        picks = await loop.run_in_executor(None, lambda: top.push_all(scan_results(), prefetch.offer).items())
+        scan_returned = time_mod.monotonic()
+        news = await prefetch.collect([r["ticker"] for r in picks], deadline=5)
+        await HTTP_SESSIONS.aclose()
+        return picks, scan_returned, news, prefetch
+
+    original = news_fetcher._fetch_one
+    news_fetcher._fetch_one = stub_fetch
+    try:
+        picks, scan_returned, news, prefetch = asyncio.run(run())
+    finally:
+        news_fetcher._fetch_one = original
+
+    assert [r["ticker"] for r in picks] == ["EARLY.JK", "C.JK", "B.JK"]
+    assert seen_during_scan == [True]
+    assert started["EARLY.JK"] < scan_returned
+    assert prefetch.prefetched == 4  # EARLY, B, LOSER lalu C, semua sebelum collect()
+    assert cancelled == ["LOSER.JK"]
+    assert news == {t: f"berita {t}" for t in ("EARLY.JK", "C.JK", "B.JK")}
+
+
+if __name__ == "__main__":
+    test_news_for_early_pick_starts_before_scan_returns()
+    print("OK")
@@ -0,0 +1,98 @@
+"""
+Replay rekaman tick JSONL lewat ReplaySource -> QuoteStream.ingest -> LiveStateBook, termasuk
+snapshot quote yang lebih lama dari tick streaming (tidak boleh menimpa bar hari ini).
+Jalankan: python -m pytest test_quote_stream.py  (atau python test_quote_stream.py)
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time as time_mod
+
+import numpy as np
+import pandas as pd
+
+from market_hours import now_wib
+from quote_snapshot import Quote
+from quote_stream import QuoteStream, ReplaySource
+from stock_analyzer import StockAnalyzer
+from streaming_indicators import LiveStateBook
+
+
+def make_history(today) -> pd.DataFrame:
+    dates = pd.date_range(end=pd.Timestamp(today) - pd.Timedelta(days=1), periods=120, freq="B",
+                          tz="Asia/Jakarta")
+    close = np.linspace(900, 1000, len(dates))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": 1e6}, index=dates)
+
+
+def make_book(tickers, today) -> LiveStateBook:
+    book = LiveStateBook()
+    for ticker in tickers:
+        book.seed(ticker, make_history(today), today)
+    return book
+
+
+def write_fixture(path, base_ms):
+    messages = [
+        # AAA: buka merah di bawah close kemarin (1000), lalu berbalik hijau dengan volume
+        {"id": "AAA.JK", "price": p, "time": str(base_ms + i * 1000), "day_volume": str(v)}
+        for i, (p, v) in enumerate([(980, 200000), (980, 200000), (970, 400000),
+                                    (1010, 900000), (1040, 2000000)])
+    ]
+    messages.append({"id": "ZZZ.JK", "price": 5, "time": str(base_ms)})  # Belum di-seed
+    messages.append({"id": "BBB.JK", "price": 1001, "time": str(base_ms), "day_volume": "1000",
+                     "open_price": 1000, "day_high": 1002, "day_low": 999})
+    with open(path, "w", encoding="utf-8") as f:
+        for message in messages:
+            f.write(json.dumps(message) + "\n")
+        f.write("bukan json\n")
+
+
+def test_replay_fixture_through_quote_stream():
+    today = now_wib().date()
+    book = make_book(["AAA.JK", "BBB.JK", "CCC.JK"], today)
+    base = float(int(time_mod.time()))
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    try:
+        write_fixture(path, int(base * 1000))
+        stream = QuoteStream(book, StockAnalyzer(use_store=False))
+        signals = []
+
+        async def on_signal(match):
+            signals.append(match)
+
+        asyncio.run(stream.run(ReplaySource(path), on_signal=on_signal))
+    finally:
+        os.remove(path)
+
+    stats = stream.stats()
+    assert not stats["running"]
+    assert stats["ticks"] == 7
+    assert stats["unknown"] == 1
+    assert stats["unchanged"] == 1
+    assert [m["ticker"] for m in signals] == ["AAA.JK"]
+
+    aaa = book.get("AAA.JK")
+    assert (aaa.open, aaa.low, aaa.close, aaa.volume) == (980, 970, 1040, 2000000)
+    assert aaa.streamed_at == base + 4
+    bbb = book.get("BBB.JK")
+    assert (bbb.open, bbb.high, bbb.low, bbb.close) == (1000, 1002, 999, 1001)
+
+    # Snapshot quote yang diambil sebelum tick terakhir tidak menimpa bar hasil stream
+    stale = {t: Quote(t, 990, 985, 995, 980, 500000, 1000, today, base) for t in ("AAA.JK", "CCC.JK")}
+    assert book.apply_quotes(stale, ["AAA.JK", "CCC.JK"]) == 1
+    assert aaa.close == 1040
+    assert book.get("CCC.JK").close == 990
+
+    # Seed ulang di hari yang sama mempertahankan bar dari stream
+    reseeded = book.seed("AAA.JK", make_history(today), today)
+    assert reseeded is not aaa and reseeded.close == 1040
+
+
+if __name__ == "__main__":
+    test_replay_fixture_through_quote_stream()
+    print("OK")
@@ -0,0 +1,56 @@
+"""
+Paritas screen_uptrend_panel (vectorized, prescreen daily scan) vs is_uptrend (per ticker),
+termasuk ticker dengan hari bolong (suspend) di tengah kalender gabungan panel.
+Jalankan: python -m pytest test_uptrend_panel.py  (atau python test_uptrend_panel.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+from stock_analyzer import StockAnalyzer
+
+
+def make_frame(rng, dates) -> pd.DataFrame:
+    drift = rng.normal(0.002, 0.002)
+    close = 1000 * np.cumprod(1 + rng.normal(drift, 0.02, len(dates)))
+    volume = rng.uniform(2e6, 2e7, len(dates))
+    return pd.DataFrame({"Open": close * 0.99, "High": close * 1.02, "Low": close * 0.97,
+                         "Close": close, "Volume": volume}, index=dates)
+
+
+def test_uptrend_panel_matches_is_uptrend_with_gaps():
+    rng = np.random.default_rng(11)
+    analyzer = StockAnalyzer(use_store=False)
+    dates = pd.date_range("2024-01-01", periods=130, freq="B", tz="Asia/Jakarta")
+    frames = {}
+    for i in range(400):
+        frame = make_frame(rng, dates)
+        if i % 2 == 0:
+            # 3 hari suspend di tengah history, salah satunya dekat bar terakhir
+            gaps = rng.choice(np.arange(60, len(dates) - 1), size=3, replace=False)
+            frame = frame.drop(dates[gaps])
+        if i % 50 == 1:
+            frame = frame.iloc[-40:]  # Listing baru: bar belum cukup
+        frames[f"T{i:03d}.JK"] = frame
+
+    panel = PricePanel.from_frames(frames)
+    screen = analyzer.screen_uptrend_panel(panel)
+
+    for i, ticker in enumerate(panel.tickers):
+        passed, analysis = analyzer.is_uptrend(frames[ticker])
+        assert screen["passed"][i] == passed, (ticker, screen["reason"][i], analysis.get("reason"))
+        if passed:
+            assert screen["score"][i] == analysis["score"], ticker
+        else:
+            assert screen["reason"][i] == analysis["reason"], ticker
+            assert screen["stage"][i] == analysis["stage"], ticker
+        assert screen["n_bars"][i] == len(frames[ticker])
+
+    gapped = [t for t in panel.tickers if len(frames[t]) < len(dates) and len(frames[t]) > 40]
+    assert any(screen["passed"][panel.ticker_index[t]] for t in gapped)  # Ticker bolong ikut lolos
+
+
+if __name__ == "__main__":
+    test_uptrend_panel_matches_is_uptrend_with_gaps()
+    print("OK")
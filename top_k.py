@@ -0,0 +1,67 @@
+"""
+Ranking Top-K Streaming
+Heap berukuran tetap yang menyimpan K hasil terbaik selama hasil scan berdatangan,
+sehingga memori tidak bergantung pada ukuran universe.
+"""
+
+import heapq
+import itertools
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class TopK:
+    """
+    Min-heap berisi K item dengan key terbesar.
+    Key sama -> item yang datang lebih dulu menang (sama seperti sort stabil reverse=True).
+    """
+
+    def __init__(self, k: int, key: Callable[[Any], float]):
+        self.k = k
+        self.key = key
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self.seen = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    def threshold(self) -> Optional[float]:
+        """Key terkecil yang masih masuk top-K (None jika heap belum penuh)"""
+        return self._heap[0][0] if self.full() else None
+
+    def push(self, item: Any) -> Tuple[bool, Optional[Any]]:
+        """
+        Tawarkan item ke ranking.
+        Returns: (masuk top-K?, item yang tergeser atau None)
+        """
+        self.seen += 1
+        if self.k <= 0:
+            return False, None
+        # -seq: di antara key yang sama, item terbaru dianggap paling kecil (tergeser duluan)
+        entry = (self.key(item), -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True, None
+        if entry[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            return True, evicted[2]
+        return False, None
+
+    def push_all(self, items: Iterable[Any],
+                 on_push: Optional[Callable[["TopK", bool, Optional[Any]], None]] = None) -> "TopK":
+        """
+        Push seluruh item dari stream (mis. hasil scan yang di-yield satu per satu).
+        on_push(top, masuk?, tergeser) dipanggil setelah tiap push, mis. NewsPrefetch.offer.
+        """
+        for item in items:
+            entered, evicted = self.push(item)
+            if on_push is not None:
+                on_push(self, entered, evicted)
+        return self
+
+    def items(self) -> List[Any]:
+        """Item top-K urut dari key terbesar"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: (e[0], e[1]), reverse=True)]